@@ -0,0 +1,87 @@
+"""
+Benchmark of attaching the channel data to the enriched DataFrame. It compares the former per key `Series.map` with a
+lambda against the single merge done by `main.join_channel_data`::
+
+    python -m benchmarks.channel_merge --rows 1000000 --channels 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from main import join_channel_data
+
+
+def build_channel_data(channels):
+    """
+    Builds synthetic channel info dictionaries, shaped like the ones returned by `get_details_channel_info`.
+
+    :param channels: (int) The number of channels
+    :return: (dict) Dictionary mapping channel names onto their channel info dictionaries
+    """
+    return {
+        f"channel {i}": {
+            "Channel Name": f"channel {i}",
+            "Channel ID": f"UC{i:022d}",
+            "Channel Title": f"Channel {i}",
+            "Description": f"Description of channel {i}. " * 50,
+            "Subscribers": i * 1000,
+            "Views": i * 100000,
+            "Total Videos": i,
+            "Created At": "2015-06-01T12:00:00Z",
+            "Latest Video Title": f"Latest video of channel {i}",
+            "Published At": "2024-01-01T12:00:00Z",
+            "Latest_Video URL": f"https://www.youtube.com/watch?v={i:011d}",
+        }
+        for i in range(channels)
+    }
+
+
+def legacy_join_channel_data(df, channel_name_column, channel_data):
+    all_keys = set().union(*(d.keys() for d in channel_data.values()))
+    for key in all_keys:
+        df[key] = df[channel_name_column].map(lambda x: channel_data.get(x, {}).get(key, None))
+    return df
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks joining channel data onto a large DataFrame.')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--channels', type=int, default=5000)
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the merge based implementation.')
+    parsed_args = parser.parse_args(args)
+
+    channel_data = build_channel_data(parsed_args.channels)
+    # one in a hundred rows references a channel without channel data
+    channel_ids = np.random.default_rng(0).integers(0, int(parsed_args.channels * 1.01), parsed_args.rows)
+    df = pd.DataFrame({
+        "channel": [f"channel {i}" for i in channel_ids],
+        "video": [f"https://youtu.be/{i:011d}" for i in range(parsed_args.rows)],
+    })
+
+    implementations = [('merge', join_channel_data)]
+    if not parsed_args.skip_legacy:
+        implementations.append(('legacy map', legacy_join_channel_data))
+
+    results = {}
+    for name, implementation in implementations:
+        start = time.perf_counter()
+        results[name] = implementation(df.copy(), "channel", channel_data)
+        print(f"{name:>10}: {time.perf_counter() - start:.2f} s for {parsed_args.rows} rows, "
+              f"{parsed_args.channels} channels")
+
+    if 'legacy map' in results:
+        sample = np.random.default_rng(1).choice(parsed_args.rows, min(parsed_args.rows, 10000), replace=False)
+        merged = results['merge'].iloc[sample]
+        legacy = results['legacy map'].iloc[sample]
+        pd.testing.assert_frame_equal(
+            merged[sorted(merged.columns)].astype(object).fillna(-1),
+            legacy[sorted(legacy.columns)].astype(object).fillna(-1),
+            check_dtype=False,
+        )
+        print("results are identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of exporting long transcripts with the formatters. It compares building the whole SRT/WebVTT document in
+memory, like the formatters used to, against `write_transcript`, which streams the document to a file in chunks, and
+checks that both produce identical output::
+
+    python -m benchmarks.formatters --cues 100000
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import timeit
+import tracemalloc
+
+from youtube_transcript_api.formatters import JSONFormatter, SRTFormatter, WebVTTFormatter
+
+
+def build_transcript(cues, seed=0):
+    """
+    Builds a synthetic transcript with overlapping cues, like automatically generated captions.
+
+    :param cues: (int) The number of cues
+    :param seed: (int) The seed of the random generator
+    :return: (list) The transcript as a list of dictionaries
+    """
+    random_generator = random.Random(seed)
+    return [
+        {
+            'text': 'cue number {} of the benchmark transcript'.format(i),
+            'start': round(i * 1.5, 2),
+            'duration': round(random_generator.uniform(0.5, 4.0), 3),
+        }
+        for i in range(cues)
+    ]
+
+
+def legacy_seconds_to_timestamp(time, separator):
+    time = float(time)
+    hours_float, remainder = divmod(time, 3600)
+    mins_float, secs_float = divmod(remainder, 60)
+    hours, mins, secs = int(hours_float), int(mins_float), int(secs_float)
+    ms = int(round((time - int(time))*1000, 2))
+    return "{:02d}:{:02d}:{:02d}{}{:03d}".format(hours, mins, secs, separator, ms)
+
+
+def legacy_format_srt(transcript):
+    lines = []
+    for i, line in enumerate(transcript):
+        end = line['start'] + line['duration']
+        time_text = "{} --> {}".format(
+            legacy_seconds_to_timestamp(line['start'], ','),
+            legacy_seconds_to_timestamp(
+                transcript[i + 1]['start']
+                if i < len(transcript) - 1 and transcript[i + 1]['start'] < end else end,
+                ',',
+            )
+        )
+        lines.append("{}\n{}\n{}".format(i + 1, time_text, line['text']))
+    return "\n\n".join(lines) + "\n"
+
+
+def write_to_file(path, function):
+    with open(path, 'w', encoding='utf-8') as file:
+        function(file)
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks exporting long transcripts with the formatters.')
+    parser.add_argument('--cues', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parsed_args = parser.parse_args(args)
+
+    transcript = build_transcript(parsed_args.cues)
+    print(f"{parsed_args.cues} cues")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'transcript')
+
+        def formatted(formatter):
+            return lambda: write_to_file(path, lambda file: file.write(formatter.format_transcript(transcript)))
+
+        def written(formatter):
+            return lambda: write_to_file(path, lambda file: formatter.write_transcript(transcript, file))
+
+        implementations = [
+            ('srt legacy', lambda: write_to_file(path, lambda file: file.write(legacy_format_srt(transcript)))),
+            ('srt format', formatted(SRTFormatter())),
+            ('srt write', written(SRTFormatter())),
+            ('vtt format', formatted(WebVTTFormatter())),
+            ('vtt write', written(WebVTTFormatter())),
+            ('json format', formatted(JSONFormatter())),
+            ('json write', written(JSONFormatter())),
+        ]
+
+        expected_srt = legacy_format_srt(transcript)
+        for formatter in (SRTFormatter(), WebVTTFormatter(), JSONFormatter()):
+            output = io.StringIO()
+            formatter.write_transcript(transcript, output)
+            assert output.getvalue() == formatter.format_transcript(transcript), 'written output differs'
+        assert SRTFormatter().format_transcript(transcript) == expected_srt, 'srt output differs from legacy'
+
+        # the timings are taken before tracing the memory allocations, since tracemalloc slows down later runs
+        timings = [
+            min(timeit.repeat(implementation, number=1, repeat=parsed_args.repeat))
+            for _, implementation in implementations
+        ]
+        for (name, implementation), seconds in zip(implementations, timings):
+            print(f"{name:>11}: {seconds * 1000:7.1f} ms, peak {peak_memory(implementation) / 1e6:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
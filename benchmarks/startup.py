@@ -0,0 +1,82 @@
+"""
+Regression benchmark for the cold start of the transcript CLI and the enricher. Every target is imported in a fresh
+interpreter with `python -X importtime` and its cumulative import time is compared against a budget::
+
+    python -m benchmarks.startup
+
+The benchmark fails if a target exceeds its budget or if it eagerly imports one of the heavy dependencies, which
+should only be loaded on first use.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('requests', 'pandas', 'numpy', 'googleapiclient', 'dotenv', 'tkinter', 'http.cookiejar', 'pprint')
+
+# target module -> budget of its cumulative import time in milliseconds
+BUDGETS_MS = {
+    'youtube_transcript_api._cli': 60,
+    'enricher': 40,
+    'main': 80,
+}
+
+
+def measure_import(module, repeat=5):
+    """
+    Imports `module` in `repeat` fresh interpreters.
+
+    :param module: (str) The module to import
+    :param repeat: (int) The number of interpreters to start
+    :return: (tuple) The fastest cumulative import time in milliseconds and the set of all modules which were imported
+    """
+    best_ms = None
+    imported_modules = set()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import {module}'.format(module=module)],
+            cwd=REPO_ROOT,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative_us, imported_module = line[len('import time:'):].split('|')
+            imported_modules.add(imported_module.strip())
+            if imported_module.strip() == module:
+                cumulative_ms = int(cumulative_us) / 1000.0
+                best_ms = cumulative_ms if best_ms is None else min(best_ms, cumulative_ms)
+    return best_ms, imported_modules
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Checks the import time of the entry points against their budgets.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of fresh interpreters per target.')
+    parsed_args = parser.parse_args(args)
+
+    failed = False
+    for module, budget_ms in BUDGETS_MS.items():
+        import_ms, imported_modules = measure_import(module, parsed_args.repeat)
+        eager_modules = sorted(
+            heavy_module for heavy_module in HEAVY_MODULES
+            if heavy_module in imported_modules
+        )
+        ok = import_ms <= budget_ms and not eager_modules
+        failed = failed or not ok
+        print('{status} {module}: {import_ms:.1f} ms (budget {budget_ms} ms){eager}'.format(
+            status='OK  ' if ok else 'FAIL',
+            module=module,
+            import_ms=import_ms,
+            budget_ms=budget_ms,
+            eager=', eagerly imports ' + ', '.join(eager_modules) if eager_modules else '',
+        ))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
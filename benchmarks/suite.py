@@ -0,0 +1,319 @@
+"""
+Micro-benchmark suite of the parsing and formatting hot paths, with stored baselines for regression comparison. Every
+benchmark is timed with `timeit` and its best time per call is compared against `benchmarks/baselines.json`::
+
+    python -m benchmarks.suite                      # compare against the baselines
+    python -m benchmarks.suite --filter formatter   # only run the benchmarks whose name contains "formatter"
+    python -m benchmarks.suite --save               # store the current timings as the new baselines
+
+The suite fails if a benchmark is more than `--tolerance` slower than its baseline. Baselines depend on the machine,
+so they should be saved again on the machine the comparison runs on.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+from unittest import mock
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+ASSETS_DIR = os.path.join(REPO_ROOT, 'youtube_transcript_api', 'test', 'assets')
+
+BASELINES_PATH = os.path.join(BENCHMARKS_DIR, 'baselines.json')
+
+# name -> function returning the benchmarked callable and, optionally, a function cleaning up after it
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registers a benchmark. The decorated function does the setup, which is not timed, and returns the callable which
+    is timed, or a tuple of the callable and a function cleaning up after it.
+
+    :param name: (str) The name of the benchmark
+    :return: (function) The decorator
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def load_asset(file_name):
+    """
+    Loads an HTML asset of the test suite, unescaped like the watch pages the transcript list fetcher extracts from.
+
+    :param file_name: (str) The file name of the asset
+    :return: (str) The watch page
+    """
+    from youtube_transcript_api._html_unescaping import unescape
+
+    with open(os.path.join(ASSETS_DIR, file_name), encoding='utf-8') as file:
+        return unescape(file.read())
+
+
+def html_assets():
+    return sorted(file_name for file_name in os.listdir(ASSETS_DIR) if file_name.endswith('.html.static'))
+
+
+def register_extractor_benchmarks():
+    from youtube_transcript_api._transcripts import TranscriptListFetcher
+
+    def extractor_benchmark(method_name, file_name):
+        def setup():
+            html = load_asset(file_name)
+            extract = getattr(TranscriptListFetcher(None), method_name)
+
+            def run():
+                # most assets are pages without transcripts, whose errors are part of the extraction
+                try:
+                    extract(html, 'GJLlxj_dtq8')
+                except Exception:
+                    pass
+            return run
+        return setup
+
+    for file_name in html_assets():
+        asset_name = file_name[:-len('.html.static')]
+        for method_name in ('_extract_captions_json', '_extract_audio_json'):
+            benchmark('{method}[{asset}]'.format(method=method_name.lstrip('_'), asset=asset_name))(
+                extractor_benchmark(method_name, file_name)
+            )
+
+
+register_extractor_benchmarks()
+
+
+@benchmark('transcript_parser[10000 cues]')
+def transcript_parser():
+    from benchmarks.transcript_parser import build_timedtext
+    from youtube_transcript_api._transcripts import _TranscriptParser
+
+    plain_data = build_timedtext(10000)
+    return lambda: _TranscriptParser().parse(plain_data)
+
+
+@benchmark('transcript_parser[10000 cues, compact]')
+def transcript_parser_compact():
+    from benchmarks.transcript_parser import build_timedtext
+    from youtube_transcript_api._transcripts import _TranscriptParser
+
+    plain_data = build_timedtext(10000)
+    return lambda: _TranscriptParser().parse(plain_data, compact=True)
+
+
+@benchmark('transcript_parser[10000 cues, preserve_formatting]')
+def transcript_parser_preserving_formatting():
+    from benchmarks.transcript_parser import build_timedtext
+    from youtube_transcript_api._transcripts import _TranscriptParser
+
+    plain_data = build_timedtext(10000)
+    return lambda: _TranscriptParser(preserve_formatting=True).parse(plain_data)
+
+
+def register_formatter_benchmarks():
+    from youtube_transcript_api.formatters import FormatterLoader
+
+    def formatter_benchmark(formatter_type):
+        def setup():
+            from benchmarks.formatters import build_transcript
+
+            transcript = build_transcript(10000)
+            formatter = FormatterLoader().load(formatter_type)
+            return lambda: formatter.format_transcript(transcript)
+        return setup
+
+    for formatter_type in FormatterLoader.TYPES:
+        benchmark('formatter[{type}, 10000 cues]'.format(type=formatter_type))(formatter_benchmark(formatter_type))
+
+
+register_formatter_benchmarks()
+
+
+def build_video_links(count, seed=0):
+    """
+    Builds a list of YouTube links in all the shapes found in the input spreadsheets.
+
+    :param count: (int) The number of links
+    :param seed: (int) The seed of the random generator
+    :return: (list) The links
+    """
+    random_generator = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_'
+    shapes = (
+        '{video_id}',
+        'https://www.youtube.com/watch?v={video_id}',
+        'https://www.youtube.com/watch?v={video_id}&t=42s&list=PL0123456789',
+        'https://youtu.be/{video_id}',
+        'https://youtu.be/{video_id}?si=abcdefgh',
+        'https://m.youtube.com/watch?feature=share&v={video_id}',
+    )
+    return [
+        random_generator.choice(shapes).format(
+            video_id=''.join(random_generator.choice(alphabet) for _ in range(11)),
+        )
+        for _ in range(count)
+    ]
+
+
+@benchmark('get_video_id_from_youtube_link[10000 links]')
+def get_video_id_from_youtube_link():
+    from youtube_video_enricher import get_video_id_from_youtube_link
+
+    video_links = build_video_links(10000)
+    return lambda: [get_video_id_from_youtube_link(video_link) for video_link in video_links]
+
+
+def build_video_data(video_id):
+    return {
+        'video_id': video_id,
+        'available_languages': ['en', 'de'],
+        'available_audiotracks': ['English (United States) original'],
+        'views': 123456,
+        'title': 'Benchmark video {video_id}'.format(video_id=video_id),
+    }
+
+
+@benchmark('add_new_columns_to_df[2000 rows, mocked fetches]')
+def add_new_columns_to_df():
+    import pandas as pd
+
+    import youtube_video_enricher
+
+    df = pd.DataFrame({'Video Link': build_video_links(2000), 'Channel Name': 'channel'})
+    cache_folder = tempfile.mkdtemp()
+    patcher = mock.patch.object(youtube_video_enricher, 'fetch_important_video_data', autospec=True)
+
+    def run():
+        # every run starts with an empty cache, so every video is fetched and cached
+        shutil.rmtree(cache_folder, ignore_errors=True)
+        with patcher as fetch_important_video_data:
+            fetch_important_video_data.side_effect = lambda video_link, **kwargs: build_video_data(
+                youtube_video_enricher.get_video_id_from_youtube_link(video_link)
+            )
+            youtube_video_enricher.add_new_columns_to_df(
+                df, ['Video Link'], 'Channel Name', cache_folder=cache_folder, requests_per_second=0,
+            )
+    return run, lambda: shutil.rmtree(cache_folder, ignore_errors=True)
+
+
+@benchmark('add_channel_data_to_df[20000 rows, 500 channels, mocked fetches]')
+def add_channel_data_to_df():
+    import pandas as pd
+
+    import main
+    from benchmarks.channel_merge import build_channel_data
+
+    channel_data = build_channel_data(500)
+    df = pd.DataFrame({
+        'Channel Name': [f"channel {i % 500}" for i in range(20000)],
+        'Video Link': build_video_links(20000),
+    })
+    cache_folder = tempfile.mkdtemp()
+    patcher = mock.patch.object(
+        main, 'get_details_channel_info', autospec=True,
+        side_effect=lambda language=None, channel_name=None: channel_data[channel_name],
+    )
+
+    def run():
+        shutil.rmtree(cache_folder, ignore_errors=True)
+        with patcher:
+            main.add_channel_data_to_df(df, 'Channel Name', cache_folder=cache_folder)
+    return run, lambda: shutil.rmtree(cache_folder, ignore_errors=True)
+
+
+def time_benchmark(setup, repeat):
+    """
+    Times a benchmark. The number of calls per measurement is chosen so that a measurement takes at least 0.2 seconds.
+
+    :param setup: (function) The setup function registered with `benchmark`
+    :param repeat: (int) The number of measurements
+    :return: (float) The best time per call in seconds
+    """
+    result = setup()
+    run, teardown = result if isinstance(result, tuple) else (result, None)
+    try:
+        # the pipeline functions log their progress, the log records should neither be timed nor clutter the report
+        logging.disable(logging.INFO)
+        with contextlib.redirect_stdout(io.StringIO()):
+            timer = timeit.Timer(run)
+            number, _ = timer.autorange()
+            return min(timer.repeat(repeat=repeat, number=number)) / number
+    finally:
+        logging.disable(logging.NOTSET)
+        if teardown is not None:
+            teardown()
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(path, timings):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(timings, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def format_duration(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.2f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.2f} us"
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Runs the micro-benchmarks and compares them against the baselines.')
+    parser.add_argument('--filter', default='', help='Only run the benchmarks whose name contains this string.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of measurements per benchmark.')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='The share a benchmark may be slower than its baseline before it counts as a regression.',
+    )
+    parser.add_argument('--baselines', default=BASELINES_PATH, help='The JSON file the baselines are stored in.')
+    parser.add_argument('--save', action='store_true', help='Store the timings as the new baselines.')
+    parsed_args = parser.parse_args(args)
+
+    baselines = load_baselines(parsed_args.baselines)
+    timings = {}
+    failed = False
+    for name, setup in BENCHMARKS.items():
+        if parsed_args.filter not in name:
+            continue
+        seconds = timings[name] = time_benchmark(setup, parsed_args.repeat)
+        baseline = baselines.get(name)
+        if baseline is None:
+            status, comparison = 'NEW ', ''
+        else:
+            ok = seconds <= baseline * (1 + parsed_args.tolerance)
+            failed = failed or not ok
+            status = 'OK  ' if ok or parsed_args.save else 'FAIL'
+            comparison = f" ({seconds / baseline:5.2f}x baseline {format_duration(baseline).strip()})"
+        print(f"{status} {name:<68} {format_duration(seconds)}{comparison}")
+
+    if parsed_args.save:
+        save_baselines(parsed_args.baselines, dict(baselines, **timings))
+        print(f"saved {len(timings)} baselines to {parsed_args.baselines}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
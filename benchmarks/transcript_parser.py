@@ -0,0 +1,104 @@
+"""
+Benchmark of parsing timedtext XML with `_TranscriptParser`, on synthetic multi-hour transcripts with tens of thousands
+of cues. It compares the incremental parser, returning dictionaries or compact `TranscriptSegments`, against the former
+`ElementTree.fromstring` based one and checks that all of them produce identical output::
+
+    python -m benchmarks.transcript_parser --cues 40000
+"""
+import argparse
+import random
+import re
+import timeit
+import tracemalloc
+
+from xml.etree import ElementTree
+
+from youtube_transcript_api._html_unescaping import unescape
+from youtube_transcript_api._transcripts import _TranscriptParser, _HTML_REGEX, _HTML_REGEX_PRESERVING_FORMATTING
+
+
+WORDS = (
+    'so today we are going to talk about how the transcript parser works and why it matters for long videos '
+    'with many cues'
+).split()
+
+
+def build_timedtext(cues, seed=0):
+    """
+    Builds a synthetic timedtext document. Most cues are plain text, some contain double escaped entities and some
+    contain formatting tags, like the documents served by YouTube.
+
+    :param cues: (int) The number of cues
+    :param seed: (int) The seed of the random generator
+    :return: (str) The timedtext XML
+    """
+    random_generator = random.Random(seed)
+    lines = ['<?xml version="1.0" encoding="utf-8" ?><transcript>']
+    for i in range(cues):
+        text = ' '.join(random_generator.choice(WORDS) for _ in range(random_generator.randint(4, 12)))
+        kind = random_generator.random()
+        if kind < 0.05:
+            text += ' it&amp;#39;s'
+        elif kind < 0.08:
+            text = '&lt;i&gt;' + text + '&lt;/i&gt;'
+        elif kind < 0.09:
+            text = '&lt;font color="#E5E5E5"&gt;' + text + '&lt;/font&gt;'
+        lines.append('<text start="{start:.2f}" dur="{duration:.2f}">{text}</text>'.format(
+            start=i * 1.5, duration=random_generator.uniform(0.5, 4.0), text=text,
+        ))
+    lines.append('</transcript>')
+    return '\n'.join(lines)
+
+
+def legacy_parse(plain_data, preserve_formatting=False):
+    html_regex = _HTML_REGEX_PRESERVING_FORMATTING if preserve_formatting else _HTML_REGEX
+    return [
+        {
+            'text': re.sub(html_regex, '', unescape(xml_element.text)),
+            'start': float(xml_element.attrib['start']),
+            'duration': float(xml_element.attrib.get('dur', '0.0')),
+        }
+        for xml_element in ElementTree.fromstring(plain_data)
+        if xml_element.text is not None
+    ]
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks parsing long timedtext transcripts.')
+    parser.add_argument('--cues', type=int, default=40000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parsed_args = parser.parse_args(args)
+
+    plain_data = build_timedtext(parsed_args.cues)
+    print(f"{parsed_args.cues} cues, {len(plain_data) / 1e6:.1f} MB of XML")
+
+    for preserve_formatting in (False, True):
+        implementations = [
+            ('legacy', lambda: legacy_parse(plain_data, preserve_formatting)),
+            ('current', lambda: _TranscriptParser(preserve_formatting=preserve_formatting).parse(plain_data)),
+            ('compact', lambda: _TranscriptParser(preserve_formatting=preserve_formatting).parse(plain_data, True)),
+        ]
+        expected = implementations[0][1]()
+        assert all(implementation() == expected for _, implementation in implementations), \
+            'parsers produce different output'
+
+        # the timings are taken before tracing the memory allocations, since tracemalloc slows down later runs
+        timings = [
+            min(timeit.repeat(implementation, number=1, repeat=parsed_args.repeat))
+            for _, implementation in implementations
+        ]
+        for (name, implementation), seconds in zip(implementations, timings):
+            print(f"preserve_formatting={preserve_formatting!s:5} {name:>7}: {seconds * 1000:7.1f} ms, "
+                  f"peak {peak_memory(implementation) / 1e6:5.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
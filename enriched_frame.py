@@ -0,0 +1,270 @@
+import ast
+import os
+
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+LIST_COLUMN_PREFIXES = ('available_languages_', 'available_audiotracks_')
+COUNT_COLUMN_PREFIXES = ('views_',)
+
+CHANNEL_COUNT_COLUMNS = ('Subscribers', 'Views', 'Total Videos')
+CHANNEL_DATE_COLUMNS = ('Created At', 'Published At')
+CHANNEL_CATEGORY_COLUMNS = ('Channel Name', 'Channel ID', 'Channel Title', 'Latest Video Title', 'Latest_Video URL')
+CHANNEL_TEXT_COLUMNS = ('Description',)
+
+
+def is_parquet_path(path):
+    """
+    Checks if a path refers to a Parquet file, based on its extension.
+
+    :param path: (str) The path of the file
+    :return: (bool) True if the file is a Parquet file, False if it is treated as CSV
+    """
+    return os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS
+
+
+def read_table(path):
+    """
+    Reads a CSV or Parquet file into a DataFrame.
+
+    :param path: (str) The path of the file, files ending with .parquet or .pq are read as Parquet
+    :return: (pandas.DataFrame) The loaded DataFrame
+    """
+    import pandas as pd
+
+    if is_parquet_path(path):
+        return pd.read_parquet(path, engine='pyarrow')
+    return pd.read_csv(path)
+
+
+def write_table(df, path, video_link_columns=()):
+    """
+    Writes a DataFrame to a CSV or Parquet file. Parquet files are written with native types: the language and audio
+    track columns as list<string>, views and counts as int64 and dates as timestamps.
+
+    :param df: (pandas.DataFrame) The DataFrame to write
+    :param path: (str) The path of the file, files ending with .parquet or .pq are written as Parquet
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
+    """
+    if not is_parquet_path(path):
+        df.to_csv(path, index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = normalize_enriched_dtypes(df, video_link_columns)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for column in enriched_list_columns(df, video_link_columns):
+        table = table.set_column(
+            table.schema.get_field_index(column),
+            column,
+            pa.array(df[column].tolist(), type=pa.list_(pa.string())),
+        )
+    pq.write_table(table, path)
+
+
+def enriched_list_columns(df, video_link_columns):
+    """
+    Lists the enriched columns which hold lists of strings.
+
+    :param df: (pandas.DataFrame) The enriched DataFrame
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
+    :return: (list) The names of the list columns which are present in the DataFrame
+    """
+    return [
+        prefix + column
+        for column in video_link_columns
+        for prefix in LIST_COLUMN_PREFIXES
+        if prefix + column in df.columns
+    ]
+
+
+def enriched_count_columns(df, video_link_columns):
+    """
+    Lists the enriched and channel columns which hold counts.
+
+    :param df: (pandas.DataFrame) The enriched DataFrame
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
+    :return: (list) The names of the count columns which are present in the DataFrame
+    """
+    return [
+        prefix + column
+        for column in video_link_columns
+        for prefix in COUNT_COLUMN_PREFIXES
+        if prefix + column in df.columns
+    ] + [column for column in CHANNEL_COUNT_COLUMNS if column in df.columns]
+
+
+def normalize_enriched_dtypes(df, video_link_columns):
+    """
+    Converts the enriched columns to their native types. Lists which were stringified by a CSV round trip are parsed
+    again, counts become nullable Int64 and dates become timezone aware timestamps.
+
+    :param df: (pandas.DataFrame) The enriched DataFrame
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
+    :return: (pandas.DataFrame) A copy of the DataFrame with normalized column types
+    """
+    import pandas as pd
+
+    df = df.copy()
+    for column in enriched_list_columns(df, video_link_columns):
+        df[column] = df[column].map(_parse_string_list).astype(object)
+    for column in enriched_count_columns(df, video_link_columns):
+        df[column] = pd.to_numeric(df[column], errors='coerce').round().astype('Int64')
+    for column in CHANNEL_DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors='coerce', utc=True)
+    return df
+
+
+def compact_enriched_frame(df, channel_name_column=None, video_link_columns=(), channel_text='keep'):
+    """
+    Converts an enriched DataFrame to compact dtypes. The channel level strings, which are repeated for every video of
+    a channel, become categoricals, counts become nullable Int64 and dates become datetime64.
+
+    :param df: (pandas.DataFrame) The enriched DataFrame
+    :param channel_name_column: (str, optional) Name of the column containing channel names
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
+    :param channel_text: (str) What to do with large free text channel fields like the description. 'keep' leaves
+    them in the DataFrame as categoricals, 'drop' removes them and 'split' moves them into a separate channel table
+    :return: (tuple) The compacted DataFrame and the channel table, which is None unless channel_text is 'split'
+    """
+    if channel_text not in ('keep', 'drop', 'split'):
+        raise ValueError(f"channel_text must be one of 'keep', 'drop' or 'split', not {channel_text!r}")
+
+    df = normalize_enriched_dtypes(df, video_link_columns)
+
+    text_columns = [column for column in CHANNEL_TEXT_COLUMNS if column in df.columns]
+    channel_table = None
+    if channel_text == 'split' and channel_name_column and text_columns:
+        channel_table = (
+            df[[channel_name_column] + text_columns]
+            .dropna(subset=[channel_name_column])
+            .drop_duplicates(subset=[channel_name_column])
+            .reset_index(drop=True)
+        )
+    if channel_text != 'keep':
+        df = df.drop(columns=text_columns)
+
+    category_columns = [column for column in CHANNEL_CATEGORY_COLUMNS + CHANNEL_TEXT_COLUMNS if column in df.columns]
+    if channel_name_column and channel_name_column in df.columns and channel_name_column not in category_columns:
+        category_columns.append(channel_name_column)
+    for column in category_columns:
+        df[column] = df[column].astype('category')
+
+    return df, channel_table
+
+
+def row_fingerprints(df, columns):
+    """
+    Hashes the values of some columns of every row. Categorical and string columns with equal values have equal
+    fingerprints, so a frame can be compared with one which has been through a CSV or Parquet round trip.
+
+    :param df: (pandas.DataFrame) The DataFrame
+    :param columns: (list) The columns which are hashed
+    :return: (pandas.Series) The uint64 fingerprint of every row, with the index of the DataFrame
+    """
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(df[list(columns)].astype('string'), index=False)
+
+
+def split_changed_rows(df, previous_df, columns, failure_columns=None):
+    """
+    Splits the rows of an input DataFrame into the rows which are new or whose `columns` changed since the previous
+    enriched output, and the unchanged rows, which get the enriched columns of their previous output. Only the changed
+    rows have to be enriched again, see `merge_changed_rows`. Rows whose enrichment failed in the previous output count
+    as changed, so they are retried.
+
+    :param df: (pandas.DataFrame) The input DataFrame
+    :param previous_df: (pandas.DataFrame) The previous enriched output
+    :param columns: (list) The columns the enrichment depends on, like the video link and channel name columns
+    :param failure_columns: (dict, optional) Maps input columns onto an enriched column which is missing if the
+        enrichment of the input value failed, like 'Video Link' onto 'available_languages_Video Link'
+    :return: (tuple) The changed rows of `df`, and the unchanged rows of `df` together with their enriched columns
+    """
+    import pandas as pd
+
+    columns = [column for column in columns if column in df.columns]
+    if any(column not in previous_df.columns for column in columns):
+        # the previous output was enriched from other columns, so every row has changed
+        return df, df.iloc[:0]
+
+    failed = pd.Series(False, index=previous_df.index)
+    for column, failure_column in (failure_columns or {}).items():
+        if column in previous_df.columns and failure_column in previous_df.columns:
+            failed |= previous_df[column].notna() & previous_df[failure_column].isna()
+    previous_df = previous_df[~failed]
+
+    enriched_columns = [column for column in previous_df.columns if column not in df.columns]
+    previous_rows = previous_df[enriched_columns].set_axis(row_fingerprints(previous_df, columns).to_numpy())
+    previous_rows = previous_rows[~previous_rows.index.duplicated(keep='last')]
+
+    fingerprints = row_fingerprints(df, columns)
+    unchanged = fingerprints.isin(previous_rows.index)
+    carried_rows = previous_rows.reindex(fingerprints[unchanged].to_numpy()).set_axis(df.index[unchanged])
+    return df[~unchanged], pd.concat([df[unchanged], carried_rows], axis=1)
+
+
+def join_channel_table(df, channel_table, channel_name_column):
+    """
+    Adds the columns of a channel table written by `compact_enriched_frame` with channel_text='split' back to the rows
+    of their channels, for example to the previous output of an incremental run.
+
+    :param df: (pandas.DataFrame) The enriched DataFrame without the channel table columns
+    :param channel_table: (pandas.DataFrame) The channel table
+    :param channel_name_column: (str) Name of the column containing channel names
+    :return: (pandas.DataFrame) The DataFrame with the columns of the channel table which it does not have yet
+    """
+    if channel_name_column not in df.columns or channel_name_column not in channel_table.columns:
+        return df
+    channel_table = channel_table.drop_duplicates(subset=[channel_name_column]).set_index(channel_name_column)
+    channel_names = df[channel_name_column].astype(object)
+    return df.assign(**{
+        column: channel_names.map(channel_table[column]) for column in channel_table.columns if column not in df.columns
+    })
+
+
+def merge_changed_rows(enriched_df, carried_df):
+    """
+    Merges the enriched changed rows with the unchanged rows returned by `split_changed_rows`, in the order of the
+    input DataFrame.
+
+    :param enriched_df: (pandas.DataFrame) The enriched changed rows
+    :param carried_df: (pandas.DataFrame) The unchanged rows with their previous enriched columns
+    :return: (pandas.DataFrame) All rows of the input DataFrame with their enriched columns
+    """
+    import pandas as pd
+
+    if carried_df.empty:
+        return enriched_df
+    if enriched_df.empty:
+        return carried_df.reindex(columns=list(enriched_df.columns) + [
+            column for column in carried_df.columns if column not in enriched_df.columns
+        ])
+    return pd.concat([enriched_df, carried_df]).sort_index(kind='stable')
+
+
+def memory_usage_bytes(df):
+    """
+    Measures the memory used by a DataFrame, including the contents of object columns.
+
+    :param df: (pandas.DataFrame) The DataFrame to measure
+    :return: (int) The memory usage in bytes
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _parse_string_list(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    if hasattr(value, 'tolist'):
+        return [str(item) for item in value.tolist()]
+    if isinstance(value, str):
+        try:
+            parsed_value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return [value]
+        return _parse_string_list(parsed_value) if isinstance(parsed_value, (list, tuple)) else [value]
+    return None
@@ -1,21 +1,27 @@
+import logging
 import os
-import pandas as pd
-import tkinter as tk
-from tkinter import filedialog
-from youtube_channel_info_retriever import get_details_channel_info
+from enriched_frame import read_table, write_table
+from youtube_channel_info_retriever import get_details_channel_info, load_config
 from youtube_video_enricher import add_new_columns_to_df
+from youtube_transcript_api import metrics
+from progress import ProgressReporter
 import json
 
+logger = logging.getLogger(__name__)
+
 
 def select_file():
     """
-    Opens a file dialog for the user to select a CSV file.
+    Opens a file dialog for the user to select a CSV or Parquet file.
 
     :return: (str) The path of the selected file
     """
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
-    file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+    file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet *.pq")])
     return file_path
 
 
@@ -62,55 +68,74 @@ def map_columns(df):
     return video_link_columns, channel_name_column
 
 
-def save_file(df):
+def save_file(df, video_link_columns=()):
     """
     Prompts the user to select a location to save the enriched DataFrame.
 
     :param df: (pandas.DataFrame) The enriched DataFrame to save
+    :param video_link_columns: (list) The video link columns the enriched columns were derived from
     """
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
-    file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".csv",
+        filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")],
+    )
     if file_path:
-        df.to_csv(file_path, index=False)
+        write_table(df, file_path, video_link_columns)
         print(f"File saved successfully at: {file_path}")
     else:
         print("File not saved.")
 
 
-def add_channel_data_to_df(df, channel_name_column):
+def add_channel_data_to_df(df, channel_name_column, cache_folder="cached_channels", stats=None):
     """
     Adds channel data to the DataFrame, using caching for efficiency.
 
     :param df: (pandas.DataFrame) The input DataFrame
     :param channel_name_column: (str) Name of the column containing channel names
+    :param cache_folder: (str) Folder in which the retrieved channel data is cached
+    :param stats: (dict, optional) Dictionary which is updated with the number of cache hits, cache misses and failures
     :return: (pandas.DataFrame) The updated DataFrame with new channel data columns
     """
-    cache_folder = "cached_channels"
     os.makedirs(cache_folder, exist_ok=True)
+    stats = stats if stats is not None else {}
+    for counter in ('channel_cache_hits', 'channel_cache_misses', 'channel_failures'):
+        stats.setdefault(counter, 0)
 
     def get_cached_channel_info(channel_name):
         """Helper function to get or create cached channel info"""
         filename = os.path.join(cache_folder, f"{channel_name.replace(' ', '_').lower()}.json")
 
         if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                json_data = json.load(f)
-
-                if json_data and json_data.get("Channel ID", None) is not None:
-                    print("I used my cached system")
-                    return json_data
-
-                #return json.load(f)
-
+            with metrics.time('channel_cache_lookup'):
+                with open(filename, 'r') as f:
+                    json_data = json.load(f)
+
+            if json_data and json_data.get("Channel ID", None) is not None:
+                logger.debug("Using the cached channel info of %r", channel_name)
+                stats['channel_cache_hits'] += 1
+                metrics.increment('cache_hits', cache='channels')
+                return json_data
+
+        stats['channel_cache_misses'] += 1
+        metrics.increment('cache_misses', cache='channels')
         channel_info = get_details_channel_info(channel_name=channel_name, language="EN")
+        if not channel_info or channel_info.get("Channel ID") is None:
+            stats['channel_failures'] += 1
 
         if channel_info:
-            with open(filename, 'w') as f:
-                json.dump(channel_info, f)
+            with metrics.time('channel_cache_store'):
+                with open(filename, 'w') as f:
+                    json.dump(channel_info, f)
 
         return channel_info
 
+    import pandas as pd
+
     # Get unique channel names to avoid redundant API calls
     unique_channels = df[channel_name_column].unique()
 
@@ -118,30 +143,68 @@ def add_channel_data_to_df(df, channel_name_column):
     channel_data = {}
 
     # Fetch data for each unique channel
+    progress = ProgressReporter("channels", len(unique_channels))
     for channel_name in unique_channels:
+        failures = stats['channel_failures']
         if pd.notna(channel_name):
             channel_info = get_cached_channel_info(channel_name)
             if channel_info:
                 channel_data[channel_name] = channel_info
+        progress.update(
+            errors=stats['channel_failures'] - failures,
+            cache_hits=stats['channel_cache_hits'],
+            cache_misses=stats['channel_cache_misses'],
+        )
+    progress.finish()
 
     # Add new columns to the DataFrame
     if channel_data:
-        # Get all possible keys from the channel data
-        all_keys = set().union(*(d.keys() for d in channel_data.values()))
+        with metrics.time('dataframe_assembly'):
+            df = join_channel_data(df, channel_name_column, channel_data)
         latest_video_column_name = "Latest_Video URL"
-
-        # Create new columns for each key
-        for key in all_keys:
-            col_name = f"{key}"
-            df[col_name] = df[channel_name_column].map(lambda x: channel_data.get(x, {}).get(key, None))
     else:
-        print("No channel data found.")
+        logger.warning("No channel data found.")
         latest_video_column_name = None
 
     return df, latest_video_column_name
 
 
+def join_channel_data(df, channel_name_column, channel_data):
+    """
+    Adds a column for every key of the channel data to the DataFrame, using a single merge on the channel column.
+    Rows whose channel has no channel data get missing values.
+
+    :param df: (pandas.DataFrame) The input DataFrame
+    :param channel_name_column: (str) Name of the column containing channel names
+    :param channel_data: (dict) Dictionary mapping channel names onto their channel info dictionaries
+    :return: (pandas.DataFrame) The DataFrame with the channel data columns
+    """
+    import pandas as pd
+
+    channel_key_column = "__channel_key__"
+    channel_df = pd.DataFrame.from_dict(channel_data, orient='index').astype(object)
+    channel_df.index.name = channel_key_column
+
+    channel_columns = (
+        df[[channel_name_column]]
+        .rename(columns={channel_name_column: channel_key_column})
+        .merge(channel_df.reset_index(), how='left', on=channel_key_column, sort=False)
+        .drop(columns=channel_key_column)
+    )
+
+    channel_columns.index = df.index
+
+    # columns which already exist are overwritten in place, all others are appended at once
+    existing_columns = [column for column in channel_columns.columns if column in df.columns]
+    for column in existing_columns:
+        df[column] = channel_columns[column]
+    return pd.concat([df, channel_columns.drop(columns=existing_columns)], axis=1)
+
+
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    load_config()
+
     # Select input file
     input_file = select_file()
     if not input_file:
@@ -149,8 +212,8 @@ def main():
         return
     print("Selected file:", input_file)
 
-    # Read the CSV file
-    df = pd.read_csv(input_file)
+    # Read the CSV or Parquet file
+    df = read_table(input_file)
 
     # Map columns
     video_link_columns, channel_name_column = map_columns(df)
@@ -160,17 +223,15 @@ def main():
 
     # Enrich data
     if latest_video_column_name:
-        print("latest_video_column_name : ", latest_video_column_name)
+        logger.debug("latest_video_column_name: %s", latest_video_column_name)
         video_link_columns.append(latest_video_column_name)
-    print("channel_info_df columns : \n", channel_info_df.columns)
-
-    print()
-    print("video_link_columns : ", video_link_columns)
+    logger.debug("channel_info_df columns: %s", list(channel_info_df.columns))
+    logger.debug("video_link_columns: %s", video_link_columns)
 
     enriched_df = add_new_columns_to_df(channel_info_df, video_link_columns, channel_name_column)
 
     # Save enriched data
-    save_file(enriched_df)
+    save_file(enriched_df, video_link_columns)
 
 
 if __name__ == "__main__":
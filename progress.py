@@ -0,0 +1,106 @@
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def format_duration(seconds):
+    """
+    Formats a duration for the progress line.
+
+    :param seconds: (float) The duration in seconds
+    :return: (str) The duration like "1h02m", "4m05s" or "12s"
+    """
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """
+    Logs a single progress line, at most once every `interval` seconds, instead of one line per processed item. The
+    line shows the items done, items per second, the estimated time remaining, the cache hit rate and the number of
+    errors::
+
+        videos 1200/5000 (24%) 3.1/s ETA 20m26s cache hit rate 61% errors 3
+    """
+
+    # the interval used when none is passed, entry points can change it for the whole run
+    default_interval = 5.0
+
+    def __init__(self, description, total, cache_hits=0, cache_misses=0, interval=None, clock=time.monotonic):
+        """
+        :param description: (str) What is processed, like "videos"
+        :param total: (int) The number of items which are processed
+        :param cache_hits: (int) The number of items which were found in the cache and need no processing
+        :param cache_misses: (int) The number of items which were not found in the cache
+        :param interval: (float, optional) The minimum number of seconds between two progress lines, defaults to
+            `default_interval`
+        :param clock: (function) The monotonic clock, which can be replaced in tests
+        """
+        self.description = description
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.interval = self.default_interval if interval is None else interval
+        self._clock = clock
+        self._start = clock()
+        self._last_report = self._start
+        self._reported_done = None
+
+    def update(self, done=1, errors=0, cache_hits=None, cache_misses=None):
+        """
+        Counts processed items and logs the progress line if the last one is at least `interval` seconds old.
+
+        :param done: (int) The number of items which have been processed
+        :param errors: (int) The number of these items which failed
+        :param cache_hits: (int, optional) The total number of cache hits so far, if it is counted while processing
+        :param cache_misses: (int, optional) The total number of cache misses so far
+        """
+        self.done += done
+        self.errors += errors
+        if cache_hits is not None:
+            self.cache_hits = cache_hits
+        if cache_misses is not None:
+            self.cache_misses = cache_misses
+        now = self._clock()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._reported_done = self.done
+            logger.info(self.format_line(now))
+
+    def finish(self):
+        """
+        Logs the final progress line, unless there was nothing to process or it has already been logged.
+        """
+        if self.total and self._reported_done != self.done:
+            logger.info(self.format_line(self._clock()))
+
+    def format_line(self, now):
+        """
+        :param now: (float) The current time of the clock
+        :return: (str) The progress line
+        """
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        parts = [f"{self.description} {self.done}/{self.total}"]
+        if self.total:
+            parts.append(f"({self.done / self.total:.0%})")
+        parts.append(f"{rate:.1f}/s")
+        if self.done < self.total:
+            parts.append("ETA " + (format_duration((self.total - self.done) / rate) if rate else "?"))
+        else:
+            parts.append("in " + format_duration(elapsed))
+        lookups = self.cache_hits + self.cache_misses
+        if lookups:
+            parts.append(f"cache hit rate {self.cache_hits / lookups:.0%}")
+        parts.append(f"errors {self.errors}")
+        return " ".join(parts)
@@ -0,0 +1,238 @@
+from unittest import TestCase
+
+import os
+
+import shutil
+
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from enriched_frame import (
+    compact_enriched_frame, join_channel_table, memory_usage_bytes, merge_changed_rows, normalize_enriched_dtypes,
+    read_table, row_fingerprints, split_changed_rows, write_table,
+)
+
+
+def enriched_frame():
+    return pd.DataFrame({
+        'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', None],
+        'Channel Name': ['Channel A', 'Channel B', 'Channel A'],
+        'video_id_Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', None],
+        'available_languages_Video Link': [['en', 'de'], [], None],
+        'available_audiotracks_Video Link': [['en'], [], None],
+        'views_Video Link': [1200, None, None],
+        'title_Video Link': ['Title A', 'Title B', None],
+        'Subscribers': [10, 20, 10],
+        'Created At': ['2020-01-02T03:04:05Z', '2021-05-06T07:08:09Z', '2020-01-02T03:04:05Z'],
+        'Description': ['A long description ' * 10, 'Another description', 'A long description ' * 10],
+    })
+
+
+class TestParquet(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_round_trip(self):
+        path = os.path.join(self.directory, 'enriched.parquet')
+
+        write_table(enriched_frame(), path, ['Video Link'])
+        df = read_table(path)
+
+        schema = pq.read_schema(path)
+        self.assertEqual(schema.field('available_languages_Video Link').type, pa.list_(pa.string()))
+        self.assertEqual(schema.field('available_audiotracks_Video Link').type, pa.list_(pa.string()))
+        self.assertEqual(schema.field('views_Video Link').type, pa.int64())
+        self.assertEqual(schema.field('Subscribers').type, pa.int64())
+        self.assertTrue(pa.types.is_timestamp(schema.field('Created At').type))
+        self.assertEqual(list(df['available_languages_Video Link'][0]), ['en', 'de'])
+        self.assertEqual(list(df['available_languages_Video Link'][1]), [])
+        self.assertIsNone(df['available_languages_Video Link'][2])
+        self.assertEqual(df['views_Video Link'][0], 1200)
+        self.assertTrue(pd.isna(df['views_Video Link'][1]))
+        self.assertEqual(df['Created At'][1], pd.Timestamp('2021-05-06T07:08:09Z'))
+
+    def test_csv_written_before_parquet_support(self):
+        csv_path = os.path.join(self.directory, 'enriched.csv')
+        enriched_frame().to_csv(csv_path, index=False)
+        parquet_path = os.path.join(self.directory, 'enriched.pq')
+
+        write_table(read_table(csv_path), parquet_path, ['Video Link'])
+        df = read_table(parquet_path)
+
+        self.assertEqual(list(df['available_languages_Video Link'][0]), ['en', 'de'])
+        self.assertEqual(list(df['available_audiotracks_Video Link'][1]), [])
+        self.assertIsNone(df['available_languages_Video Link'][2])
+        self.assertEqual(df['views_Video Link'][0], 1200)
+
+
+class TestNormalizeEnrichedDtypes(TestCase):
+    def test_normalize_enriched_dtypes(self):
+        df = enriched_frame()
+        df['available_languages_Video Link'] = ["['en', 'de']", '[]', 'en']
+        df['views_Video Link'] = ['1200.0', 'not a number', None]
+
+        normalized_df = normalize_enriched_dtypes(df, ['Video Link'])
+
+        self.assertEqual(normalized_df['available_languages_Video Link'].tolist(), [['en', 'de'], [], ['en']])
+        self.assertEqual(str(normalized_df['views_Video Link'].dtype), 'Int64')
+        self.assertEqual(normalized_df['views_Video Link'][0], 1200)
+        self.assertTrue(pd.isna(normalized_df['views_Video Link'][1]))
+        self.assertTrue(isinstance(normalized_df['Created At'].dtype, pd.DatetimeTZDtype))
+        # the input is not modified
+        self.assertEqual(df['views_Video Link'][0], '1200.0')
+
+
+class TestCompactEnrichedFrame(TestCase):
+    def test_keep(self):
+        df, channel_table = compact_enriched_frame(enriched_frame(), 'Channel Name', ['Video Link'])
+
+        self.assertIsNone(channel_table)
+        self.assertEqual(df['Channel Name'].dtype, 'category')
+        self.assertEqual(df['Description'].dtype, 'category')
+        self.assertEqual(str(df['views_Video Link'].dtype), 'Int64')
+        self.assertEqual(str(df['Subscribers'].dtype), 'Int64')
+        self.assertEqual(df['Channel Name'].tolist(), ['Channel A', 'Channel B', 'Channel A'])
+
+    def test_drop(self):
+        df, channel_table = compact_enriched_frame(enriched_frame(), 'Channel Name', ['Video Link'], 'drop')
+
+        self.assertIsNone(channel_table)
+        self.assertNotIn('Description', df.columns)
+
+    def test_split(self):
+        df, channel_table = compact_enriched_frame(enriched_frame(), 'Channel Name', ['Video Link'], 'split')
+
+        self.assertNotIn('Description', df.columns)
+        self.assertEqual(channel_table.columns.tolist(), ['Channel Name', 'Description'])
+        self.assertEqual(channel_table['Channel Name'].tolist(), ['Channel A', 'Channel B'])
+        self.assertEqual(channel_table['Description'][1], 'Another description')
+
+    def test_invalid_channel_text(self):
+        with self.assertRaises(ValueError):
+            compact_enriched_frame(enriched_frame(), 'Channel Name', ['Video Link'], 'remove')
+
+    def test_memory_usage_bytes(self):
+        df = enriched_frame()
+        compact_df, _ = compact_enriched_frame(df, 'Channel Name', ['Video Link'])
+
+        self.assertEqual(memory_usage_bytes(df), int(df.memory_usage(deep=True).sum()))
+        # the contents of object columns are counted, not just their pointers
+        self.assertGreater(memory_usage_bytes(df), df.memory_usage(deep=False).sum())
+        self.assertLess(memory_usage_bytes(compact_df[['Description']]), memory_usage_bytes(df[['Description']]))
+
+
+class TestIncremental(TestCase):
+    columns = ['Video Link', 'Channel Name']
+
+    def previous_output(self):
+        return pd.DataFrame({
+            'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'],
+            'Channel Name': ['Channel A', 'Channel B', None],
+            'views_Video Link': [1, 2, 3],
+        })
+
+    def test_row_fingerprints__survive_a_csv_round_trip(self):
+        df = pd.DataFrame({
+            'Video Link': ['aaaaaaaaaaa', None, 'ccccccccccc'],
+            'Channel Name': ['Channel A', 'Channel B', 'Channel A'],
+            'Views': [1, 2, None],
+        })
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'output.csv')
+        df.to_csv(path, index=False)
+        csv_df = pd.read_csv(path)
+        categorical_df = df.astype({'Channel Name': 'category'})
+
+        fingerprints = row_fingerprints(df, self.columns + ['Views']).tolist()
+        self.assertEqual(row_fingerprints(csv_df, self.columns + ['Views']).tolist(), fingerprints)
+        self.assertEqual(row_fingerprints(categorical_df, self.columns + ['Views']).tolist(), fingerprints)
+        self.assertEqual(len(set(fingerprints)), 3)
+
+    def test_split_changed_rows(self):
+        df = pd.DataFrame({
+            'Video Link': ['ccccccccccc', 'bbbbbbbbbbb', 'ddddddddddd', 'aaaaaaaaaaa'],
+            'Channel Name': [None, 'Channel C', 'Channel D', 'Channel A'],
+        })
+
+        changed_df, carried_df = split_changed_rows(df, self.previous_output(), self.columns)
+
+        # a new row and a row whose channel changed
+        self.assertEqual(changed_df.index.tolist(), [1, 2])
+        self.assertEqual(carried_df.index.tolist(), [0, 3])
+        self.assertEqual(carried_df['views_Video Link'].tolist(), [3, 1])
+        self.assertEqual(carried_df.columns.tolist(), ['Video Link', 'Channel Name', 'views_Video Link'])
+
+    def test_split_changed_rows__duplicate_links(self):
+        previous_df = pd.concat([self.previous_output(), self.previous_output().iloc[:1].assign(**{
+            'views_Video Link': 10,
+        })], ignore_index=True)
+        df = pd.DataFrame({'Video Link': ['aaaaaaaaaaa', 'aaaaaaaaaaa'], 'Channel Name': ['Channel A', 'Channel A']})
+
+        changed_df, carried_df = split_changed_rows(df, previous_df, self.columns)
+
+        self.assertTrue(changed_df.empty)
+        # every duplicate gets the last enrichment of its row
+        self.assertEqual(carried_df['views_Video Link'].tolist(), [10, 10])
+
+    def test_split_changed_rows__all_unchanged(self):
+        df = self.previous_output()[self.columns]
+
+        changed_df, carried_df = split_changed_rows(df, self.previous_output(), self.columns)
+
+        self.assertTrue(changed_df.empty)
+        pd.testing.assert_frame_equal(carried_df, self.previous_output())
+        pd.testing.assert_frame_equal(
+            merge_changed_rows(changed_df.assign(**{'views_Video Link': []}), carried_df), self.previous_output(),
+        )
+
+    def test_split_changed_rows__missing_column(self):
+        df = self.previous_output()[self.columns]
+
+        changed_df, carried_df = split_changed_rows(
+            df, self.previous_output().drop(columns='Channel Name'), self.columns,
+        )
+
+        self.assertIs(changed_df, df)
+        self.assertTrue(carried_df.empty)
+
+    def test_split_changed_rows__failed_rows_are_retried(self):
+        previous_df = self.previous_output().assign(**{
+            'available_languages_Video Link': ['[]', None, '[]'],
+            'Channel ID': [None, 'UC B', None],
+        })
+        df = previous_df[self.columns]
+
+        changed_df, carried_df = split_changed_rows(df, previous_df, self.columns, {
+            'Video Link': 'available_languages_Video Link', 'Channel Name': 'Channel ID',
+        })
+
+        # the video of the second row and the channel of the first one failed, the third row has no channel
+        self.assertEqual(changed_df.index.tolist(), [0, 1])
+        self.assertEqual(carried_df.index.tolist(), [2])
+        self.assertEqual(carried_df['views_Video Link'].tolist(), [3])
+
+    def test_join_channel_table(self):
+        df, channel_table = compact_enriched_frame(enriched_frame(), 'Channel Name', ['Video Link'], 'split')
+
+        joined_df = join_channel_table(df, channel_table, 'Channel Name')
+
+        self.assertEqual(joined_df['Description'].tolist(), enriched_frame()['Description'].tolist())
+        self.assertIs(join_channel_table(df, channel_table, 'Channel'), df)
+
+    def test_merge_changed_rows(self):
+        df = pd.DataFrame({
+            'Video Link': ['ddddddddddd', 'aaaaaaaaaaa', 'eeeeeeeeeee'],
+            'Channel Name': ['Channel D', 'Channel A', 'Channel E'],
+        })
+        changed_df, carried_df = split_changed_rows(df, self.previous_output(), self.columns)
+
+        merged_df = merge_changed_rows(changed_df.assign(**{'views_Video Link': [4, 5]}), carried_df)
+
+        self.assertEqual(merged_df['Video Link'].tolist(), df['Video Link'].tolist())
+        self.assertEqual(merged_df['views_Video Link'].tolist(), [4, 1, 5])
+        self.assertIs(merge_changed_rows(changed_df, carried_df.iloc[:0]), changed_df)
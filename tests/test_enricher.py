@@ -0,0 +1,175 @@
+from unittest import TestCase
+from mock import patch
+
+import contextlib
+
+import io
+
+import json
+
+import logging
+
+import os
+
+import shutil
+
+import tempfile
+
+import pandas as pd
+
+import enricher
+import main
+import youtube_video_enricher
+from progress import ProgressReporter
+from youtube_transcript_api import TranscriptsDisabled
+from youtube_video_enricher import build_important_video_data
+
+
+def fetch_video_data(video_id, archive=None, proxies=None):
+    if video_id.startswith('x'):
+        raise TranscriptsDisabled(video_id)
+    return build_important_video_data(video_id, [], {}, '')
+
+
+def fetch_channel_info(channel_name, language):
+    return {
+        'Channel Name': channel_name,
+        'Channel ID': 'UC ' + channel_name,
+        'Description': 'About ' + channel_name,
+        'Subscribers': 10,
+        'Latest_Video URL': 'https://youtu.be/lllllllllll',
+    }
+
+
+class TestEnricher(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        default_interval = ProgressReporter.default_interval
+        self.addCleanup(setattr, ProgressReporter, 'default_interval', default_interval)
+        self.input = os.path.join(self.directory, 'input.csv')
+        self.output = os.path.join(self.directory, 'output.csv')
+        pd.DataFrame({'Video Link': ['aaaaaaaaaaa', 'xxxxxxxxxxx', 'aaaaaaaaaaa']}).to_csv(self.input, index=False)
+
+    def run_main(self, *args):
+        stdout = io.StringIO()
+        with patch.object(youtube_video_enricher, 'fetch_important_video_data', side_effect=fetch_video_data) as fetch:
+            with contextlib.redirect_stdout(stdout):
+                enricher.main([
+                    self.input, self.output, '--link-columns', 'Video Link', '--rate', '0', '--quiet',
+                    '--cache-dir', self.directory, '--env-file', os.path.join(self.directory, '.env'),
+                ] + list(args))
+        for logger_name in ('main', 'progress', 'youtube_video_enricher', 'youtube_channel_info_retriever'):
+            logging.getLogger(logger_name).setLevel(logging.NOTSET)
+        return stdout.getvalue(), fetch
+
+    def test_main__prints_summary_line(self):
+        stdout, fetch = self.run_main('--workers', '2')
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(stdout.count('\n'), 1)
+        summary = json.loads(stdout)
+        self.assertEqual(summary['input'], self.input)
+        self.assertEqual(summary['output'], self.output)
+        self.assertEqual(summary['rows'], 3)
+        self.assertEqual(
+            (summary['video_cache_hits'], summary['video_cache_misses'], summary['video_failures']), (0, 2, 1),
+        )
+        self.assertEqual(summary['video_cache_hit_rate'], 0.0)
+        self.assertIsNone(summary['channel_cache_hit_rate'])
+        self.assertEqual(pd.read_csv(self.output)['video_id_Video Link'].tolist(), [
+            'aaaaaaaaaaa', 'xxxxxxxxxxx', 'aaaaaaaaaaa',
+        ])
+
+    def test_main__second_run_hits_the_cache(self):
+        self.run_main()
+
+        stdout, fetch = self.run_main()
+
+        fetch.assert_not_called()
+        summary = json.loads(stdout)
+        self.assertEqual((summary['video_cache_hits'], summary['video_cache_misses']), (2, 0))
+        self.assertEqual(summary['video_cache_hit_rate'], 1.0)
+
+    def test_main__incremental(self):
+        previous_output = os.path.join(self.directory, 'previous.csv')
+        stdout, _ = self.run_main('--incremental', previous_output)
+        # without a previous output every row is enriched
+        self.assertNotIn('rows_changed', json.loads(stdout))
+        os.rename(self.output, previous_output)
+        pd.DataFrame({
+            'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'xxxxxxxxxxx', 'aaaaaaaaaaa'],
+        }).to_csv(self.input, index=False)
+
+        stdout, fetch = self.run_main('--incremental', previous_output)
+
+        fetch.assert_called_once_with('bbbbbbbbbbb', archive=None, proxies=None)
+        summary = json.loads(stdout)
+        # the row whose video failed is retried, its permanent failure comes from the cache
+        self.assertEqual((summary['rows'], summary['rows_changed'], summary['rows_carried_over']), (4, 2, 2))
+        # the carried over rows are not even looked up in the cache
+        self.assertEqual((summary['video_cache_hits'], summary['video_cache_misses']), (1, 1))
+        output_df = pd.read_csv(self.output)
+        self.assertEqual(output_df['video_id_Video Link'].tolist(), [
+            'aaaaaaaaaaa', 'bbbbbbbbbbb', 'xxxxxxxxxxx', 'aaaaaaaaaaa',
+        ])
+        self.assertEqual(output_df.columns.tolist(), pd.read_csv(previous_output).columns.tolist())
+
+    def test_main__incremental_with_channel_table(self):
+        previous_output = os.path.join(self.directory, 'previous.csv')
+        channel_table = os.path.join(self.directory, 'channels.csv')
+        args = [
+            '--channel-column', 'Channel Name', '--compact', '--channel-table', channel_table,
+            '--incremental', previous_output,
+        ]
+        pd.DataFrame({
+            'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb'], 'Channel Name': ['Channel A', 'Channel B'],
+        }).to_csv(self.input, index=False)
+        with patch.object(main, 'get_details_channel_info', side_effect=fetch_channel_info):
+            self.run_main(*args)
+        os.rename(self.output, previous_output)
+        pd.DataFrame({
+            'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'],
+            'Channel Name': ['Channel A', 'Channel B', 'Channel C'],
+        }).to_csv(self.input, index=False)
+
+        with patch.object(main, 'get_details_channel_info', side_effect=fetch_channel_info) as fetch_channel:
+            stdout, _ = self.run_main(*args)
+
+        fetch_channel.assert_called_once_with(channel_name='Channel C', language='EN')
+        self.assertEqual(json.loads(stdout)['rows_carried_over'], 2)
+        self.assertEqual(pd.read_csv(channel_table).to_dict('list'), {
+            'Channel Name': ['Channel A', 'Channel B', 'Channel C'],
+            'Description': ['About Channel A', 'About Channel B', 'About Channel C'],
+        })
+        output_df = pd.read_csv(self.output)
+        self.assertNotIn('Description', output_df.columns)
+        self.assertEqual(output_df['Channel ID'].tolist(), ['UC Channel A', 'UC Channel B', 'UC Channel C'])
+
+    def test_build_summary(self):
+        parsed_args = enricher.parse_args(['input.csv', 'output.csv'])
+
+        summary = enricher.build_summary(parsed_args, 10, 4.0, {
+            'video_cache_hits': 3, 'video_cache_misses': 1, 'channel_failures': 2,
+        })
+
+        self.assertEqual(summary['rows_per_second'], 2.5)
+        self.assertEqual(summary['video_cache_hit_rate'], 0.75)
+        self.assertEqual(summary['channel_failures'], 2)
+        self.assertNotIn('memory_before_bytes', summary)
+
+    def test_parse_args__channel_text_options_require_compact(self):
+        for args in (['--drop-channel-text'], ['--channel-table', 'channels.csv']):
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    enricher.parse_args(['input.csv', 'output.csv'] + args)
+
+            self.assertTrue(enricher.parse_args(['input.csv', 'output.csv', '--compact'] + args).compact)
+
+    def test_parse_args__record_and_replay_require_one_process(self):
+        for args in (['--record', 'cassettes'], ['--replay', 'cassettes']):
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    enricher.parse_args(['input.csv', 'output.csv', '--processes', '2'] + args)
+
+            self.assertEqual(enricher.parse_args(['input.csv', 'output.csv'] + args).processes, 1)
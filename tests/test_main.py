@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from main import join_channel_data
+
+
+class TestJoinChannelData(TestCase):
+    def setUp(self):
+        # the index is neither sorted nor a RangeIndex, the rows have to stay in their order
+        self.df = pd.DataFrame({
+            'Channel Name': ['Channel A', np.nan, 'Channel B', 'Channel A'],
+            'Video Link': ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc', 'ddddddddddd'],
+        }, index=[10, 5, 7, 1])
+        self.channel_data = {
+            'Channel A': {'Subscribers': 10, 'Latest_Video URL': 'https://youtu.be/eeeeeeeeeee'},
+        }
+
+    def test_join_channel_data(self):
+        df = join_channel_data(self.df, 'Channel Name', self.channel_data)
+
+        self.assertEqual(df.index.tolist(), [10, 5, 7, 1])
+        self.assertEqual(df.columns.tolist(), ['Channel Name', 'Video Link', 'Subscribers', 'Latest_Video URL'])
+        self.assertEqual(df['Video Link'].tolist(), self.df['Video Link'].tolist())
+        self.assertEqual(df['Subscribers'][10], 10)
+        self.assertEqual(df['Subscribers'][1], 10)
+        self.assertEqual(df['Latest_Video URL'][1], 'https://youtu.be/eeeeeeeeeee')
+        # a missing channel name and a channel without channel data get missing values
+        self.assertTrue(df.loc[[5, 7], ['Subscribers', 'Latest_Video URL']].isna().all().all())
+
+    def test_join_channel_data__overwrites_existing_columns(self):
+        self.df['Subscribers'] = 0
+
+        df = join_channel_data(self.df, 'Channel Name', self.channel_data)
+
+        self.assertEqual(df.columns.tolist(), ['Channel Name', 'Video Link', 'Subscribers', 'Latest_Video URL'])
+        self.assertEqual(df['Subscribers'][10], 10)
+        self.assertTrue(pd.isna(df['Subscribers'][7]))
+
+    def test_join_channel_data__no_channel_data(self):
+        df = join_channel_data(self.df.copy(), 'Channel Name', {})
+
+        pd.testing.assert_frame_equal(df, self.df)
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+import logging
+
+from progress import ProgressReporter, format_duration
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressReporter(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def create_progress(self, total, **kwargs):
+        return ProgressReporter('videos', total, interval=5.0, clock=self.clock, **kwargs)
+
+    def test_update__is_throttled(self):
+        progress = self.create_progress(100)
+
+        with self.assertLogs('progress', level=logging.INFO) as logs:
+            for _ in range(10):
+                self.clock.now += 1
+                progress.update()
+
+        self.assertEqual(logs.output, [
+            'INFO:progress:videos 5/100 (5%) 1.0/s ETA 1m35s errors 0',
+            'INFO:progress:videos 10/100 (10%) 1.0/s ETA 1m30s errors 0',
+        ])
+
+    def test_update__counts_errors_and_cache(self):
+        progress = self.create_progress(4, cache_hits=1, cache_misses=1)
+        progress.update(errors=1)
+        self.clock.now += 5
+
+        with self.assertLogs('progress', level=logging.INFO) as logs:
+            progress.update(errors=0, cache_hits=1, cache_misses=3)
+
+        self.assertEqual(logs.output, ['INFO:progress:videos 2/4 (50%) 0.4/s ETA 5s cache hit rate 25% errors 1'])
+
+    def test_update__unknown_eta(self):
+        progress = self.create_progress(10)
+
+        self.assertEqual(progress.format_line(self.clock.now), 'videos 0/10 (0%) 0.0/s ETA ? errors 0')
+
+    def test_finish(self):
+        progress = self.create_progress(3)
+        progress.update(done=3, errors=1)
+        self.clock.now += 2
+
+        with self.assertLogs('progress', level=logging.INFO) as logs:
+            progress.finish()
+
+        self.assertEqual(logs.output, ['INFO:progress:videos 3/3 (100%) 1.5/s in 2s errors 1'])
+
+    def test_finish__does_not_repeat_the_last_line(self):
+        progress = self.create_progress(3)
+        self.clock.now += 6
+        with self.assertLogs('progress', level=logging.INFO):
+            progress.update(done=3)
+
+        with self.assertNoLogs('progress', level=logging.INFO):
+            progress.finish()
+
+    def test_finish__nothing_to_process(self):
+        progress = self.create_progress(0)
+
+        with self.assertNoLogs('progress', level=logging.INFO):
+            progress.finish()
+        self.assertEqual(progress.format_line(self.clock.now), 'videos 0/0 0.0/s in 0s errors 0')
+
+
+class TestFormatDuration(TestCase):
+    def test_format_duration(self):
+        self.assertEqual(format_duration(12.7), '12s')
+        self.assertEqual(format_duration(245), '4m05s')
+        self.assertEqual(format_duration(3720), '1h02m')
@@ -0,0 +1,155 @@
+from unittest import TestCase
+from mock import patch
+
+import os
+
+import shutil
+
+import tempfile
+
+import youtube_video_enricher
+from progress import ProgressReporter
+from work_queue import SQLiteWorkQueue
+from youtube_transcript_api import TooManyRequests, TranscriptsDisabled
+from youtube_video_enricher import build_important_video_data, collect_from_queue, work_on_queue
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fetch_video_data(video_link, archive=None, proxies=None):
+    if video_link.startswith('t'):
+        raise TooManyRequests(video_link)
+    if video_link.startswith('x'):
+        raise TranscriptsDisabled(video_link)
+    return build_important_video_data(video_link, [], {}, '')
+
+
+class TestSQLiteWorkQueue(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.clock = FakeClock()
+        self.work_queue = self.open_queue()
+
+    def open_queue(self, name='enricher'):
+        work_queue = SQLiteWorkQueue(
+            os.path.join(self.directory, 'queue.sqlite'), name=name, lease_seconds=10, max_attempts=2,
+            clock=self.clock,
+        )
+        self.addCleanup(work_queue.close)
+        return work_queue
+
+    def test_put__ignores_known_keys(self):
+        self.assertEqual(self.work_queue.put({'a': 'link a', 'b': 'link b'}), 2)
+        self.work_queue.ack(self.work_queue.lease('worker')[0][0], {'views': 1})
+
+        self.assertEqual(self.work_queue.put({'a': 'link a', 'c': 'link c'}), 1)
+        self.assertEqual(self.work_queue.counts(), {'pending': 2, 'leased': 0, 'done': 1, 'failed': 0})
+        # queues with another name in the same file are independent
+        self.assertEqual(self.open_queue('other').put({'a': 'link a'}), 1)
+
+    def test_lease__in_order_and_once(self):
+        self.work_queue.put({'a': 'link a', 'b': 'link b', 'c': 'link c'})
+
+        self.assertEqual(self.work_queue.lease('worker-1', count=2), [('a', 'link a'), ('b', 'link b')])
+        self.assertEqual(self.open_queue().lease('worker-2', count=2), [('c', 'link c')])
+        self.assertEqual(self.work_queue.lease('worker-1'), [])
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 3, 'done': 0, 'failed': 0})
+
+    def test_lease__expired_leases_are_leased_again(self):
+        self.work_queue.put({'a': 'link a'})
+        self.work_queue.lease('worker-1')
+        self.clock.now += 5
+        self.assertEqual(self.work_queue.lease('worker-2'), [])
+
+        self.clock.now += 6
+        self.assertEqual(self.work_queue.lease('worker-2'), [('a', 'link a')])
+
+        self.clock.now += 11
+        self.assertEqual(self.work_queue.lease('worker-3'), [])
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1})
+        self.assertEqual(self.work_queue.failures(['a']), {'a': 'lease expired'})
+
+    def test_nack__retries_until_max_attempts(self):
+        self.work_queue.put({'a': 'link a'})
+        self.work_queue.lease('worker')
+        self.work_queue.nack('a', 'TooManyRequests')
+        self.assertEqual(self.work_queue.counts(), {'pending': 1, 'leased': 0, 'done': 0, 'failed': 0})
+        self.assertEqual(self.work_queue.failures(['a']), {})
+
+        self.work_queue.lease('worker')
+        self.work_queue.nack('a', 'TooManyRequests')
+        # a task which is not leased anymore is not released twice
+        self.work_queue.nack('a', 'TooManyRequests')
+
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1})
+        self.assertEqual(self.work_queue.failures(['a', 'b']), {'a': 'TooManyRequests'})
+        self.assertEqual(self.work_queue.lease('worker'), [])
+
+    def test_ack__results(self):
+        self.work_queue.put({'a': 'link a', 'b': 'link b'})
+        self.work_queue.lease('worker', count=2)
+        self.work_queue.ack('a', {'views': 1, 'title': 'A'})
+
+        self.assertEqual(self.work_queue.results(['a', 'b', 'c']), {'a': {'views': 1, 'title': 'A'}})
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 1, 'done': 1, 'failed': 0})
+
+    def test_ack__after_the_lease_expired(self):
+        self.work_queue.put({'a': 'link a'})
+        self.work_queue.lease('worker-1')
+        self.clock.now += 11
+        self.assertEqual(self.work_queue.counts()['leased'], 1)
+
+        self.work_queue.ack('a', {'views': 1})
+
+        self.assertEqual(self.work_queue.lease('worker-2'), [])
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 0, 'done': 1, 'failed': 0})
+
+
+class TestWorkOnQueue(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.work_queue = SQLiteWorkQueue(os.path.join(self.directory, 'queue.sqlite'), max_attempts=2)
+        self.addCleanup(self.work_queue.close)
+        self.cache_folder = os.path.join(self.directory, 'cache')
+        os.makedirs(self.cache_folder)
+
+    def test_collect_from_queue(self):
+        video_links = {'aaaaaaaaaaa': 'aaaaaaaaaaa', 'ttttttttttt': 'ttttttttttt', 'xxxxxxxxxxx': 'xxxxxxxxxxx'}
+        progress = ProgressReporter('videos', len(video_links))
+
+        with patch.object(
+            youtube_video_enricher, 'fetch_important_video_data', side_effect=fetch_video_data,
+        ) as fetch:
+            video_data = collect_from_queue(
+                self.work_queue, video_links, self.cache_folder, progress, workers=2, requests_per_second=0,
+                poll_interval=0,
+            )
+
+        self.assertEqual(video_data['aaaaaaaaaaa']['available_languages'], [])
+        # recaptchas are released and retried until they fail, permanent errors are acknowledged right away
+        self.assertEqual(video_data['ttttttttttt']['error'], 'TooManyRequests')
+        self.assertEqual(video_data['xxxxxxxxxxx']['error'], 'TranscriptsDisabled')
+        self.assertEqual(sorted(call[0][0] for call in fetch.call_args_list), [
+            'aaaaaaaaaaa', 'ttttttttttt', 'ttttttttttt', 'xxxxxxxxxxx',
+        ])
+        self.assertEqual(self.work_queue.counts(), {'pending': 0, 'leased': 0, 'done': 2, 'failed': 1})
+        self.assertEqual((progress.done, progress.errors), (3, 2))
+        self.assertEqual(sorted(os.listdir(self.cache_folder)), [
+            'video_aaaaaaaaaaa.json', 'video_ttttttttttt.json', 'video_xxxxxxxxxxx.json',
+        ])
+
+    def test_work_on_queue__batch_fits_into_the_lease(self):
+        with patch.object(self.work_queue, 'lease', return_value=[]) as lease:
+            work_on_queue(self.work_queue, workers=8, requests_per_second=0.01)
+            work_on_queue(self.work_queue, workers=8, requests_per_second=0.2)
+            work_on_queue(self.work_queue, workers=8, requests_per_second=0)
+
+        self.assertEqual([call[1]['count'] for call in lease.call_args_list], [3, 16, 16])
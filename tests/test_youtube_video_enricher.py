@@ -0,0 +1,164 @@
+from unittest import TestCase, skipUnless
+from mock import patch
+
+import multiprocessing
+
+import os
+
+import shutil
+
+import tempfile
+
+import pandas as pd
+import requests
+
+import youtube_video_enricher
+from youtube_transcript_api import ProxyPool, TooManyRequests, TranscriptsDisabled, YouTubeRequestFailed, metrics
+from youtube_video_enricher import (
+    add_new_columns_to_df, build_failed_video_data, build_important_video_data, pack_video_data, shard_video_ids,
+    unpack_video_data,
+)
+
+
+def fetch_video_data(video_id_or_url, archive=None, proxies=None):
+    video_id = youtube_video_enricher.get_video_id_from_youtube_link(video_id_or_url) \
+        if 'youtu' in video_id_or_url else video_id_or_url
+    if video_id.startswith('x'):
+        raise TranscriptsDisabled(video_id)
+    return build_important_video_data(video_id, [], {}, '')
+
+
+def fetch_video_data_with_transient_failures(video_id_or_url, archive=None, proxies=None):
+    if video_id_or_url == 'bbbbbbbbbbb':
+        response = requests.Response()
+        response.status_code = 503
+        raise YouTubeRequestFailed(video_id_or_url, requests.HTTPError(response=response))
+    if video_id_or_url.endswith('aaaaaaaaaaa'):
+        raise TooManyRequests(video_id_or_url)
+    return fetch_video_data(video_id_or_url)
+
+
+def fetch_video_data_through_proxy(video_id_or_url, archive=None, proxies=None):
+    with proxies.lease():
+        metrics.increment('test_fetches')
+        return fetch_video_data(video_id_or_url)
+
+
+class TestAddNewColumnsToDf(TestCase):
+    def setUp(self):
+        self.cache_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_folder)
+        self.df = pd.DataFrame({
+            'Video Link': ['https://youtu.be/aaaaaaaaaaa', 'bbbbbbbbbbb', 'xxxxxxxxxxx', None],
+            'Other Link': [
+                'aaaaaaaaaaa', None, 'https://www.youtube.com/watch?v=bbbbbbbbbbb', 'https://www.youtube.com/',
+            ],
+        })
+
+    def enrich(self, fetch_function=fetch_video_data, **kwargs):
+        stats = {}
+        with patch.object(youtube_video_enricher, 'fetch_important_video_data', side_effect=fetch_function) as fetch:
+            df = add_new_columns_to_df(
+                self.df, ['Video Link', 'Other Link'], None, cache_folder=self.cache_folder, requests_per_second=0,
+                stats=stats, **kwargs
+            )
+        return df, stats, fetch
+
+    def test_every_video_is_fetched_once(self):
+        df, stats, fetch = self.enrich(workers=3)
+
+        self.assertEqual(sorted(call[0][0] for call in fetch.call_args_list), [
+            'bbbbbbbbbbb', 'https://youtu.be/aaaaaaaaaaa', 'xxxxxxxxxxx',
+        ])
+        self.assertEqual(df['video_id_Video Link'].tolist()[:3], ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'xxxxxxxxxxx'])
+        self.assertEqual(df['video_id_Other Link'][0], 'aaaaaaaaaaa')
+        self.assertTrue(pd.isna(df['video_id_Other Link'][1]))
+        self.assertEqual(df['video_id_Other Link'][2], 'bbbbbbbbbbb')
+        self.assertEqual(df['available_languages_Video Link'][0], [])
+        self.assertTrue(pd.isna(df['video_id_Video Link'][3]))
+        # the link of the last row has no video id
+        self.assertEqual(stats, {
+            'video_cache_hits': 0, 'video_cache_misses': 3, 'video_failures': 2, 'video_reextracted': 0,
+        })
+        self.assertNotIn('error_Video Link', df.columns)
+
+    # the patched fetch only reaches the worker processes if they are forked
+    @skipUnless(multiprocessing.get_start_method() == 'fork', 'requires forked worker processes')
+    def test_processes__merge_metrics_and_proxy_stats(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        metrics.increment('test_fetches', 10)
+        proxy_pool = ProxyPool(['http://10.0.0.1:3128', 'http://10.0.0.2:3128'])
+
+        df, stats, _ = self.enrich(fetch_function=fetch_video_data_through_proxy, processes=2, proxies=proxy_pool)
+
+        self.assertEqual(df['video_id_Video Link'].tolist()[:3], ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'xxxxxxxxxxx'])
+        self.assertEqual(stats['video_failures'], 2)
+        # the metrics of the parent are not sent back by the forked worker processes
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['test_fetches'], 13)
+        self.assertEqual(snapshot['histograms']['stage_seconds{stage="video_cache_store"}']['count'], 3)
+        self.assertEqual(sum(proxy_stats['requests'] for proxy_stats in proxy_pool.stats().values()), 3)
+
+    def test_failures_are_cached(self):
+        self.enrich()
+
+        _, stats, fetch = self.enrich()
+
+        fetch.assert_not_called()
+        self.assertEqual(stats['video_cache_hits'], 3)
+        self.assertEqual(stats['video_cache_misses'], 0)
+        self.assertEqual(stats['video_failures'], 2)
+        self.assertEqual(sorted(os.listdir(self.cache_folder)), [
+            'video_aaaaaaaaaaa.json', 'video_bbbbbbbbbbb.json', 'video_xxxxxxxxxxx.json',
+        ])
+
+    def test_transient_failures_are_not_cached(self):
+        df, stats, _ = self.enrich(fetch_function=fetch_video_data_with_transient_failures)
+        # the link without a video id fails too
+        self.assertEqual(stats['video_failures'], 4)
+        self.assertTrue(pd.isna(df['available_languages_Video Link'][1]))
+
+        df, stats, fetch = self.enrich()
+
+        # the recaptcha and the server error are fetched again, the permanent failure comes from the cache
+        self.assertEqual(sorted(call[0][0] for call in fetch.call_args_list), [
+            'bbbbbbbbbbb', 'https://youtu.be/aaaaaaaaaaa',
+        ])
+        self.assertEqual((stats['video_cache_hits'], stats['video_failures']), (1, 2))
+        self.assertEqual(df['available_languages_Video Link'][1], [])
+
+    def test_starting_row_index(self):
+        df, stats, fetch = self.enrich(starting_row_index=2)
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertTrue(pd.isna(df['video_id_Video Link'][0]))
+        self.assertEqual(df['video_id_Other Link'][2], 'bbbbbbbbbbb')
+
+
+class TestSharding(TestCase):
+    def test_shard_video_ids__is_stable(self):
+        video_ids = ['video_{}'.format(index) for index in range(100)]
+
+        shards = shard_video_ids(video_ids, 4)
+
+        self.assertEqual(shard_video_ids(list(reversed(video_ids)), 4), [list(reversed(shard)) for shard in shards])
+        self.assertEqual(sorted(sum(shards, [])), sorted(video_ids))
+        self.assertTrue(all(shards))
+        # crc32 does not depend on the hash seed of the process, so a video stays in its shard across runs
+        self.assertIn('video_0', shards[3])
+        self.assertEqual(shard_video_ids(video_ids, 1), [video_ids])
+
+    def test_pack_video_data__round_trip(self):
+        video_data = {
+            'video_id': 'aaaaaaaaaaa',
+            'available_languages': ['en', 'de'],
+            'available_audiotracks': ['English'],
+            'views': 1200,
+            'title': 'Title',
+        }
+        failed_video_data = build_failed_video_data('xxxxxxxxxxx', ValueError())
+
+        self.assertEqual(unpack_video_data(pack_video_data(video_data)), video_data)
+        self.assertEqual(unpack_video_data(pack_video_data(failed_video_data)), failed_video_data)
+        self.assertEqual(unpack_video_data(pack_video_data(failed_video_data))['error'], 'ValueError')
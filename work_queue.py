@@ -0,0 +1,411 @@
+"""
+Work queues which distribute the videos of an enrichment over several processes or machines. A coordinator puts the
+videos which are not cached yet into the queue, workers lease them, fetch their data and acknowledge them with the
+result. The results stay in the queue, which is the result store shared by all nodes, so a video which has been fetched
+by one node is never fetched again by another one.
+
+A leased task which is neither acknowledged nor released before its lease expires, because its worker crashed, is
+leased again by the next worker. Every lease counts as an attempt, after `max_attempts` attempts the task fails.
+
+`SQLiteWorkQueue` keeps the queue in a SQLite file, for several processes on one machine and for local testing.
+`RedisWorkQueue` keeps it in Redis (requires `redis`), for workers on several machines. `open_work_queue` opens either
+of them from a url::
+
+    work_queue = open_work_queue('redis://queue-host:6379/0')
+    work_queue.put({'mNfqAHZM-x4': 'https://youtu.be/mNfqAHZM-x4'})
+
+    for key, payload in work_queue.lease('worker-1'):
+        work_queue.ack(key, fetch(payload))
+"""
+import json
+import os
+import threading
+import time
+
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def open_work_queue(url, name='enricher', lease_seconds=300.0, max_attempts=3):
+    """
+    Opens the work queue at a url.
+
+    :param url: (str) A redis:// or rediss:// url, or the path of a SQLite file, optionally prefixed with sqlite:///
+    :param name: (str) The name of the queue, several queues can share one Redis database
+    :param lease_seconds: (float) The number of seconds a worker has to acknowledge a leased task
+    :param max_attempts: (int) The number of times a task is leased before it fails
+    :return: (SQLiteWorkQueue or RedisWorkQueue) The work queue
+    """
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+
+        return RedisWorkQueue(
+            redis.Redis.from_url(url), name=name, lease_seconds=lease_seconds, max_attempts=max_attempts,
+        )
+    if url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+    return SQLiteWorkQueue(url, name=name, lease_seconds=lease_seconds, max_attempts=max_attempts)
+
+
+class SQLiteWorkQueue:
+    """
+    A work queue in a SQLite file. Every process opens the file on its own, SQLite locks it while a task is leased, so
+    a task is never leased by two workers at once. The file has to be on a local file system.
+    """
+
+    def __init__(self, path, name='enricher', lease_seconds=300.0, max_attempts=3, clock=time.time):
+        """
+        :param path: (str) The path of the SQLite file, which is created if it does not exist yet
+        :param name: (str) The name of the queue, several queues can share one file
+        :param lease_seconds: (float) The number of seconds a worker has to acknowledge a leased task
+        :param max_attempts: (int) The number of times a task is leased before it fails
+        :param clock: (function) The wall clock, which can be replaced in tests
+        """
+        import sqlite3
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        # autocommit mode, every write runs in an explicit transaction
+        self._connection = sqlite3.connect(path, timeout=60.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            'queue TEXT NOT NULL, key TEXT NOT NULL, payload TEXT, state TEXT NOT NULL, attempts INTEGER NOT NULL, '
+            'worker TEXT, lease_until REAL, result TEXT, error TEXT, position INTEGER NOT NULL, '
+            'PRIMARY KEY (queue, key))'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS tasks_state ON tasks (queue, state, position)')
+
+    def put(self, tasks):
+        """
+        Adds tasks to the queue. Tasks whose key is already in the queue, also if they are done or failed, are not
+        added again.
+
+        :param tasks: (dict) The JSON serializable payloads of the tasks by their key
+        :return: (int) The number of tasks which have been added
+        """
+        with self._transaction() as cursor:
+            cursor.execute('SELECT COALESCE(MAX(position), 0) FROM tasks WHERE queue = ?', (self.name,))
+            position = cursor.fetchone()[0]
+            added = 0
+            for key, payload in tasks.items():
+                position += 1
+                cursor.execute(
+                    'INSERT OR IGNORE INTO tasks (queue, key, payload, state, attempts, position) '
+                    'VALUES (?, ?, ?, ?, 0, ?)',
+                    (self.name, key, json.dumps(payload), PENDING, position),
+                )
+                added += cursor.rowcount
+        return added
+
+    def lease(self, worker, count=1):
+        """
+        Leases the oldest pending tasks, and tasks whose lease has expired.
+
+        :param worker: (str) The name of the worker
+        :param count: (int) The maximum number of tasks which are leased
+        :return: (list) The leased tasks as (key, payload) tuples, empty if there is nothing to do
+        """
+        now = self._clock()
+        with self._transaction() as cursor:
+            self._fail_expired(cursor, now)
+            cursor.execute(
+                'SELECT key, payload FROM tasks WHERE queue = ? AND (state = ? OR (state = ? AND lease_until < ?)) '
+                'ORDER BY position LIMIT ?',
+                (self.name, PENDING, LEASED, now, count),
+            )
+            tasks = [(key, json.loads(payload)) for key, payload in cursor.fetchall()]
+            cursor.executemany(
+                'UPDATE tasks SET state = ?, attempts = attempts + 1, worker = ?, lease_until = ? '
+                'WHERE queue = ? AND key = ?',
+                [(LEASED, worker, now + self.lease_seconds, self.name, key) for key, _ in tasks],
+            )
+        return tasks
+
+    def ack(self, key, result):
+        """
+        Marks a leased task as done and stores its result.
+
+        :param key: (str) The key of the task
+        :param result: The JSON serializable result of the task
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                'UPDATE tasks SET state = ?, result = ?, worker = NULL, lease_until = NULL, error = NULL '
+                'WHERE queue = ? AND key = ?',
+                (DONE, json.dumps(result), self.name, key),
+            )
+
+    def nack(self, key, error):
+        """
+        Releases a leased task which could not be done, so it is retried, or fails if it has been attempted
+        `max_attempts` times.
+
+        :param key: (str) The key of the task
+        :param error: (str) Why the task could not be done
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                'UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, worker = NULL, '
+                'lease_until = NULL WHERE queue = ? AND key = ? AND state = ?',
+                (self.max_attempts, FAILED, PENDING, error, self.name, key, LEASED),
+            )
+
+    def results(self, keys):
+        """
+        :param keys: (list) The keys of the tasks
+        :return: (dict) The results of the tasks which are done, by their key
+        """
+        return {key: json.loads(value) for key, value in self._select_column('result', DONE, keys)}
+
+    def failures(self, keys):
+        """
+        :param keys: (list) The keys of the tasks
+        :return: (dict) The errors of the tasks which failed, by their key
+        """
+        return dict(self._select_column('error', FAILED, keys))
+
+    def counts(self):
+        """
+        :return: (dict) The number of tasks which are pending, leased, done and failed
+        """
+        with self._transaction() as cursor:
+            self._fail_expired(cursor, self._clock())
+            cursor.execute('SELECT state, COUNT(*) FROM tasks WHERE queue = ? GROUP BY state', (self.name,))
+            counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+            counts.update(cursor.fetchall())
+        return counts
+
+    def close(self):
+        self._connection.close()
+
+    def _select_column(self, column, state, keys):
+        keys = list(keys)
+        rows = []
+        with self._lock:
+            # stay below the maximum number of host parameters of old SQLite versions
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows.extend(self._connection.execute(
+                    'SELECT key, {column} FROM tasks WHERE queue = ? AND state = ? AND key IN ({keys})'.format(
+                        column=column, keys=', '.join('?' * len(chunk)),
+                    ),
+                    [self.name, state] + chunk,
+                ).fetchall())
+        return rows
+
+    def _fail_expired(self, cursor, now):
+        cursor.execute(
+            'UPDATE tasks SET state = ?, error = ?, worker = NULL, lease_until = NULL '
+            'WHERE queue = ? AND state = ? AND lease_until < ? AND attempts >= ?',
+            (FAILED, 'lease expired', self.name, LEASED, now, self.max_attempts),
+        )
+
+    def _transaction(self):
+        return _SQLiteTransaction(self._connection, self._lock)
+
+
+class _SQLiteTransaction:
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            # takes the write lock of the file right away, so two processes never lease the same task
+            self._connection.execute('BEGIN IMMEDIATE')
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._connection.cursor()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self._connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self._lock.release()
+
+
+class RedisWorkQueue:
+    """
+    A work queue in Redis, for workers on several machines. The keys of the pending tasks are kept in a list, the
+    leased ones in a sorted set scored by the expiry of their lease, and the payloads, attempts, results and errors in
+    hashes. Every change runs in a transaction which watches the keys it read, so a worker which dies while it leases
+    or acknowledges a task never loses it, and concurrent workers never lease the same task. The leases are checked
+    against the clock of the workers, which should be synchronized.
+    """
+
+    def __init__(self, client, name='enricher', lease_seconds=300.0, max_attempts=3, clock=time.time):
+        """
+        :param client: (redis.Redis) The Redis client
+        :param name: (str) The name of the queue, which prefixes all of its Redis keys
+        :param lease_seconds: (float) The number of seconds a worker has to acknowledge a leased task
+        :param max_attempts: (int) The number of times a task is leased before it fails
+        :param clock: (function) The wall clock, which can be replaced in tests
+        """
+        self.client = client
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._clock = clock
+
+    def put(self, tasks):
+        """
+        Adds tasks to the queue. Tasks whose key is already in the queue, also if they are done or failed, are not
+        added again.
+
+        :param tasks: (dict) The JSON serializable payloads of the tasks by their key
+        :return: (int) The number of tasks which have been added
+        """
+        keys = list(tasks)
+        if not keys:
+            return 0
+
+        def put_new(pipeline):
+            existing = pipeline.hmget(self._key('payloads'), keys)
+            new_payloads = {key: json.dumps(tasks[key]) for key, value in zip(keys, existing) if value is None}
+            pipeline.multi()
+            if new_payloads:
+                pipeline.hset(self._key('payloads'), mapping=new_payloads)
+                pipeline.rpush(self._key('pending'), *new_payloads)
+            return len(new_payloads)
+
+        return self.client.transaction(put_new, self._key('payloads'), value_from_callable=True)
+
+    def lease(self, worker, count=1):
+        """
+        Leases the oldest pending tasks, and tasks whose lease has expired.
+
+        :param worker: (str) The name of the worker
+        :param count: (int) The maximum number of tasks which are leased
+        :return: (list) The leased tasks as (key, payload) tuples, empty if there is nothing to do
+        """
+        now = self._clock()
+        self._requeue_expired(now)
+
+        def lease_pending(pipeline):
+            keys = [key.decode('utf-8') for key in pipeline.lrange(self._key('pending'), 0, count - 1)]
+            payloads = pipeline.hmget(self._key('payloads'), keys) if keys else []
+            pipeline.multi()
+            if keys:
+                pipeline.ltrim(self._key('pending'), len(keys), -1)
+                for key in keys:
+                    pipeline.hincrby(self._key('attempts'), key, 1)
+                pipeline.hset(self._key('workers'), mapping=dict.fromkeys(keys, worker))
+                pipeline.zadd(self._key('leased'), dict.fromkeys(keys, now + self.lease_seconds))
+            return [(key, json.loads(payload)) for key, payload in zip(keys, payloads)]
+
+        return self.client.transaction(lease_pending, self._key('pending'), value_from_callable=True)
+
+    def ack(self, key, result):
+        """
+        Marks a leased task as done and stores its result. A task whose lease expired in the meantime is removed from
+        the pending tasks and the failed ones again.
+
+        :param key: (str) The key of the task
+        :param result: The JSON serializable result of the task
+        """
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hset(self._key('results'), key, json.dumps(result))
+        pipeline.zrem(self._key('leased'), key)
+        pipeline.lrem(self._key('pending'), 0, key)
+        pipeline.srem(self._key('failed'), key)
+        pipeline.hdel(self._key('workers'), key)
+        pipeline.hdel(self._key('errors'), key)
+        pipeline.execute()
+
+    def nack(self, key, error):
+        """
+        Releases a leased task which could not be done, so it is retried, or fails if it has been attempted
+        `max_attempts` times.
+
+        :param key: (str) The key of the task
+        :param error: (str) Why the task could not be done
+        """
+        def release_leased(pipeline):
+            # a task whose lease expired in the meantime has already been released
+            if pipeline.zscore(self._key('leased'), key) is not None:
+                self._release(pipeline, [key], error)
+
+        self.client.transaction(release_leased, self._key('leased'))
+
+    def results(self, keys):
+        """
+        :param keys: (list) The keys of the tasks
+        :return: (dict) The results of the tasks which are done, by their key
+        """
+        return self._hmget('results', keys)
+
+    def failures(self, keys):
+        """
+        :param keys: (list) The keys of the tasks
+        :return: (dict) The errors of the tasks which failed, by their key
+        """
+        failed_keys = self._failed(keys)
+        return {key: error for key, error in self._hmget('errors', failed_keys, decode=False).items()}
+
+    def counts(self):
+        """
+        :return: (dict) The number of tasks which are pending, leased, done and failed
+        """
+        self._requeue_expired(self._clock())
+        pipeline = self.client.pipeline()
+        pipeline.llen(self._key('pending'))
+        pipeline.zcard(self._key('leased'))
+        pipeline.hlen(self._key('results'))
+        pipeline.scard(self._key('failed'))
+        return dict(zip((PENDING, LEASED, DONE, FAILED), pipeline.execute()))
+
+    def close(self):
+        self.client.close()
+
+    def _requeue_expired(self, now):
+        def requeue(pipeline):
+            keys = [key.decode('utf-8') for key in pipeline.zrangebyscore(self._key('leased'), '-inf', now)]
+            if keys:
+                self._release(pipeline, keys, 'lease expired')
+
+        # an ack or another worker which requeues the same tasks changes the leased set, and this is retried
+        self.client.transaction(requeue, self._key('leased'))
+
+    def _release(self, pipeline, keys, error):
+        # runs in a transaction which watches the leased set, every lease changes it, so the attempts cannot change
+        attempts = [int(value or 0) for value in pipeline.hmget(self._key('attempts'), keys)]
+        pipeline.multi()
+        pipeline.zrem(self._key('leased'), *keys)
+        pipeline.hdel(self._key('workers'), *keys)
+        pipeline.hset(self._key('errors'), mapping=dict.fromkeys(keys, error))
+        failed_keys = [key for key, key_attempts in zip(keys, attempts) if key_attempts >= self.max_attempts]
+        retried_keys = [key for key, key_attempts in zip(keys, attempts) if key_attempts < self.max_attempts]
+        if failed_keys:
+            pipeline.sadd(self._key('failed'), *failed_keys)
+        if retried_keys:
+            pipeline.rpush(self._key('pending'), *retried_keys)
+
+    def _failed(self, keys):
+        keys = list(keys)
+        if not keys:
+            return set()
+        return {key for key, failed in zip(keys, self.client.smismember(self._key('failed'), keys)) if failed}
+
+    def _hmget(self, hash_name, keys, decode=True):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.hmget(self._key(hash_name), keys)
+        return {
+            key: json.loads(value) if decode else value.decode('utf-8')
+            for key, value in zip(keys, values) if value is not None
+        }
+
+    def _key(self, suffix):
+        return '{name}:{suffix}'.format(name=self.name, suffix=suffix)
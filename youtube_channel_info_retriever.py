@@ -1,9 +1,84 @@
 
+import logging
 import os
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import dotenv
-dotenv.load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+def load_config(env_file=None):
+    """
+    Loads the configuration, like the YOUTUBE_API_KEY, from a .env file into the environment. Variables which are
+    already set in the environment are not overridden.
+
+    :param env_file: (str, optional) The path of the .env file, by default it is searched for from the working directory
+    :return: (bool) True if a .env file was found and loaded, False otherwise
+    """
+    import dotenv
+
+    return dotenv.load_dotenv(env_file)
+
+
+_youtube_http = None
+
+
+def configure_youtube_http(http):
+    """
+    Sets the http object all YouTube Data API clients send their requests with, for example a
+    `youtube_transcript_api.replay.ReplayHttp` to run without network.
+
+    :param http: (httplib2.Http) The http object, or None to use the default one
+    """
+    global _youtube_http
+    _youtube_http = http
+
+
+_retry_policy = None
+
+
+def configure_retry_policy(retry_policy):
+    """
+    Sets the policy all YouTube Data API requests are retried with after a transient error.
+
+    :param retry_policy: (youtube_transcript_api.RetryPolicy) The retry policy, or None to use the default one
+    """
+    global _retry_policy
+    _retry_policy = retry_policy
+
+
+def build_youtube_client():
+    """
+    Builds a client for the YouTube Data API, using the YOUTUBE_API_KEY from the environment.
+
+    :return: (googleapiclient.discovery.Resource) The YouTube Data API client
+    """
+    from googleapiclient.discovery import build
+
+    return build('youtube', 'v3', developerKey=os.getenv("YOUTUBE_API_KEY"), http=_youtube_http)
+
+
+def execute_request(request, endpoint):
+    """
+    Executes a YouTube Data API request, retrying it after transient errors, and records the latency of every
+    attempt, and its status if it fails, in the metrics.
+
+    :param request: (googleapiclient.http.HttpRequest) The request to execute
+    :param endpoint: (str) The name of the endpoint, like "search"
+    :return: (dict) The response
+    """
+    from googleapiclient.errors import HttpError
+    from youtube_transcript_api import RetryPolicy, metrics
+
+    def execute():
+        metrics.increment('data_api_calls', endpoint=endpoint)
+        try:
+            with metrics.time(f"data_api_{endpoint}"):
+                return request.execute()
+        except HttpError as e:
+            metrics.increment('data_api_errors', endpoint=endpoint, status=e.resp.status)
+            if e.resp.status == 429:
+                metrics.increment('http_429_responses')
+            raise
+
+    return (_retry_policy or RetryPolicy()).call(execute)
 
 
 def select_language():
@@ -72,26 +147,25 @@ def search_channel(channel_name):
     :param channel_name: (str) The name of the channel to search for
     :return: (str) The channel ID if found, None otherwise
     """
-    API_KEY = os.getenv("YOUTUBE_API_KEY")
+    from googleapiclient.errors import HttpError
 
-    print("I am searching the channel name for its ID with API_KEY: ", API_KEY)
-    print("I am searching the channel name for its ID with channel_name: ", channel_name)
+    logger.debug("Searching the channel ID of %r", channel_name)
 
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
+    youtube = build_youtube_client()
     try:
         request = youtube.search().list(
             part='snippet',
             q=channel_name,
             type='channel'
         )
-        response = request.execute()
+        response = execute_request(request, 'search')
 
         if 'items' in response and response['items']:
             channel = response['items'][0]
             channel_id = channel['id']['channelId']
             return channel_id
     except HttpError as e:
-        print(f"Error: {e}")
+        logger.warning("YouTube Data API error: %s", e)
     return None
 
 
@@ -102,16 +176,16 @@ def get_channel_info(channel_id):
     :param channel_id: (str) The ID of the channel
     :return: (tuple) Channel title, description, subscriber count, view count, video count, and creation date
     """
-    API_KEY = os.getenv("YOUTUBE_API_KEY")
+    from googleapiclient.errors import HttpError
 
-    print("API_KEY: ", API_KEY)
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
+    logger.debug("Retrieving the channel info of %s", channel_id)
+    youtube = build_youtube_client()
     try:
         request = youtube.channels().list(
             part='snippet,statistics',
             id=channel_id
         )
-        response = request.execute()
+        response = execute_request(request, 'channels')
 
         if 'items' in response:
             channel = response['items'][0]
@@ -123,7 +197,7 @@ def get_channel_info(channel_id):
             created_at = channel['snippet']['publishedAt']
             return channel_title, description, subs_count, view_count, video_count, created_at
     except HttpError as e:
-        print(f"Error: {e}")
+        logger.warning("YouTube Data API error: %s", e)
     return None, None, None, None, None, None
 
 
@@ -134,9 +208,9 @@ def get_latest_video_info(channel_id):
     :param channel_id: (str) The ID of the channel
     :return: (tuple) Video title, publish date, and URL of the latest video
     """
-    API_KEY = os.getenv("YOUTUBE_API_KEY")
+    from googleapiclient.errors import HttpError
 
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
+    youtube = build_youtube_client()
     try:
         request = youtube.search().list(
             part='snippet',
@@ -145,7 +219,7 @@ def get_latest_video_info(channel_id):
             type='video',
             maxResults=1
         )
-        response = request.execute()
+        response = execute_request(request, 'search')
 
         if 'items' in response and response['items']:
             latest_video = response['items'][0]
@@ -156,7 +230,7 @@ def get_latest_video_info(channel_id):
         else:
             return None, None, None
     except HttpError as e:
-        print(f"Error: {e}")
+        logger.warning("YouTube Data API error: %s", e)
         return None, None, None
 
 
@@ -170,14 +244,24 @@ def format_number(number):
     return "{:,}".format(number)
 
 
-def get_details_channel_info(language=None, channel_name=None):
+def get_details_channel_info(language=None, channel_name=None, display=False):
     """
-    Retrieves and displays detailed information about a YouTube channel.
+    Retrieves detailed information about a YouTube channel and optionally displays it.
 
     :param language: (str, optional) The language code for output ('EN' or 'FR')
     :param channel_name: (str, optional) The name of the channel to search for
+    :param display: (bool) Print the channel information. Otherwise it is only logged at debug level, so batch runs
+        are not flooded with channel descriptions.
     :return: (dict) A dictionary containing all the retrieved channel information
     """
+    show = print if display else logger.debug
+
+    def show_invalid_channel():
+        if display:
+            print(f"\n{translate_message('invalid_channel', language)}")
+        else:
+            logger.warning("Channel %r does not exist or is inaccessible", channel_name)
+
     if language is None:
         language = select_language()
 
@@ -202,27 +286,27 @@ def get_details_channel_info(language=None, channel_name=None):
         if channel_id:
             channel_title, description, subs_count, view_count, video_count, created_at = get_channel_info(channel_id)
             if channel_title:
-                print(f"\n{translate_message('channel_info', language)} '{channel_title}':")
-                print(f"{translate_message('description', language)} {description}")
-                print(f"{translate_message('subscribers', language)} {format_number(subs_count)}")
-                print(f"{translate_message('views', language)} {format_number(view_count)}")
-                print(f"{translate_message('total_videos', language)} {format_number(video_count)}")
-                print(f"{translate_message('created_at', language)} {created_at}")
-                print(f"{translate_message('on_youtube_since', language)} {created_at[:10]}")
+                show(f"\n{translate_message('channel_info', language)} '{channel_title}':")
+                show(f"{translate_message('description', language)} {description}")
+                show(f"{translate_message('subscribers', language)} {format_number(subs_count)}")
+                show(f"{translate_message('views', language)} {format_number(view_count)}")
+                show(f"{translate_message('total_videos', language)} {format_number(video_count)}")
+                show(f"{translate_message('created_at', language)} {created_at}")
+                show(f"{translate_message('on_youtube_since', language)} {created_at[:10]}")
 
                 video_title, video_published_at, video_url = get_latest_video_info(channel_id)
                 if video_title:
-                    print(f"\n{translate_message('latest_video', language)}")
-                    print(f"{translate_message('title', language)} {video_title}")
-                    print(f"{translate_message('published_at', language)} {video_published_at}")
-                    print(f"{translate_message('url', language)} {video_url}")
+                    show(f"\n{translate_message('latest_video', language)}")
+                    show(f"{translate_message('title', language)} {video_title}")
+                    show(f"{translate_message('published_at', language)} {video_published_at}")
+                    show(f"{translate_message('url', language)} {video_url}")
 
                 else:
-                    print(f"\n{translate_message('no_video_found', language)}")
+                    show(f"\n{translate_message('no_video_found', language)}")
             else:
-                print(f"\n{translate_message('invalid_channel', language)}")
+                show_invalid_channel()
         else:
-            print(f"\n{translate_message('invalid_channel', language)}")
+            show_invalid_channel()
 
     return {
         "Channel Name": channel_name,
@@ -240,4 +324,5 @@ def get_details_channel_info(language=None, channel_name=None):
 
 
 if __name__ == "__main__":
-    print(get_details_channel_info())
+    load_config()
+    print(get_details_channel_info(display=True))
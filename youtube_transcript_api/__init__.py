@@ -1,5 +1,12 @@
 from ._api import YouTubeTranscriptApi
 from ._transcripts import TranscriptList, Transcript
+from ._rate_limiting import RateLimiter
+from ._segments import TranscriptSegments
+from ._cache import TranscriptCache
+from ._snapshots import WatchPageArchive
+from ._metrics import MetricsRegistry, metrics
+from ._proxies import ProxyPool
+from ._retry import RetryPolicy
 from ._errors import (
     TranscriptsDisabled,
     NoTranscriptFound,
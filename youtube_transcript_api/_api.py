@@ -1,11 +1,12 @@
-import requests
-try: # pragma: no cover
-    import http.cookiejar as cookiejar
-    CookieLoadError = (FileNotFoundError, cookiejar.LoadError)
-except ImportError: # pragma: no cover
-    import cookielib as cookiejar
-    CookieLoadError = IOError
+import itertools
 
+import os
+
+import threading
+
+from ._concurrency import imap_unordered
+from ._proxies import ProxyPool, lease_proxies
+from ._rate_limiting import RateLimiter
 from ._transcripts import TranscriptListFetcher
 
 from ._errors import (
@@ -15,8 +16,18 @@ from ._errors import (
 
 
 class YouTubeTranscriptApi(object):
+    # a `requests` transport adapter which is mounted on every http session instead of the default one, for example
+    # `youtube_transcript_api.replay.ReplayAdapter` to run without network
+    http_adapter = None
+
+    # path of a cookie file -> (modification time, size, parsed cookies). The file is parsed once and every session
+    # gets its own jar holding the parsed cookies, so cookies set during a session, like the consent cookie, don't leak
+    # into the cache.
+    _cookie_cache = {}
+    _cookie_cache_lock = threading.Lock()
+
     @classmethod
-    def list_transcripts(cls, video_id, proxies=None, cookies=None):
+    def list_transcripts(cls, video_id, proxies=None, cookies=None, cache=None, archive=None):
         """
         Retrieves the list of transcripts which are available for a given video. It returns a `TranscriptList` object
         which is iterable and provides methodsf to filter the list of transcripts for specific languages. While iterating
@@ -57,21 +68,25 @@ class YouTubeTranscriptApi(object):
 
         :param video_id: the youtube video id
         :type video_id: str
-        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
         :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
         :param cookies: a string of the path to a text file containing youtube authorization cookies
         :type cookies: str
+        :param cache: a cache the raw transcripts are read from, instead of requesting them again, and stored in
+        :type cache: TranscriptCache
+        :param archive: an archive every fetched watch page is stored in, so it can be extracted again later
+        :type archive: WatchPageArchive
         :return: the list of available transcripts
         :rtype TranscriptList:
         """
-        with requests.Session() as http_client:
-            if cookies:
-                http_client.cookies = cls._load_cookies(cookies, video_id)
-            http_client.proxies = proxies if proxies else {}
-            return TranscriptListFetcher(http_client).fetch(video_id)
+        with lease_proxies(proxies) as leased_proxies:
+            with cls._create_http_client(video_id, leased_proxies, cookies) as http_client:
+                return TranscriptListFetcher(http_client, cache=cache, archive=archive).fetch(video_id)
 
     @classmethod
-    def list_transcript_audio_tracks(cls, video_id, proxies=None, cookies=None):
+    def list_transcript_audio_tracks(cls, video_id, proxies=None, cookies=None, archive=None):
         """
         Retrieves the list of transcripts which are available for a given video. It returns a `TranscriptList` object
         which is iterable and provides methods to filter the list of transcripts for specific languages. While iterating
@@ -112,22 +127,41 @@ class YouTubeTranscriptApi(object):
 
         :param video_id: the youtube video id
         :type video_id: str
-        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
         :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
         :param cookies: a string of the path to a text file containing youtube authorization cookies
         :type cookies: str
-        :return: the list of available transcripts
-        :rtype TranscriptList:
+        :param archive: an archive every fetched watch page is stored in, so it can be extracted again later
+        :type archive: WatchPageArchive
+        :return: the list of available transcripts and a tuple of the audio tracks and the watch page
+        :rtype (TranscriptList, (dict, str)):
         """
-        with requests.Session() as http_client:
-            if cookies:
-                http_client.cookies = cls._load_cookies(cookies, video_id)
-            http_client.proxies = proxies if proxies else {}
-            return TranscriptListFetcher(http_client).fetch(video_id), TranscriptListFetcher(http_client).fetch_audio(video_id)
+        with lease_proxies(proxies) as leased_proxies:
+            with cls._create_http_client(video_id, leased_proxies, cookies) as http_client:
+                return TranscriptListFetcher(http_client, archive=archive).fetch_with_audio(video_id)
+
+    @classmethod
+    def extract_transcript_audio_tracks(cls, video_id, html):
+        """
+        Like `list_transcript_audio_tracks`, but extracts the transcripts and audio tracks from a watch page which has
+        already been fetched, for example one loaded from a `WatchPageArchive`, without any network traffic. The
+        returned transcripts can't be fetched.
+
+        :param video_id: the youtube video id
+        :type video_id: str
+        :param html: the watch page of the video
+        :type html: str
+        :return: the list of available transcripts and a tuple of the audio tracks and the watch page
+        :rtype (TranscriptList, (dict, str)):
+        """
+        return TranscriptListFetcher(None).extract_with_audio(video_id, html)
 
     @classmethod
     def get_transcripts(cls, video_ids, languages=('en',), continue_after_error=False, proxies=None,
-                        cookies=None, preserve_formatting=False):
+                        cookies=None, preserve_formatting=False, workers=1, requests_per_second=None, errors=None,
+                        compact=False, cache=None):
         """
         Retrieves the transcripts for a list of videos.
 
@@ -140,34 +174,202 @@ class YouTubeTranscriptApi(object):
         :param continue_after_error: if this is set the execution won't be stopped, if an error occurs while retrieving
         one of the video transcripts
         :type continue_after_error: bool
-        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
         :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
         :param cookies: a string of the path to a text file containing youtube authorization cookies
         :type cookies: str
         :param preserve_formatting: whether to keep select HTML text formatting
         :type preserve_formatting: bool
+        :param workers: the number of videos which are fetched in parallel, using one shared http session. See
+        `iter_transcripts` for details.
+        :type workers: int
+        :param requests_per_second: the maximum number of videos which are requested per second over all workers
+        :type requests_per_second: float
+        :param errors: if a dictionary is passed, it is filled with a mapping of the unretrievable video ids onto the
+        exceptions which occurred while retrieving them
+        :type errors: dict[str, Exception]
+        :param compact: whether to return the transcripts as compact `TranscriptSegments`
+        :type compact: bool
+        :param cache: a cache the raw transcripts are read from, instead of requesting them again, and stored in
+        :type cache: TranscriptCache
         :return: a tuple containing a dictionary mapping video ids onto their corresponding transcripts, and a list of
-        video ids, which could not be retrieved
+        video ids, which could not be retrieved. Both are ordered like `video_ids`.
         :rtype ({str: [{'text': str, 'start': float, 'end': float}]}, [str]}):
         """
         assert isinstance(video_ids, list), "`video_ids` must be a list of strings"
 
+        errors = errors if errors is not None else {}
         data = {}
         unretrievable_videos = []
 
-        for video_id in video_ids:
-            try:
-                data[video_id] = cls.get_transcript(video_id, languages, proxies, cookies, preserve_formatting)
-            except Exception as exception:
+        if workers <= 1 and not requests_per_second and not compact and cache is None:
+            for video_id in video_ids:
+                try:
+                    data[video_id] = cls.get_transcript(video_id, languages, proxies, cookies, preserve_formatting)
+                except Exception as exception:
+                    if not continue_after_error:
+                        raise exception
+
+                    unretrievable_videos.append(video_id)
+                    errors[video_id] = exception
+
+            return data, unretrievable_videos
+
+        results = {}
+        for video_id, transcript, exception in cls.iter_transcripts(
+            video_ids, languages, workers, requests_per_second, proxies, cookies, preserve_formatting, compact, cache,
+        ):
+            if exception is not None:
                 if not continue_after_error:
                     raise exception
 
+                errors[video_id] = exception
+            else:
+                results[video_id] = transcript
+
+        for video_id in video_ids:
+            if video_id in results:
+                data[video_id] = results[video_id]
+            elif video_id in errors and video_id not in unretrievable_videos:
                 unretrievable_videos.append(video_id)
 
         return data, unretrievable_videos
 
     @classmethod
-    def get_transcript(cls, video_id, languages=('en',), proxies=None, cookies=None, preserve_formatting=False):
+    def iter_transcripts(cls, video_ids, languages=('en',), workers=1, requests_per_second=None, proxies=None,
+                         cookies=None, preserve_formatting=False, compact=False, cache=None):
+        """
+        Retrieves the transcripts for many videos in parallel and yields every transcript as soon as it has been
+        retrieved, so processing can start before the whole batch is finished. All workers share one http session.
+        `video_ids` is consumed lazily and only a few videos per worker are in flight at any time, so it can also be a
+        generator over a very large number of video ids. Example::
+
+            for video_id, transcript, exception in YouTubeTranscriptApi.iter_transcripts(video_ids, workers=8):
+                if exception is not None:
+                    print(video_id, 'failed with', type(exception).__name__)
+                else:
+                    process(video_id, transcript)
+
+        :param video_ids: the youtube video ids
+        :type video_ids: iterable[str]
+        :param languages: A list of language codes in a descending priority. For example, if this is set to ['de', 'en']
+        it will first try to fetch the german transcript (de) and then fetch the english transcript (en) if it fails to
+        do so.
+        :type languages: list[str]
+        :param workers: the number of videos which are fetched in parallel
+        :type workers: int
+        :param requests_per_second: the maximum number of videos which are requested per second over all workers
+        :type requests_per_second: float
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
+        :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
+        :param cookies: a string of the path to a text file containing youtube authorization cookies
+        :type cookies: str
+        :param preserve_formatting: whether to keep select HTML text formatting
+        :type preserve_formatting: bool
+        :param compact: whether to return the transcripts as compact `TranscriptSegments`
+        :type compact: bool
+        :param cache: a cache the raw transcripts are read from, instead of requesting them again, and stored in
+        :type cache: TranscriptCache
+        :return: a generator yielding a tuple of the video id, its transcript and the exception which occurred while
+        retrieving it, in the order in which they are completed. Either the transcript or the exception is None.
+        :rtype: generator[(str, [{'text': str, 'start': float, 'end': float}], Exception)]
+        """
+        def fetch_transcript(http_client, video_id):
+            return cls._fetch_transcript(http_client, video_id, languages, preserve_formatting, compact, cache)
+
+        return cls._iter_videos(video_ids, fetch_transcript, workers, requests_per_second, proxies, cookies)
+
+    @classmethod
+    def iter_transcripts_many(cls, video_ids, language_codes=('en',), translate_to=(), workers=1, language_workers=4,
+                              requests_per_second=None, proxies=None, cookies=None, preserve_formatting=False,
+                              compact=False, cache=None):
+        """
+        Retrieves several native transcripts and translations of many videos, see `TranscriptList.fetch_many`.
+        `workers` videos are processed in parallel, and the transcripts of every video are fetched by
+        `language_workers` threads. All of them share one http session. Example::
+
+            for video_id, transcripts, exception in YouTubeTranscriptApi.iter_transcripts_many(
+                    video_ids, ['en'], translate_to=['de', 'fr', 'es'], workers=4):
+                if exception is None:
+                    process(video_id, transcripts['en'], transcripts['de'])
+
+        :param video_ids: the youtube video ids
+        :type video_ids: iterable[str]
+        :param language_codes: the languages of the native transcripts
+        :type language_codes: list[str]
+        :param translate_to: the languages every transcript is translated into
+        :type translate_to: list[str]
+        :param workers: the number of videos which are fetched in parallel
+        :type workers: int
+        :param language_workers: the number of transcripts of one video which are fetched in parallel
+        :type language_workers: int
+        :param requests_per_second: the maximum number of videos which are requested per second over all workers
+        :type requests_per_second: float
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
+        :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
+        :param cookies: a string of the path to a text file containing youtube authorization cookies
+        :type cookies: str
+        :param preserve_formatting: whether to keep select HTML text formatting
+        :type preserve_formatting: bool
+        :param compact: whether to return the transcripts as compact `TranscriptSegments`
+        :type compact: bool
+        :param cache: a cache the raw transcripts are read from, instead of requesting them again, and stored in
+        :type cache: TranscriptCache
+        :return: a generator yielding a tuple of the video id, its transcripts by language code and the exception which
+        occurred while retrieving them, in the order in which they are completed. Either the transcripts or the
+        exception is None.
+        :rtype: generator[(str, dict[str, [{'text': str, 'start': float, 'end': float}]], Exception)]
+        """
+        def fetch_transcripts(http_client, video_id):
+            return TranscriptListFetcher(http_client, cache=cache).fetch(video_id).fetch_many(
+                language_codes, translate_to, workers=language_workers, preserve_formatting=preserve_formatting,
+                compact=compact,
+            )
+
+        return cls._iter_videos(
+            video_ids, fetch_transcripts, workers, requests_per_second, proxies, cookies,
+            pool_size=workers * max(language_workers, 1),
+        )
+
+    @classmethod
+    def _iter_videos(cls, video_ids, fetch, workers, requests_per_second, proxies, cookies, pool_size=None):
+        video_ids = iter(video_ids)
+        first_video_id = next(video_ids, None)
+        if first_video_id is None:
+            return
+        video_ids = itertools.chain([first_video_id], video_ids)
+
+        rate_limiter = RateLimiter(requests_per_second)
+        proxy_pool = proxies if isinstance(proxies, ProxyPool) else None
+
+        def fetch_video(video_id):
+            rate_limiter.wait()
+            if proxy_pool is None:
+                return fetch(http_client, video_id)
+            with proxy_pool.lease() as leased_proxies:
+                return fetch(cls._with_proxies(http_client, leased_proxies), video_id)
+
+        session_proxies = None if proxy_pool is not None else proxies
+        with cls._create_http_client(
+                first_video_id, session_proxies, cookies, pool_size=pool_size or workers) as http_client:
+            for result in imap_unordered(fetch_video, video_ids, workers):
+                yield result
+
+    @classmethod
+    def _fetch_transcript(cls, http_client, video_id, languages, preserve_formatting, compact=False, cache=None):
+        return TranscriptListFetcher(http_client, cache=cache).fetch(video_id).find_transcript(languages).fetch(
+            preserve_formatting=preserve_formatting, compact=compact,
+        )
+
+    @classmethod
+    def get_transcript(cls, video_id, languages=('en',), proxies=None, cookies=None, preserve_formatting=False,
+                       compact=False, cache=None):
         """
         Retrieves the transcript for a single video. This is just a shortcut for calling::
 
@@ -179,20 +381,88 @@ class YouTubeTranscriptApi(object):
         it will first try to fetch the german transcript (de) and then fetch the english transcript (en) if it fails to
         do so.
         :type languages: list[str]
-        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests
+        :param proxies: a dictionary mapping of http and https proxies to be used for the network requests, or a
+        `ProxyPool` the proxy of every video is selected from
         :type proxies: {'http': str, 'https': str} - http://docs.python-requests.org/en/master/user/advanced/#proxies
+        or ProxyPool
         :param cookies: a string of the path to a text file containing youtube authorization cookies
         :type cookies: str
         :param preserve_formatting: whether to keep select HTML text formatting
         :type preserve_formatting: bool
+        :param compact: whether to return the transcript as compact `TranscriptSegments`, which use a fraction of the
+        memory of the list of dictionaries
+        :type compact: bool
+        :param cache: a cache the raw transcripts are read from, instead of requesting them again, and stored in
+        :type cache: TranscriptCache
         :return: a list of dictionaries containing the 'text', 'start' and 'duration' keys
         :rtype [{'text': str, 'start': float, 'end': float}]:
         """
         assert isinstance(video_id, str), "`video_id` must be a string"
-        return cls.list_transcripts(video_id, proxies, cookies).find_transcript(languages).fetch(preserve_formatting=preserve_formatting)
+        # the proxy is leased for the whole video, so blocks while fetching the transcript count against it too
+        with lease_proxies(proxies) as leased_proxies:
+            return cls.list_transcripts(video_id, leased_proxies, cookies, cache=cache).find_transcript(
+                languages,
+            ).fetch(preserve_formatting=preserve_formatting, compact=compact)
+
+    @classmethod
+    def _create_http_client(cls, video_id, proxies=None, cookies=None, pool_size=None):
+        import requests
+
+        http_client = requests.Session()
+        if cls.http_adapter is not None:
+            http_client.mount('http://', cls.http_adapter)
+            http_client.mount('https://', cls.http_adapter)
+        elif pool_size and pool_size > 1:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            http_client.mount('http://', adapter)
+            http_client.mount('https://', adapter)
+        if cookies:
+            http_client.cookies = cls._load_cookies(cookies, video_id)
+        http_client.proxies = proxies if proxies else {}
+        return http_client
+
+    @classmethod
+    def _with_proxies(cls, http_client, proxies):
+        import requests
+
+        # a session for the requests of a single video, which shares the connection pools and cookies of the batch
+        proxied_client = requests.Session()
+        proxied_client.adapters = http_client.adapters
+        proxied_client.cookies = http_client.cookies
+        proxied_client.proxies = proxies
+        return proxied_client
 
     @classmethod
     def _load_cookies(cls, cookies, video_id):
+        from requests.cookies import RequestsCookieJar
+
+        try:
+            stat = os.stat(cookies)
+        except OSError:
+            raise CookiePathInvalid(video_id)
+
+        path = os.path.abspath(cookies)
+        with cls._cookie_cache_lock:
+            cached = cls._cookie_cache.get(path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            cached = (stat.st_mtime_ns, stat.st_size, list(cls._parse_cookies(cookies, video_id)))
+            with cls._cookie_cache_lock:
+                cls._cookie_cache[path] = cached
+
+        session_cookies = RequestsCookieJar()
+        for cookie in cached[2]:
+            session_cookies.set_cookie(cookie)
+        return session_cookies
+
+    @classmethod
+    def _parse_cookies(cls, cookies, video_id):
+        try: # pragma: no cover
+            import http.cookiejar as cookiejar
+            CookieLoadError = (FileNotFoundError, cookiejar.LoadError)
+        except ImportError: # pragma: no cover
+            import cookielib as cookiejar
+            CookieLoadError = IOError
+
         try:
             cookie_jar = cookiejar.MozillaCookieJar()
             cookie_jar.load(cookies)
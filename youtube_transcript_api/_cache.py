@@ -0,0 +1,215 @@
+import hashlib
+
+import json
+
+import os
+
+import tempfile
+
+import threading
+
+import zlib
+
+from collections import OrderedDict
+
+from ._metrics import metrics
+
+try:  # pragma: no cover
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+_DECOMPRESSION_ERRORS = (zlib.error,) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+_EXTENSIONS = {
+    'zstd': '.zst',
+    'zlib': '.zlib',
+}
+
+
+def _default_compression(compression=None):
+    if compression is None:
+        compression = 'zstd' if zstandard is not None else 'zlib'
+    if compression not in _EXTENSIONS:
+        raise ValueError("compression must be 'zstd' or 'zlib', not {compression!r}".format(compression=compression))
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("the 'zstandard' package is required for zstd compression")
+    return compression
+
+
+def _compress(data, compression):
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data, compression):
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _write_atomically(path, data):
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+class TranscriptCache(object):
+    """
+    A compressed on-disk cache of the raw timedtext of transcripts. Published transcripts almost never change, so
+    repeated runs over the same videos can skip requesting them again. Entries are keyed by the video id, the language
+    code and whether the transcript is generated, as well as the language it is translated to. They are compressed
+    with zstd if the `zstandard` package is installed, otherwise with zlib. Once the cache grows beyond `max_bytes`
+    the least recently used entries are evicted. Example::
+
+        cache = TranscriptCache('transcript_cache')
+
+        transcripts, _ = YouTubeTranscriptApi.get_transcripts(video_ids, cache=cache)
+
+        print(cache.stats())
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, compression=None):
+        """
+        :param directory: the directory the cache entries are stored in, it is created if it does not exist
+        :type directory: str
+        :param max_bytes: the maximum number of bytes of compressed entries kept in the cache
+        :type max_bytes: int
+        :param compression: 'zstd' or 'zlib'. Defaults to zstd if the `zstandard` package is installed.
+        :type compression: str
+        """
+        compression = _default_compression(compression)
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._entries = self._load_entries()
+        self._size = sum(self._entries.values())
+
+    def get(self, video_id, language_code, is_generated, translation_language_code=None):
+        """
+        Returns the cached raw timedtext of a transcript.
+
+        :param video_id: the id of the video
+        :type video_id: str
+        :param language_code: the language code of the transcript, for translations the language it is translated from
+        :type language_code: str
+        :param is_generated: whether the transcript is generated
+        :type is_generated: bool
+        :param translation_language_code: the language code the transcript is translated to, None if it isn't
+        :type translation_language_code: str
+        :return: the raw timedtext or None, if it is not cached
+        :rtype str:
+        """
+        file_name = self._file_name(video_id, language_code, is_generated, translation_language_code)
+        path = os.path.join(self.directory, file_name)
+        try:
+            with metrics.time('transcript_cache_lookup'):
+                with open(path, 'rb') as file:
+                    plain_data = _decompress(file.read(), self.compression)
+        except (OSError,) + _DECOMPRESSION_ERRORS:
+            metrics.increment('cache_misses', cache='transcripts')
+            with self._lock:
+                self.misses += 1
+            return None
+
+        metrics.increment('cache_hits', cache='transcripts')
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(plain_data)
+            if file_name in self._entries:
+                self._entries.move_to_end(file_name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return plain_data.decode('utf-8')
+
+    def set(self, video_id, language_code, is_generated, translation_language_code, plain_data):
+        """
+        Stores the raw timedtext of a transcript and evicts the least recently used entries, if the cache has grown
+        beyond `max_bytes`.
+
+        :param video_id: the id of the video
+        :type video_id: str
+        :param language_code: the language code of the transcript, for translations the language it is translated from
+        :type language_code: str
+        :param is_generated: whether the transcript is generated
+        :type is_generated: bool
+        :param translation_language_code: the language code the transcript is translated to, None if it isn't
+        :type translation_language_code: str
+        :param plain_data: the raw timedtext
+        :type plain_data: str
+        """
+        file_name = self._file_name(video_id, language_code, is_generated, translation_language_code)
+        with metrics.time('transcript_cache_store'):
+            data = _compress(plain_data.encode('utf-8'), self.compression)
+            _write_atomically(os.path.join(self.directory, file_name), data)
+
+        with self._lock:
+            self._size += len(data) - self._entries.pop(file_name, 0)
+            self._entries[file_name] = len(data)
+            evicted_file_names = []
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                evicted_file_name, size = self._entries.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                evicted_file_names.append(evicted_file_name)
+
+        for evicted_file_name in evicted_file_names:
+            try:
+                os.remove(os.path.join(self.directory, evicted_file_name))
+            except OSError:
+                pass
+
+    @property
+    def size(self):
+        """
+        The number of bytes of compressed entries currently stored in the cache.
+
+        :rtype int:
+        """
+        return self._size
+
+    def stats(self):
+        """
+        Returns the statistics of this cache since it has been created.
+
+        :return: the hits, misses, hit rate, number of uncompressed bytes which were read from the cache instead of
+        being requested, evictions and the current size of the cache in bytes
+        :rtype dict:
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else None,
+                'bytes_saved': self.bytes_saved,
+                'evictions': self.evictions,
+                'size_bytes': self._size,
+                'entries': len(self._entries),
+            }
+
+    def _file_name(self, video_id, language_code, is_generated, translation_language_code):
+        key = json.dumps([video_id, language_code, bool(is_generated), translation_language_code])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest() + _EXTENSIONS[self.compression]
+
+    def _load_entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(_EXTENSIONS[self.compression]):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        return OrderedDict((name, size) for _, name, size in sorted(entries))
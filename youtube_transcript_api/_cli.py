@@ -1,11 +1,37 @@
 import argparse
 
+import itertools
+
+import json
+
+import os
+
+import sys
+
 from ._api import YouTubeTranscriptApi
+from ._cache import TranscriptCache
+from ._concurrency import imap_unordered
+from ._rate_limiting import RateLimiter
 
+from .exporters import CorpusWriterLoader
 from .formatters import FormatterLoader
 
 
+_NO_TRANSCRIPT = object()
+
+
 class YouTubeTranscriptCli(object):
+    NDJSON_FORMAT = 'ndjson'
+
+    FILE_EXTENSIONS = {
+        'json': 'json',
+        'pretty': 'txt',
+        'text': 'txt',
+        'webvtt': 'vtt',
+        'srt': 'srt',
+        NDJSON_FORMAT: 'ndjson',
+    }
+
     def __init__(self, args):
         self._args = args
 
@@ -15,31 +41,165 @@ class YouTubeTranscriptCli(object):
         if parsed_args.exclude_manually_created and parsed_args.exclude_generated:
             return ''
 
-        proxies = None
-        if parsed_args.http_proxy != '' or parsed_args.https_proxy != '':
-            proxies = {"http": parsed_args.http_proxy, "https": parsed_args.https_proxy}
+        results = sorted(
+            self._fetch_transcripts(parsed_args, self._create_cache(parsed_args)), key=lambda result: result[0]
+        )
 
-        cookies = parsed_args.cookies
+        if parsed_args.corpus:
+            exceptions = list(self._write_corpus(parsed_args, results))
+            return '\n\n'.join([str(exception) for exception in exceptions] + [parsed_args.corpus])
 
-        transcripts = []
-        exceptions = []
+        if parsed_args.format == self.NDJSON_FORMAT:
+            return '\n'.join(
+                self._format_ndjson_record(parsed_args, video_id, source, transcript, exception)
+                for _, video_id, source, transcript, exception in results
+            )
 
-        for video_id in parsed_args.video_ids:
-            try:
-                transcripts.append(self._fetch_transcript(parsed_args, proxies, cookies, video_id))
-            except Exception as exception:
-                exceptions.append(exception)
+        transcripts = [transcript for _, _, _, transcript, exception in results if exception is None]
+        exceptions = [exception for _, _, _, _, exception in results if exception is not None]
 
         return '\n\n'.join(
             [str(exception) for exception in exceptions]
             + ([FormatterLoader().load(parsed_args.format).format_transcripts(transcripts)] if transcripts else [])
         )
 
-    def _fetch_transcript(self, parsed_args, proxies, cookies, video_id):
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id, proxies=proxies, cookies=cookies)
+    def stream(self, output, error_output):
+        """
+        Like `run`, but writes every transcript to `output` as soon as it has been retrieved instead of returning all
+        of them at once, so memory stays bounded no matter how many video ids are passed. Transcripts are written in
+        the order in which they are completed and errors are written to `error_output`. If `--output-dir` is set, each
+        transcript is written to its own file and only the paths of these files are written to `output`. With the
+        ndjson format errors are written to `output` as records as well. If `--corpus` is set, the transcripts are
+        appended to the corpus and only its path is written to `output` once it is complete.
+
+        :param output: the file-like object the transcripts are written to
+        :param error_output: the file-like object the errors are written to
+        """
+        parsed_args = self._parse_args()
+
+        if parsed_args.exclude_manually_created and parsed_args.exclude_generated:
+            return
+
+        if parsed_args.output_dir:
+            os.makedirs(parsed_args.output_dir, exist_ok=True)
+
+        cache = self._create_cache(parsed_args)
+        self._stream_results(parsed_args, self._fetch_transcripts(parsed_args, cache), output, error_output)
+        if cache is not None:
+            error_output.write(self._format_cache_stats(cache) + '\n')
+
+    def _stream_results(self, parsed_args, results, output, error_output):
+        is_ndjson = parsed_args.format == self.NDJSON_FORMAT
+        formatter = None if is_ndjson else FormatterLoader().load(parsed_args.format)
+
+        if parsed_args.corpus:
+            for exception in self._write_corpus(parsed_args, results):
+                error_output.write(str(exception) + '\n\n')
+                error_output.flush()
+            output.write(parsed_args.corpus + '\n')
+            return
+
+        if not is_ndjson and not parsed_args.output_dir:
+            transcripts = self._iter_written_transcripts(results, output, error_output)
+            first_transcript = next(transcripts, _NO_TRANSCRIPT)
+            if first_transcript is not _NO_TRANSCRIPT:
+                formatter.write_transcripts(itertools.chain([first_transcript], transcripts), output)
+                output.write('\n')
+            return
+
+        for _, video_id, source, transcript, exception in results:
+            if not is_ndjson and exception is not None:
+                error_output.write(str(exception) + '\n\n')
+                error_output.flush()
+                continue
+
+            if parsed_args.output_dir:
+                file_path = os.path.join(
+                    parsed_args.output_dir,
+                    '{video_id}.{extension}'.format(
+                        video_id=video_id,
+                        extension=(
+                            'txt' if parsed_args.list_transcripts and not is_ndjson
+                            else self.FILE_EXTENSIONS[parsed_args.format]
+                        ),
+                    ),
+                )
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    if is_ndjson:
+                        file.write(self._format_ndjson_record(parsed_args, video_id, source, transcript, exception))
+                    else:
+                        formatter.write_transcript(transcript, file)
+                output.write(file_path + '\n')
+            else:
+                output.write(self._format_ndjson_record(parsed_args, video_id, source, transcript, exception) + '\n')
+            output.flush()
+
+    def _create_cache(self, parsed_args):
+        if parsed_args.cache_dir is None:
+            return None
+        return TranscriptCache(parsed_args.cache_dir, max_bytes=int(parsed_args.cache_max_mb * 1024 * 1024))
+
+    def _format_cache_stats(self, cache):
+        stats = cache.stats()
+        return 'transcript cache: {hits} hits, {misses} misses, {hit_rate} hit rate, {bytes_saved} bytes saved'.format(
+            hits=stats['hits'],
+            misses=stats['misses'],
+            hit_rate='{:.1%}'.format(stats['hit_rate']) if stats['hit_rate'] is not None else 'n/a',
+            bytes_saved=stats['bytes_saved'],
+        )
+
+    def _write_corpus(self, parsed_args, results):
+        """
+        Appends the retrieved transcripts to the corpus at `--corpus` and yields the exceptions of the videos whose
+        transcripts could not be retrieved.
+        """
+        with CorpusWriterLoader().load(parsed_args.corpus) as corpus:
+            for _, video_id, source, transcript, exception in results:
+                if exception is not None:
+                    yield exception
+                    continue
+
+                corpus.write_transcript(
+                    video_id, transcript, source.language_code, source.is_generated,
+                )
+
+    def _iter_written_transcripts(self, results, output, error_output):
+        """
+        Yields the retrieved transcripts to the formatter writing them to `output` and flushes `output` once a
+        transcript has been written. Errors are written to `error_output` instead.
+        """
+        for _, _, _, transcript, exception in results:
+            if exception is not None:
+                error_output.write(str(exception) + '\n\n')
+                error_output.flush()
+                continue
+
+            yield transcript
+            output.flush()
+
+    def _fetch_transcripts(self, parsed_args, cache=None):
+        proxies = None
+        if parsed_args.http_proxy != '' or parsed_args.https_proxy != '':
+            proxies = {"http": parsed_args.http_proxy, "https": parsed_args.https_proxy}
+
+        cookies = parsed_args.cookies
+        rate_limiter = RateLimiter(parsed_args.rate)
+
+        def fetch_transcript(indexed_video_id):
+            rate_limiter.wait()
+            return self._fetch_transcript(parsed_args, proxies, cookies, indexed_video_id[1], cache)
+
+        for (index, video_id), result, exception in imap_unordered(
+            fetch_transcript, enumerate(self._iter_video_ids(parsed_args)), parsed_args.workers
+        ):
+            source, transcript = result if exception is None else (None, None)
+            yield index, video_id, source, transcript, exception
+
+    def _fetch_transcript(self, parsed_args, proxies, cookies, video_id, cache=None):
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id, proxies=proxies, cookies=cookies, cache=cache)
 
         if parsed_args.list_transcripts:
-            return str(transcript_list)
+            return transcript_list, str(transcript_list)
 
         if parsed_args.exclude_manually_created:
             transcript = transcript_list.find_generated_transcript(parsed_args.languages)
@@ -51,7 +211,45 @@ class YouTubeTranscriptCli(object):
         if parsed_args.translate:
             transcript = transcript.translate(parsed_args.translate)
 
-        return transcript.fetch()
+        return transcript, transcript.fetch()
+
+    def _format_ndjson_record(self, parsed_args, video_id, source, transcript, exception):
+        record = {'video_id': video_id}
+        if exception is not None:
+            record['error'] = type(exception).__name__
+            record['message'] = str(exception)
+        elif parsed_args.list_transcripts:
+            record['transcripts'] = [
+                {
+                    'language': available_transcript.language,
+                    'language_code': available_transcript.language_code,
+                    'is_generated': available_transcript.is_generated,
+                    'is_translatable': available_transcript.is_translatable,
+                }
+                for available_transcript in source
+            ]
+        else:
+            record['language'] = source.language_code
+            record['segments'] = transcript
+        return json.dumps(record)
+
+    def _iter_video_ids(self, parsed_args):
+        for video_id in parsed_args.video_ids:
+            yield video_id
+
+        if parsed_args.input_file == '-':
+            for video_id in self._read_video_ids(sys.stdin):
+                yield video_id
+        elif parsed_args.input_file is not None:
+            with open(parsed_args.input_file, encoding='utf-8') as input_file:
+                for video_id in self._read_video_ids(input_file):
+                    yield video_id
+
+    def _read_video_ids(self, lines):
+        for line in lines:
+            video_id = line.strip()
+            if video_id:
+                yield video_id
 
     def _parse_args(self):
         parser = argparse.ArgumentParser(
@@ -68,7 +266,16 @@ class YouTubeTranscriptCli(object):
             default=False,
             help='This will list the languages in which the given videos are available in.',
         )
-        parser.add_argument('video_ids', nargs='+', type=str, help='List of YouTube video IDs.')
+        parser.add_argument('video_ids', nargs='*', type=str, help='List of YouTube video IDs.')
+        parser.add_argument(
+            '--input-file',
+            default=None,
+            metavar='PATH',
+            help=(
+                'Read additional video IDs from this file, one per line. Use - to read them from stdin. The IDs are '
+                'read lazily, so the input can be arbitrarily long.'
+            ),
+        )
         parser.add_argument(
             '--languages',
             nargs='*',
@@ -99,7 +306,11 @@ class YouTubeTranscriptCli(object):
             '--format',
             type=str,
             default='pretty',
-            choices=tuple(FormatterLoader.TYPES.keys()),
+            choices=tuple(FormatterLoader.TYPES.keys()) + (self.NDJSON_FORMAT,),
+            help=(
+                'The output format. ndjson writes one JSON record per video and line, containing the video_id and '
+                'either the language and segments of the transcript or the error.'
+            ),
         )
         parser.add_argument(
             '--translate',
@@ -127,8 +338,67 @@ class YouTubeTranscriptCli(object):
             default=None,
             help='The cookie file that will be used for authorization with youtube.'
         )
-            
-        return self._sanitize_video_ids(parser.parse_args(self._args))
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='The number of videos which are fetched concurrently.',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=None,
+            metavar='REQUESTS_PER_SECOND',
+            help='The maximum number of videos which are requested per second over all workers.',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=None,
+            metavar='DIR',
+            help=(
+                'Write every transcript to its own file in this directory, named after the video id, as soon as it has '
+                'been retrieved. The paths of the written files are printed.'
+            ),
+        )
+        parser.add_argument(
+            '--corpus',
+            default=None,
+            metavar='PATH',
+            help=(
+                'Append all retrieved transcripts to a single corpus with one row per segment and the columns '
+                'video_id, language_code, is_generated, segment_idx, start, duration and text, instead of printing '
+                'them. If PATH ends with .parquet the corpus is written as one new Parquet file, which must not exist '
+                'yet (this requires pyarrow). Otherwise it is written as a directory of JSON Lines files, and the '
+                'transcripts are appended to the parts which are already in the directory.'
+            ),
+        )
+
+        parser.add_argument(
+            '--cache-dir',
+            default=None,
+            metavar='DIR',
+            help=(
+                'Cache the retrieved transcripts compressed in this directory and read them from it on later runs, '
+                'instead of requesting them again. The hit rate and the bytes saved are printed to stderr.'
+            ),
+        )
+        parser.add_argument(
+            '--cache-max-mb',
+            type=float,
+            default=1024,
+            metavar='MB',
+            help='The maximum size of the transcript cache. The least recently used transcripts are evicted first.',
+        )
+
+        parsed_args = parser.parse_args(self._args)
+        if not parsed_args.video_ids and parsed_args.input_file is None:
+            parser.error('the following arguments are required: video_ids (or --input-file)')
+        if parsed_args.corpus and parsed_args.list_transcripts:
+            parser.error('argument --corpus: not allowed with argument --list-transcripts')
+        if parsed_args.corpus and parsed_args.corpus.lower().endswith('.parquet') and \
+                os.path.exists(parsed_args.corpus):
+            parser.error('argument --corpus: the Parquet file {path} already exists'.format(path=parsed_args.corpus))
+        return self._sanitize_video_ids(parsed_args)
 
     def _sanitize_video_ids(self, args):
         args.video_ids = [video_id.replace('\\', '') for video_id in args.video_ids]
@@ -0,0 +1,43 @@
+import itertools
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def imap_unordered(function, iterable, workers, max_pending=None):
+    """
+    Calls `function` for every item of `iterable` using a pool of `workers` threads and yields the results as soon as
+    they are completed. The iterable is consumed lazily and at most `max_pending` calls are in flight at any time, so
+    memory stays bounded no matter how many items there are.
+
+    :param function: the function which is called with every item
+    :param iterable: the items, which can be any iterable, including generators
+    :param workers: the number of threads
+    :type workers: int
+    :param max_pending: the maximum number of items which have been submitted but not yielded yet. Defaults to twice
+    the number of workers.
+    :type max_pending: int
+    :return: a generator yielding a tuple of the item, the result and the exception raised by the call, for every item
+    :rtype: generator
+    """
+    workers = max(workers, 1)
+    max_pending = max_pending or workers * 2
+    items = iter(iterable)
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in itertools.islice(items, max_pending):
+                pending[executor.submit(function, item)] = item
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    exception = future.exception()
+                    yield item, None if exception is not None else future.result(), exception
+
+                for item in itertools.islice(items, max_pending - len(pending)):
+                    pending[executor.submit(function, item)] = item
+        finally:
+            for future in pending:
+                future.cancel()
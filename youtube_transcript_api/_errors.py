@@ -40,6 +40,9 @@ class YouTubeRequestFailed(CouldNotRetrieveTranscript):
 
     def __init__(self, video_id, http_error):
         self.reason = str(http_error)
+        response = getattr(http_error, 'response', None)
+        self.status_code = response.status_code if response is not None else None
+        self.retry_after = response.headers.get('Retry-After') if response is not None else None
         super(YouTubeRequestFailed, self).__init__(video_id)
 
     @property
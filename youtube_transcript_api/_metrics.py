@@ -0,0 +1,262 @@
+import bisect
+
+import json
+
+import os
+
+import threading
+
+import time
+
+from contextlib import contextmanager
+
+
+# upper bounds of the latency histogram buckets in seconds, from cache lookups to slow watch page fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative_counts = []
+        count = 0
+        for bucket_count in self.bucket_counts:
+            count += bucket_count
+            cumulative_counts.append(count)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], cumulative_counts)),
+        }
+
+
+class MetricsRegistry(object):
+    """
+    Collects counters and latency histograms of the stages of a run, like fetching watch pages, parsing transcripts
+    or looking up the cache. Metrics are identified by their name and optional labels. At the end of a run they can be
+    exported as JSON or written as a Prometheus textfile. The library records into the module level `metrics`
+    registry. Example::
+
+        from youtube_transcript_api import metrics
+
+        YouTubeTranscriptApi.get_transcripts(video_ids)
+
+        print(metrics.to_json())
+        metrics.write_prometheus('/var/lib/node_exporter/textfile_collector/transcripts.prom')
+    """
+
+    def __init__(self, namespace='youtube_transcript_api', buckets=DEFAULT_BUCKETS):
+        """
+        :param namespace: the prefix of every metric name in the Prometheus textfile
+        :type namespace: str
+        :param buckets: the upper bounds of the latency histogram buckets in seconds
+        :type buckets: tuple[float]
+        """
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def __getstate__(self):
+        # a registry can be sent back from a worker process and merged into the registry of the parent process
+        with self._lock:
+            state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        """
+        Increments a counter.
+
+        :param name: the name of the counter, like 'cache_hits'
+        :type name: str
+        :param value: the amount the counter is incremented by
+        :type value: int
+        :param labels: the labels of the counter, like cache='transcripts'
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """
+        Records a latency in a histogram.
+
+        :param name: the name of the histogram, like 'stage_seconds'
+        :type name: str
+        :param seconds: the observed latency
+        :type seconds: float
+        :param labels: the labels of the histogram, like stage='watch_page_fetch'
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Records the duration of the enclosed block in the 'stage_seconds' histogram, also if it raises::
+
+            with metrics.time('watch_page_fetch'):
+                html = fetch(video_id)
+
+        :param stage: the name of the stage
+        :type stage: str
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def merge(self, registry):
+        """
+        Adds the metrics recorded by another registry, like the one of a worker process, to this registry.
+
+        :param registry: the registry whose metrics are added, with the same histogram buckets
+        :type registry: MetricsRegistry
+        """
+        if registry.buckets != self.buckets:
+            raise ValueError('only registries with the same histogram buckets can be merged')
+        with registry._lock:
+            counters = list(registry._counters.items())
+            histograms = [
+                (key, list(histogram.bucket_counts), histogram.count, histogram.sum)
+                for key, histogram in registry._histograms.items()
+            ]
+        with self._lock:
+            for key, value in counters:
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, bucket_counts, count, total in histograms:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = _Histogram(self.buckets)
+                histogram.bucket_counts = [
+                    own_count + other_count for own_count, other_count in zip(histogram.bucket_counts, bucket_counts)
+                ]
+                histogram.count += count
+                histogram.sum += total
+
+    def reset(self):
+        """
+        Removes all recorded metrics.
+        """
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def snapshot(self):
+        """
+        Returns the current values of all metrics. Metrics with labels are keyed like in Prometheus, for example
+        'stage_seconds{stage="watch_page_fetch"}'.
+
+        :return: a dictionary with the 'counters' and 'histograms'. Every histogram contains its 'count', 'sum' and the
+        cumulative 'buckets'.
+        :rtype dict:
+        """
+        with self._lock:
+            return {
+                'counters': {
+                    _format_key(name, labels): value for (name, labels), value in sorted(self._counters.items())
+                },
+                'histograms': {
+                    _format_key(name, labels): histogram.to_dict()
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                },
+            }
+
+    def to_json(self, **kwargs):
+        """
+        :param kwargs: passed on to `json.dumps`, like `indent`
+        :return: the snapshot of all metrics as JSON
+        :rtype str:
+        """
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self):
+        """
+        :return: all metrics in the Prometheus text exposition format
+        :rtype str:
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, histogram.to_dict()) for key, histogram in self._histograms.items())
+
+        lines = []
+        declared_names = set()
+        for (name, labels), value in counters:
+            metric_name = '{namespace}_{name}_total'.format(namespace=self.namespace, name=name)
+            if metric_name not in declared_names:
+                declared_names.add(metric_name)
+                lines.append('# TYPE {metric_name} counter'.format(metric_name=metric_name))
+            lines.append('{key} {value}'.format(key=_format_key(metric_name, labels), value=value))
+
+        for (name, labels), histogram in histograms:
+            metric_name = '{namespace}_{name}'.format(namespace=self.namespace, name=name)
+            if metric_name not in declared_names:
+                declared_names.add(metric_name)
+                lines.append('# TYPE {metric_name} histogram'.format(metric_name=metric_name))
+            for bound, count in histogram['buckets'].items():
+                lines.append('{key} {count}'.format(
+                    key=_format_key(metric_name + '_bucket', labels + (('le', bound),)), count=count,
+                ))
+            lines.append('{key} {sum!r}'.format(key=_format_key(metric_name + '_sum', labels), sum=histogram['sum']))
+            lines.append('{key} {count}'.format(
+                key=_format_key(metric_name + '_count', labels), count=histogram['count'],
+            ))
+        return ''.join(line + '\n' for line in lines)
+
+    def write_json(self, path):
+        """
+        Writes the snapshot of all metrics as JSON to `path`.
+
+        :param path: the path of the JSON file
+        :type path: str
+        """
+        from ._cache import _write_atomically
+
+        _write_atomically(os.path.abspath(path), self.to_json(indent=2).encode('utf-8'))
+
+    def write_prometheus(self, path):
+        """
+        Writes all metrics as a Prometheus textfile, which is replaced atomically so the node exporter textfile
+        collector never reads a partially written file.
+
+        :param path: the path of the textfile, which should end with .prom
+        :type path: str
+        """
+        from ._cache import _write_atomically
+
+        _write_atomically(os.path.abspath(path), self.to_prometheus().encode('utf-8'))
+
+
+def _format_key(name, labels):
+    if not labels:
+        return name
+    return '{name}{{{labels}}}'.format(name=name, labels=','.join(
+        '{label}="{value}"'.format(
+            label=label, value=str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'),
+        )
+        for label, value in labels
+    ))
+
+
+metrics = MetricsRegistry()
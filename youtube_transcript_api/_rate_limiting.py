@@ -0,0 +1,42 @@
+import threading
+
+import time
+
+
+class RateLimiter(object):
+    """
+    Spaces out calls so that no more than `requests_per_second` requests are started per second by all threads
+    sharing the same RateLimiter. Example::
+
+        rate_limiter = RateLimiter(2)
+
+        for video_id in video_ids:
+            rate_limiter.wait()
+            YouTubeTranscriptApi.get_transcript(video_id)
+    """
+
+    def __init__(self, requests_per_second=None):
+        """
+        :param requests_per_second: the maximum number of requests started per second. If this is None or 0 no
+        limit is applied.
+        :type requests_per_second: float
+        """
+        self.requests_per_second = requests_per_second
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """
+        Blocks until the caller is allowed to start its next request.
+        """
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self._interval
+
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,119 @@
+import random
+
+import time
+
+from ._errors import YouTubeRequestFailed
+from ._metrics import metrics
+
+
+class RetryPolicy(object):
+    """
+    Retries calls which failed with a transient error: a `YouTubeRequestFailed` with a 5xx status, a reset or timed
+    out connection, or a YouTube Data API `HttpError` with a 5xx or 429 status. Between two attempts it sleeps for an
+    exponentially growing delay with full jitter, or as long as the `Retry-After` header of the response asks for.
+    Every retry is counted in the 'retries' metric. Permanent errors, like a video without transcripts or a recaptcha,
+    are raised right away. Example::
+
+        retry_policy = RetryPolicy(max_attempts=4)
+
+        transcript = retry_policy.call(YouTubeTranscriptApi.get_transcript, video_id)
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, jitter=random.random, sleep=time.sleep):
+        """
+        :param max_attempts: the maximum number of attempts of a call, 1 disables retrying
+        :type max_attempts: int
+        :param base_delay: the upper bound of the delay before the first retry in seconds, which doubles with every
+        further retry
+        :type base_delay: float
+        :param max_delay: the upper bound of every delay in seconds. If a response asks to retry after a longer time,
+        the error is raised instead.
+        :type max_delay: float
+        """
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._jitter = jitter
+        self._sleep = sleep
+
+    def call(self, function, *args, **kwargs):
+        """
+        Calls `function` with the given arguments until it returns or raises a permanent error, or `max_attempts`
+        attempts failed.
+
+        :return: the return value of `function`
+        """
+        attempt = 1
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except Exception as exception:
+                delay = self.delay(attempt, exception)
+                if delay is None:
+                    if attempt > 1 and is_transient(exception):
+                        metrics.increment('retries_exhausted', error=type(exception).__name__)
+                    raise
+                metrics.increment('retries', error=type(exception).__name__)
+                self._sleep(delay)
+                attempt += 1
+
+    def delay(self, attempt, exception):
+        """
+        :param attempt: the number of the attempt which failed, starting at 1
+        :type attempt: int
+        :param exception: the error the attempt failed with
+        :type exception: Exception
+        :return: the number of seconds to wait before the next attempt, or None if the call must not be retried
+        :rtype: float
+        """
+        if attempt >= self.max_attempts or not is_transient(exception):
+            return None
+
+        retry_after = _retry_after(exception)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return self._jitter() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+
+def is_transient(exception):
+    """
+    :param exception: an error raised by a request to YouTube or the YouTube Data API
+    :type exception: Exception
+    :return: whether the request may succeed if it is sent again
+    :rtype: bool
+    """
+    if isinstance(exception, YouTubeRequestFailed):
+        return exception.status_code is not None and exception.status_code >= 500
+    # the HttpError of the YouTube Data API client, which is not imported so it is not required
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+    if isinstance(exception, (ConnectionError, TimeoutError)):
+        return True
+
+    from requests import ConnectionError as RequestsConnectionError, Timeout
+
+    return isinstance(exception, (RequestsConnectionError, Timeout))
+
+
+def _retry_after(exception):
+    if isinstance(exception, YouTubeRequestFailed):
+        value = exception.retry_after
+    else:
+        response = getattr(exception, 'resp', None)
+        value = response.get('retry-after') if hasattr(response, 'get') else None
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
@@ -0,0 +1,190 @@
+from array import array
+
+from bisect import bisect_left
+
+
+class TranscriptSegments(object):
+    """
+    A compact, columnar representation of a transcript. Start times and durations are stored in `array('d')` and the
+    texts of all segments are stored in a single string with an array of offsets, instead of one dictionary with three
+    boxed objects per segment. It behaves like the list of dictionaries returned by default::
+
+        segments = YouTubeTranscriptApi.get_transcript('video_id', compact=True)
+
+        len(segments)
+        segments[0]  # {'text': 'Hey, this is just a test', 'start': 0.0, 'duration': 1.54}
+        for segment in segments:
+            print(segment['text'])
+
+        # slicing does not copy any data, the slice shares the underlying arrays
+        first_minute = segments.between(0, 60)
+
+        # converts it into the default list of dictionaries
+        segments.to_list()
+    """
+
+    __slots__ = ('_starts', '_durations', '_text', '_text_offsets', '_begin', '_end')
+
+    def __init__(self, starts, durations, text, text_offsets, begin=0, end=None):
+        """
+        You probably don't want to initialize this directly. Use `from_list` or fetch a transcript with `compact=True`.
+
+        :param starts: the start time of every segment in seconds
+        :type starts: array('d')
+        :param durations: the duration of every segment in seconds
+        :type durations: array('d')
+        :param text: the texts of all segments concatenated
+        :type text: str
+        :param text_offsets: the offsets of the texts in `text`, with one more element than there are segments
+        :type text_offsets: array('L')
+        :param begin: the index of the first segment of this view
+        :type begin: int
+        :param end: the index after the last segment of this view
+        :type end: int
+        """
+        self._starts = starts
+        self._durations = durations
+        self._text = text
+        self._text_offsets = text_offsets
+        self._begin = begin
+        self._end = len(starts) if end is None else end
+
+    @classmethod
+    def from_list(cls, transcript):
+        """
+        Creates the compact representation of a transcript in the default list of dictionaries format.
+
+        :param transcript: a list of dictionaries containing the 'text', 'start' and 'duration' keys
+        :type transcript: [{'text': str, 'start': float, 'duration': float}]
+        :rtype TranscriptSegments:
+        """
+        return cls.from_snippets((line['text'], line['start'], line['duration']) for line in transcript)
+
+    @classmethod
+    def from_snippets(cls, snippets):
+        """
+        Creates the compact representation of a transcript from an iterable of snippets.
+
+        :param snippets: tuples of the text, start and duration of every segment
+        :type snippets: iterable[(str, float, float)]
+        :rtype TranscriptSegments:
+        """
+        starts = array('d')
+        durations = array('d')
+        texts = []
+        text_offsets = array('L', [0])
+        offset = 0
+        for text, start, duration in snippets:
+            starts.append(start)
+            durations.append(duration)
+            texts.append(text)
+            offset += len(text)
+            text_offsets.append(offset)
+        return cls(starts, durations, ''.join(texts), text_offsets)
+
+    @property
+    def starts(self):
+        """
+        The start times of the segments in seconds, as a read-only view on the underlying array.
+
+        :rtype memoryview:
+        """
+        return memoryview(self._starts)[self._begin:self._end].toreadonly()
+
+    @property
+    def durations(self):
+        """
+        The durations of the segments in seconds, as a read-only view on the underlying array.
+
+        :rtype memoryview:
+        """
+        return memoryview(self._durations)[self._begin:self._end].toreadonly()
+
+    def text(self, index):
+        """
+        Returns the text of a single segment.
+
+        :param index: the index of the segment
+        :type index: int
+        :rtype str:
+        """
+        index = self._absolute_index(index)
+        return self._text[self._text_offsets[index]:self._text_offsets[index + 1]]
+
+    def texts(self):
+        """
+        Iterates over the texts of all segments.
+
+        :rtype: generator[str]
+        """
+        text = self._text
+        text_offsets = self._text_offsets
+        for index in range(self._begin, self._end):
+            yield text[text_offsets[index]:text_offsets[index + 1]]
+
+    def between(self, start, end):
+        """
+        Returns the segments starting in the time range [start, end), without copying any data.
+
+        :param start: the start of the time range in seconds
+        :type start: float
+        :param end: the end of the time range in seconds
+        :type end: float
+        :rtype TranscriptSegments:
+        """
+        begin = bisect_left(self._starts, start, self._begin, self._end)
+        return self._view(begin, max(begin, bisect_left(self._starts, end, begin, self._end)))
+
+    def to_list(self):
+        """
+        Converts the segments into the default list of dictionaries format.
+
+        :return: a list of dictionaries containing the 'text', 'start' and 'duration' keys
+        :rtype [{'text': str, 'start': float, 'duration': float}]:
+        """
+        return list(self)
+
+    def __len__(self):
+        return self._end - self._begin
+
+    def __iter__(self):
+        starts = self._starts
+        durations = self._durations
+        for index, text in zip(range(self._begin, self._end), self.texts()):
+            yield {'text': text, 'start': starts[index], 'duration': durations[index]}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            begin, end, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('TranscriptSegments can only be sliced with a step of 1')
+            return self._view(self._begin + begin, self._begin + max(begin, end))
+
+        absolute_index = self._absolute_index(index)
+        return {
+            'text': self.text(index),
+            'start': self._starts[absolute_index],
+            'duration': self._durations[absolute_index],
+        }
+
+    def __eq__(self, other):
+        if isinstance(other, (TranscriptSegments, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return '<TranscriptSegments: {count} segments>'.format(count=len(self))
+
+    def _absolute_index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('segment index out of range')
+        return self._begin + index
+
+    def _view(self, begin, end):
+        return TranscriptSegments(self._starts, self._durations, self._text, self._text_offsets, begin, end)
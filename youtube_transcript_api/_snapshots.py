@@ -0,0 +1,129 @@
+import hashlib
+
+import json
+
+import os
+
+import threading
+
+import time
+
+from ._cache import _EXTENSIONS, _compress, _decompress, _default_compression, _write_atomically
+
+
+class WatchPageArchive(object):
+    """
+    An on-disk archive of the watch pages which have been fetched, so new fields can be extracted from them later
+    without requesting them again. The pages are stored compressed and content addressed, so a page which has not
+    changed between two fetches is only stored once. Every fetch is recorded in an index with the video id and the
+    time it was fetched at. Example::
+
+        archive = WatchPageArchive('watch_pages')
+
+        YouTubeTranscriptApi.list_transcript_audio_tracks('video_id', archive=archive)
+
+        for video_id, snapshot in archive.latest_snapshots().items():
+            html = archive.load(snapshot)
+    """
+
+    INDEX_FILE_NAME = 'index.jsonl'
+
+    def __init__(self, directory, compression=None):
+        """
+        :param directory: the directory the archive is stored in, it is created if it does not exist
+        :type directory: str
+        :param compression: 'zstd' or 'zlib'. Defaults to zstd if the `zstandard` package is installed.
+        :type compression: str
+        """
+        self.directory = directory
+        self.compression = _default_compression(compression)
+        self.snapshots_stored = 0
+        self.pages_deduplicated = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+
+    def store(self, video_id, html, fetched_at=None):
+        """
+        Archives a watch page. The page itself is only written if the same content has not been archived before.
+
+        :param video_id: the id of the video the page belongs to
+        :type video_id: str
+        :param html: the watch page
+        :type html: str
+        :param fetched_at: the unix time the page was fetched at, defaults to now
+        :type fetched_at: float
+        :return: the snapshot which has been added to the index
+        :rtype dict:
+        """
+        data = html.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        snapshot = {
+            'video_id': video_id,
+            'fetched_at': time.time() if fetched_at is None else fetched_at,
+            'sha256': content_hash,
+            'compression': self.compression,
+            'bytes': len(data),
+        }
+
+        path = self._blob_path(snapshot)
+        deduplicated = os.path.exists(path)
+        if not deduplicated:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomically(path, _compress(data, self.compression))
+
+        with self._lock:
+            with open(os.path.join(self.directory, self.INDEX_FILE_NAME), 'a', encoding='utf-8') as index_file:
+                index_file.write(json.dumps(snapshot) + '\n')
+            self.snapshots_stored += 1
+            self.pages_deduplicated += deduplicated
+        return snapshot
+
+    def load(self, snapshot):
+        """
+        Loads an archived watch page.
+
+        :param snapshot: a snapshot returned by `store`, `snapshots` or `latest_snapshots`
+        :type snapshot: dict
+        :return: the watch page
+        :rtype str:
+        """
+        with open(self._blob_path(snapshot), 'rb') as file:
+            return _decompress(file.read(), snapshot['compression']).decode('utf-8')
+
+    def snapshots(self, video_id=None):
+        """
+        Lists the archived snapshots, ordered by the time they were fetched at.
+
+        :param video_id: only list the snapshots of this video
+        :type video_id: str
+        :return: the snapshots with the keys 'video_id', 'fetched_at', 'sha256', 'compression' and 'bytes'
+        :rtype list[dict]:
+        """
+        index_path = os.path.join(self.directory, self.INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return []
+
+        snapshots = []
+        with open(index_path, encoding='utf-8') as index_file:
+            for line in index_file:
+                if not line.strip():
+                    continue
+                snapshot = json.loads(line)
+                if video_id is None or snapshot['video_id'] == video_id:
+                    snapshots.append(snapshot)
+        return sorted(snapshots, key=lambda snapshot: snapshot['fetched_at'])
+
+    def latest_snapshots(self):
+        """
+        Returns the most recent snapshot of every archived video.
+
+        :return: a dictionary mapping video ids onto their most recent snapshot
+        :rtype dict[str, dict]:
+        """
+        return {snapshot['video_id']: snapshot for snapshot in self.snapshots()}
+
+    def _blob_path(self, snapshot):
+        content_hash = snapshot['sha256']
+        return os.path.join(
+            self.directory, 'blobs', content_hash[:2], content_hash + _EXTENSIONS[snapshot['compression']],
+        )
@@ -11,9 +11,11 @@ from xml.etree import ElementTree
 
 import re
 
-from requests import HTTPError
+from concurrent.futures import ThreadPoolExecutor
 
 from ._html_unescaping import unescape
+from ._metrics import metrics
+from ._segments import TranscriptSegments
 from ._errors import (
     VideoUnavailable,
     TooManyRequests,
@@ -30,26 +32,43 @@ from ._settings import WATCH_URL
 
 
 def _raise_http_errors(response, video_id):
+    from requests import HTTPError
+
+    metrics.increment('bytes_downloaded', len(response.content))
+    if response.status_code == 429:
+        metrics.increment('http_429_responses')
     try:
         response.raise_for_status()
         return response
     except HTTPError as error:
-        raise YouTubeRequestFailed(error, video_id)
+        raise YouTubeRequestFailed(video_id, error)
 
 
 class TranscriptListFetcher(object):
-    def __init__(self, http_client):
+    def __init__(self, http_client, cache=None, archive=None):
         self._http_client = http_client
+        self._cache = cache
+        self._archive = archive
 
     def fetch(self, video_id):
-        return TranscriptList.build(
-            self._http_client,
-            video_id,
-            self._extract_captions_json(self._fetch_video_html(video_id), video_id),
-        )
+        html = self._fetch_video_html(video_id)
+        with metrics.time('json_extraction'):
+            captions_json = self._extract_captions_json(html, video_id)
+        return TranscriptList.build(self._http_client, video_id, captions_json, cache=self._cache)
 
     def fetch_audio(self, video_id):
-        return self._extract_audio_json(self._fetch_video_html(video_id), video_id)
+        html = self._fetch_video_html(video_id)
+        with metrics.time('json_extraction'):
+            return self._extract_audio_json(html, video_id)
+
+    def fetch_with_audio(self, video_id):
+        return self.extract_with_audio(video_id, self._fetch_video_html(video_id))
+
+    def extract_with_audio(self, video_id, html):
+        with metrics.time('json_extraction'):
+            captions_json = self._extract_captions_json(html, video_id)
+            audio_json = self._extract_audio_json(html, video_id)
+        return TranscriptList.build(self._http_client, video_id, captions_json, cache=self._cache), audio_json
 
 
 
@@ -61,6 +80,7 @@ class TranscriptListFetcher(object):
             if video_id.startswith('http://') or video_id.startswith('https://'):
                 raise InvalidVideoId(video_id)
             if 'class="g-recaptcha"' in html:
+                metrics.increment('recaptcha_blocks')
                 raise TooManyRequests(video_id)
             if '"playabilityStatus":' not in html:
                 raise VideoUnavailable(video_id)
@@ -131,14 +151,23 @@ class TranscriptListFetcher(object):
         self._http_client.cookies.set('CONSENT', 'YES+' + match.group(1), domain='.youtube.com')
 
     def _fetch_video_html(self, video_id):
-        html = self._fetch_html(video_id)
-        if 'action="https://consent.youtube.com/s"' in html:
-            self._create_consent_cookie(html, video_id)
+        with metrics.time('watch_page_fetch'):
             html = self._fetch_html(video_id)
+        if 'action="https://consent.youtube.com/s"' in html:
+            metrics.increment('consent_pages')
+            with metrics.time('consent_handling'):
+                self._create_consent_cookie(html, video_id)
+                html = self._fetch_html(video_id)
             if 'action="https://consent.youtube.com/s"' in html:
                 raise FailedToCreateConsentCookie(video_id)
+        if self._archive is not None and self._is_archivable(html):
+            self._archive.store(video_id, html)
         return html
 
+    def _is_archivable(self, html):
+        # recaptchas and error pages would shadow the last good snapshot of the video in the archive
+        return 'class="g-recaptcha"' not in html and '"playabilityStatus":' in html
+
     def _fetch_html(self, video_id):
         response = self._http_client.get(WATCH_URL.format(video_id=video_id), headers={'Accept-Language': 'en-US'})
         return unescape(_raise_http_errors(response, video_id).text)
@@ -169,7 +198,7 @@ class TranscriptList(object):
         self._translation_languages = translation_languages
 
     @staticmethod
-    def build(http_client, video_id, captions_json):
+    def build(http_client, video_id, captions_json, cache=None):
         """
         Factory method for TranscriptList.
 
@@ -179,6 +208,8 @@ class TranscriptList(object):
         :type video_id: str
         :param captions_json: the JSON parsed from the YouTube pages static HTML
         :type captions_json: dict
+        :param cache: the cache the raw transcripts are read from and stored in
+        :type cache: TranscriptCache
         :return: the created TranscriptList
         :rtype TranscriptList:
         """
@@ -206,6 +237,7 @@ class TranscriptList(object):
                 caption['languageCode'],
                 caption.get('kind', '') == 'asr',
                 translation_languages if caption.get('isTranslatable', False) else [],
+                cache=cache,
             )
 
         return TranscriptList(
@@ -262,6 +294,71 @@ class TranscriptList(object):
         """
         return self._find_transcript(language_codes, [self._manually_created_transcripts])
 
+    def fetch_many(self, language_codes=(), translate_to=(), workers=None, preserve_formatting=False, compact=False):
+        """
+        Fetches several transcripts of this video in parallel over the http session of this list: the native
+        transcripts in `language_codes` and translations into the languages in `translate_to`. The translations are
+        validated against the translation languages which have already been parsed from the watch page, so no request
+        is sent unless all of them are available. Example::
+
+            transcripts = YouTubeTranscriptApi.list_transcripts(video_id).fetch_many(
+                ['en', 'de'], translate_to=['fr', 'es', 'ja'],
+            )
+            print(transcripts['ja'])
+
+        :param language_codes: the languages of the native transcripts. Manually created transcripts are preferred
+        over generated ones. Languages without a native transcript are left out of the result.
+        :type language_codes: list[str]
+        :param translate_to: the languages the transcript is translated into. The translations are made from the first
+        translatable transcript in `language_codes`, or else from the first translatable transcript of the video. If a
+        language is in both lists, its native transcript is fetched.
+        :type translate_to: list[str]
+        :param workers: the number of transcripts which are fetched in parallel, by default all of them
+        :type workers: int
+        :param preserve_formatting: whether to keep select HTML text formatting
+        :type preserve_formatting: bool
+        :param compact: whether to return the transcripts as compact `TranscriptSegments`
+        :type compact: bool
+        :return: the fetched transcripts by their language code
+        :rtype dict[str, [{'text': str, 'start': float, 'duration': float}]]:
+        :raises: NotTranslatable if there are translations but no translatable transcript,
+        TranslationLanguageNotAvailable if a translation language is not available
+        """
+        transcripts = {}
+        for language_code in language_codes:
+            for transcript_dict in (self._manually_created_transcripts, self._generated_transcripts):
+                if language_code in transcript_dict:
+                    transcripts.setdefault(language_code, transcript_dict[language_code])
+                    break
+
+        translate_to = [language_code for language_code in translate_to if language_code not in transcripts]
+        if translate_to:
+            source_transcript = self._find_translation_source(language_codes)
+            for language_code in translate_to:
+                transcripts[language_code] = source_transcript.translate(language_code)
+
+        if not transcripts:
+            return {}
+        workers = min(workers or len(transcripts), len(transcripts))
+
+        def fetch(transcript):
+            return transcript.fetch(preserve_formatting=preserve_formatting, compact=compact)
+
+        if workers <= 1:
+            return {language_code: fetch(transcript) for language_code, transcript in transcripts.items()}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(transcripts, executor.map(fetch, transcripts.values())))
+
+    def _find_translation_source(self, language_codes):
+        translatable_transcripts = [transcript for transcript in self if transcript.is_translatable]
+        for language_code in language_codes:
+            for transcript in translatable_transcripts:
+                if transcript.language_code == language_code:
+                    return transcript
+        if translatable_transcripts:
+            return translatable_transcripts[0]
+        raise NotTranslatable(self.video_id)
+
     def _find_transcript(self, language_codes, transcript_dicts):
         for language_code in language_codes:
             for transcript_dict in transcript_dicts:
@@ -305,7 +402,8 @@ class TranscriptList(object):
 
 
 class Transcript(object):
-    def __init__(self, http_client, video_id, url, language, language_code, is_generated, translation_languages):
+    def __init__(self, http_client, video_id, url, language, language_code, is_generated, translation_languages,
+                 cache=None):
         """
         You probably don't want to initialize this directly. Usually you'll access Transcript objects using a
         TranscriptList.
@@ -319,8 +417,14 @@ class Transcript(object):
         :param language_code:
         :param is_generated:
         :param translation_languages:
+        :param cache: the cache the raw transcript is read from and stored in
+        :type cache: TranscriptCache
         """
         self._http_client = http_client
+        self._cache = cache
+        # (video_id, language_code, is_generated, translation_language_code), translations are keyed by the transcript
+        # they are translated from
+        self._cache_key = (video_id, language_code, is_generated, None)
         self.video_id = video_id
         self._url = url
         self.language = language
@@ -332,18 +436,30 @@ class Transcript(object):
             for translation_language in translation_languages
         }
 
-    def fetch(self, preserve_formatting=False):
+    def fetch(self, preserve_formatting=False, compact=False):
         """
         Loads the actual transcript data.
         :param preserve_formatting: whether to keep select HTML text formatting
         :type preserve_formatting: bool
+        :param compact: whether to return the transcript as compact `TranscriptSegments`, which use a fraction of the
+        memory of the list of dictionaries
+        :type compact: bool
         :return: a list of dictionaries containing the 'text', 'start' and 'duration' keys
         :rtype [{'text': str, 'start': float, 'end': float}]:
         """
-        response = self._http_client.get(self._url, headers={'Accept-Language': 'en-US'})
-        return _TranscriptParser(preserve_formatting=preserve_formatting).parse(
-            _raise_http_errors(response, self.video_id).text,
-        )
+        plain_data = self._fetch_plain_data()
+        with metrics.time('timedtext_parse'):
+            return _TRANSCRIPT_PARSERS[bool(preserve_formatting)].parse(plain_data, compact=compact)
+
+    def _fetch_plain_data(self):
+        plain_data = self._cache.get(*self._cache_key) if self._cache is not None else None
+        if plain_data is None:
+            with metrics.time('timedtext_fetch'):
+                response = self._http_client.get(self._url, headers={'Accept-Language': 'en-US'})
+                plain_data = _raise_http_errors(response, self.video_id).text
+            if self._cache is not None:
+                self._cache.set(*self._cache_key, plain_data)
+        return plain_data
 
     def __str__(self):
         return '{language_code} ("{language}"){translation_description}'.format(
@@ -363,7 +479,7 @@ class Transcript(object):
         if language_code not in self._translation_languages_dict:
             raise TranslationLanguageNotAvailable(self.video_id)
 
-        return Transcript(
+        translated_transcript = Transcript(
             self._http_client,
             self.video_id,
             '{url}&tlang={language_code}'.format(url=self._url, language_code=language_code),
@@ -371,42 +487,96 @@ class Transcript(object):
             language_code,
             True,
             [],
+            cache=self._cache,
         )
+        translated_transcript._cache_key = self._cache_key[:3] + (language_code,)
+        return translated_transcript
+
+
+_FORMATTING_TAGS = [
+    'strong',  # important
+    'em',  # emphasized
+    'b',  # bold
+    'i',  # italic
+    'mark',  # marked
+    'small',  # smaller
+    'del',  # deleted
+    'ins',  # inserted
+    'sub',  # subscript
+    'sup',  # superscript
+]
+
+_HTML_REGEX = re.compile(r'<[^>]*>', re.IGNORECASE)
+_HTML_REGEX_PRESERVING_FORMATTING = re.compile(
+    r'<\/?(?!\/?(' + '|'.join(_FORMATTING_TAGS) + r')\b).*?\b>',
+    re.IGNORECASE,
+)
 
 
 class _TranscriptParser(object):
-    _FORMATTING_TAGS = [
-        'strong',  # important
-        'em',  # emphasized
-        'b',  # bold
-        'i',  # italic
-        'mark',  # marked
-        'small',  # smaller
-        'del',  # deleted
-        'ins',  # inserted
-        'sub',  # subscript
-        'sup',  # superscript
-    ]
+    _FORMATTING_TAGS = _FORMATTING_TAGS
+
+    # the size of the chunks the XML is fed to the parser in. Small chunks keep the parsed but not yet processed
+    # elements in the CPU cache.
+    _CHUNK_SIZE = 16 * 1024
 
     def __init__(self, preserve_formatting=False):
-        self._html_regex = self._get_html_regex(preserve_formatting)
-
-    def _get_html_regex(self, preserve_formatting):
-        if preserve_formatting:
-            formats_regex = '|'.join(self._FORMATTING_TAGS)
-            formats_regex = r'<\/?(?!\/?(' + formats_regex + r')\b).*?\b>'
-            html_regex = re.compile(formats_regex, re.IGNORECASE)
-        else:
-            html_regex = re.compile(r'<[^>]*>', re.IGNORECASE)
-        return html_regex
-
-    def parse(self, plain_data):
+        self._html_regex = _HTML_REGEX_PRESERVING_FORMATTING if preserve_formatting else _HTML_REGEX
+
+    def parse(self, plain_data, compact=False):
+        """
+        Parses the timedtext XML into a list of transcript snippets. The XML is parsed incrementally and every element
+        is discarded as soon as it has been processed, so the full element tree is never built.
+
+        :param plain_data: the timedtext XML
+        :type plain_data: str
+        :param compact: whether to return the compact `TranscriptSegments` instead of a list of dictionaries
+        :type compact: bool
+        :return: a list of dictionaries containing the 'text', 'start' and 'duration' keys
+        :rtype [{'text': str, 'start': float, 'duration': float}]:
+        """
+        if compact:
+            return TranscriptSegments.from_snippets(self._iter_snippets(plain_data))
         return [
-            {
-                'text': re.sub(self._html_regex, '', unescape(xml_element.text)),
-                'start': float(xml_element.attrib['start']),
-                'duration': float(xml_element.attrib.get('dur', '0.0')),
-            }
-            for xml_element in ElementTree.fromstring(plain_data)
-            if xml_element.text is not None
+            {'text': text, 'start': start, 'duration': duration}
+            for text, start, duration in self._iter_snippets(plain_data)
         ]
+
+    def _iter_snippets(self, plain_data):
+        html_regex = self._html_regex
+
+        parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        root = None
+        depth = 0
+
+        for chunk_start in range(0, len(plain_data), self._CHUNK_SIZE):
+            parser.feed(plain_data[chunk_start:chunk_start + self._CHUNK_SIZE])
+            for event, xml_element in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    if depth == 1:
+                        root = xml_element
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                text = xml_element.text
+                if text is not None:
+                    # most snippets contain neither entities nor tags, so skip the expensive work for those
+                    if '&' in text:
+                        text = unescape(text)
+                    if '<' in text:
+                        text = html_regex.sub('', text)
+                    attributes = xml_element.attrib
+                    yield text, float(attributes['start']), float(attributes.get('dur', '0.0'))
+                root.remove(xml_element)
+
+        parser.close()
+
+
+_TRANSCRIPT_PARSERS = {
+    False: _TranscriptParser(preserve_formatting=False),
+    True: _TranscriptParser(preserve_formatting=True),
+}
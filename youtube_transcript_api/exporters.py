@@ -0,0 +1,238 @@
+import json
+
+import os
+
+import re
+
+from ._segments import TranscriptSegments
+
+
+class CorpusWriter(object):
+    """CorpusWriter should be used as an abstract base class.
+
+    A corpus writer appends many transcripts to a single dataset with one
+    row per segment. Rows are buffered column by column and flushed as one
+    batch every `row_group_size` rows, so memory stays bounded no matter
+    how many transcripts are exported. A transcript may be split over two
+    batches. Example::
+
+        with ParquetCorpusWriter('corpus.parquet') as corpus:
+            for video_id, transcript, exception in YouTubeTranscriptApi.iter_transcripts(video_ids):
+                if exception is None:
+                    corpus.write_transcript(video_id, transcript, language_code='en')
+
+    CorpusWriter classes should inherit from this class and implement
+    their own ._write_batch() method.
+    """
+
+    COLUMNS = ('video_id', 'language_code', 'is_generated', 'segment_idx', 'start', 'duration', 'text')
+
+    def __init__(self, row_group_size=100000):
+        """
+        :param row_group_size: the number of rows which are buffered before they are written as one batch
+        :type row_group_size: int
+        """
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self.transcripts_written = 0
+        self._columns = self._empty_columns()
+
+    def write_transcript(self, video_id, transcript, language_code=None, is_generated=None):
+        """Appends all segments of a transcript to the corpus.
+
+        :param video_id: the id of the video the transcript belongs to
+        :type video_id: str
+        :param transcript: a list of dictionaries containing the 'text', 'start' and 'duration' keys, or
+        `TranscriptSegments`
+        :param language_code: the language code of the transcript
+        :type language_code: str
+        :param is_generated: whether the transcript was generated automatically
+        :type is_generated: bool
+        """
+        columns = self._columns
+        if isinstance(transcript, TranscriptSegments):
+            count = len(transcript)
+            columns['start'].extend(transcript.starts)
+            columns['duration'].extend(transcript.durations)
+            columns['text'].extend(transcript.texts())
+        else:
+            count = 0
+            for line in transcript:
+                columns['start'].append(line['start'])
+                columns['duration'].append(line['duration'])
+                columns['text'].append(line['text'])
+                count += 1
+
+        columns['video_id'].extend([video_id] * count)
+        columns['language_code'].extend([language_code] * count)
+        columns['is_generated'].extend([is_generated] * count)
+        columns['segment_idx'].extend(range(count))
+        self.transcripts_written += 1
+
+        while len(columns['video_id']) >= self.row_group_size:
+            self._write_buffered_rows(self.row_group_size)
+
+    def write_transcripts(self, transcripts):
+        """Appends many transcripts to the corpus.
+
+        :param transcripts: any iterable of (video_id, transcript) or (video_id, transcript, language_code,
+        is_generated) tuples, like the items of the dictionary returned by `YouTubeTranscriptApi.get_transcripts`
+        """
+        for item in transcripts:
+            self.write_transcript(*item)
+
+    def flush(self):
+        """Writes the buffered rows as one batch."""
+        rows = len(self._columns['video_id'])
+        if rows > 0:
+            self._write_buffered_rows(rows)
+
+    def close(self):
+        """Writes the remaining buffered rows and closes the dataset."""
+        self.flush()
+
+    def _write_batch(self, columns):
+        raise NotImplementedError('A subclass of CorpusWriter must implement ' \
+            'their own ._write_batch() method.')
+
+    def _write_buffered_rows(self, rows):
+        columns = self._columns
+        self._write_batch({column: values[:rows] for column, values in columns.items()})
+        for values in columns.values():
+            del values[:rows]
+        self.rows_written += rows
+
+    def _empty_columns(self):
+        return {column: [] for column in self.COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ParquetCorpusWriter(CorpusWriter):
+    """Writes the corpus into a single Parquet file, with one row group per
+    batch. A Parquet file cannot be appended to, so the file must not exist
+    yet. Requires pyarrow."""
+
+    def __init__(self, path, row_group_size=100000, compression='zstd'):
+        """
+        :param path: the path of the Parquet file
+        :type path: str
+        :param row_group_size: the number of rows per row group
+        :type row_group_size: int
+        :param compression: the compression codec of the Parquet file
+        :type compression: str
+        :raises: FileExistsError if the Parquet file already exists
+        """
+        import pyarrow as pa
+
+        if os.path.exists(path):
+            raise FileExistsError('The Parquet corpus {path} already exists and cannot be appended to'.format(
+                path=path,
+            ))
+        super(ParquetCorpusWriter, self).__init__(row_group_size)
+        self.path = path
+        self.compression = compression
+        self._schema = pa.schema([
+            ('video_id', pa.string()),
+            ('language_code', pa.string()),
+            ('is_generated', pa.bool_()),
+            ('segment_idx', pa.int32()),
+            ('start', pa.float64()),
+            ('duration', pa.float64()),
+            ('text', pa.string()),
+        ])
+        self._writer = None
+
+    def close(self):
+        """Writes the remaining buffered rows and the Parquet footer. If
+        nothing was written, an empty Parquet file with the corpus schema is
+        created."""
+        super(ParquetCorpusWriter, self).close()
+        if self._writer is None:
+            self._open_writer()
+        self._writer.close()
+
+    def _write_batch(self, columns):
+        import pyarrow as pa
+
+        if self._writer is None:
+            self._open_writer()
+        table = pa.Table.from_pydict(columns, schema=self._schema)
+        self._writer.write_table(table, row_group_size=len(table))
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression=self.compression)
+
+
+class JSONLCorpusWriter(CorpusWriter):
+    """Writes the corpus into a directory of JSON Lines files, with one
+    file named part-00000.jsonl, part-00001.jsonl, ... per batch. If the
+    directory already contains parts, the numbering continues after the
+    last one, so the corpus is appended to."""
+
+    PART_FILE_NAME = 'part-{:05d}.jsonl'
+    _PART_FILE_NAME_REGEX = re.compile(r'^part-(\d+)\.jsonl$')
+
+    def __init__(self, directory, row_group_size=100000):
+        """
+        :param directory: the directory the part files are written to, it is created if it does not exist
+        :type directory: str
+        :param row_group_size: the number of rows per part file
+        :type row_group_size: int
+        """
+        super(JSONLCorpusWriter, self).__init__(row_group_size)
+        self.directory = directory
+        self.parts_written = 0
+        os.makedirs(directory, exist_ok=True)
+        self._first_part = 1 + max((
+            int(match.group(1))
+            for match in map(self._PART_FILE_NAME_REGEX.match, os.listdir(directory))
+            if match is not None
+        ), default=-1)
+
+    def _write_batch(self, columns):
+        path = os.path.join(self.directory, self.PART_FILE_NAME.format(self._first_part + self.parts_written))
+        with open(path, 'w', encoding='utf-8') as file:
+            for row in zip(*(columns[column] for column in self.COLUMNS)):
+                file.write(json.dumps(dict(zip(self.COLUMNS, row))))
+                file.write('\n')
+        self.parts_written += 1
+
+
+class CorpusWriterLoader(object):
+    TYPES = {
+        'parquet': ParquetCorpusWriter,
+        'jsonl': JSONLCorpusWriter,
+    }
+
+    class UnknownCorpusType(Exception):
+        def __init__(self, corpus_type):
+            super(CorpusWriterLoader.UnknownCorpusType, self).__init__(
+                'The corpus format \'{corpus_type}\' is not supported. '
+                'Choose one of the following formats: {supported_corpus_types}'.format(
+                    corpus_type=corpus_type,
+                    supported_corpus_types=', '.join(CorpusWriterLoader.TYPES.keys()),
+                )
+            )
+
+    def load(self, path, corpus_type=None, **kwargs):
+        """
+        Loads the CorpusWriter for the given path. If no corpus type is
+        given, paths ending with .parquet are written as Parquet and all
+        other paths as a directory of JSON Lines files.
+
+        :param path: the path of the Parquet file or JSON Lines directory
+        :param corpus_type: 'parquet' or 'jsonl'
+        :return: CorpusWriter object
+        """
+        if corpus_type is None:
+            corpus_type = 'parquet' if path.lower().endswith('.parquet') else 'jsonl'
+        if corpus_type not in CorpusWriterLoader.TYPES.keys():
+            raise CorpusWriterLoader.UnknownCorpusType(corpus_type)
+        return CorpusWriterLoader.TYPES[corpus_type](path, **kwargs)
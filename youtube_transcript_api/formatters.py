@@ -1,6 +1,14 @@
+import itertools
+
+from collections.abc import Iterable
+
 import json
 
-import pprint
+from ._segments import TranscriptSegments
+
+
+# the number of lines which are encoded at once by the write_transcript() methods
+_CHUNK_SIZE = 1000
 
 
 class Formatter(object):
@@ -19,6 +27,24 @@ class Formatter(object):
         raise NotImplementedError('A subclass of Formatter must implement ' \
                                   'their own .format_transcripts() method.')
 
+    def write_transcript(self, transcript, fp, **kwargs):
+        """Writes a formatted transcript to a file-like object. Subclasses
+        override this to write the transcript in chunks instead of building
+        the whole document in memory first.
+
+        :param transcript:
+        :param fp: a file-like object with a write() method
+        """
+        fp.write(self.format_transcript(transcript, **kwargs))
+
+    def write_transcripts(self, transcripts, fp, **kwargs):
+        """Writes formatted transcripts to a file-like object.
+
+        :param transcripts: any iterable of transcripts, including generators
+        :param fp: a file-like object with a write() method
+        """
+        fp.write(self.format_transcripts(list(transcripts), **kwargs))
+
 
 class PrettyPrintFormatter(Formatter):
     def format_transcript(self, transcript, **kwargs):
@@ -28,7 +54,9 @@ class PrettyPrintFormatter(Formatter):
         :return: A pretty printed string representation of the transcript.'
         :rtype str
         """
-        return pprint.pformat(transcript, **kwargs)
+        import pprint
+
+        return pprint.pformat(_to_list(transcript), **kwargs)
 
     def format_transcripts(self, transcripts, **kwargs):
         """Pretty prints a list of transcripts.
@@ -37,7 +65,7 @@ class PrettyPrintFormatter(Formatter):
         :return: A pretty printed string representation of the transcripts.'
         :rtype str
         """
-        return self.format_transcript(transcripts, **kwargs)
+        return self.format_transcript([_to_list(transcript) for transcript in transcripts], **kwargs)
 
 
 class JSONFormatter(Formatter):
@@ -48,6 +76,7 @@ class JSONFormatter(Formatter):
         :return: A JSON string representation of the transcript.'
         :rtype str
         """
+        kwargs.setdefault('default', _to_list)
         return json.dumps(transcript, **kwargs)
 
     def format_transcripts(self, transcripts, **kwargs):
@@ -59,6 +88,47 @@ class JSONFormatter(Formatter):
         """
         return self.format_transcript(transcripts, **kwargs)
 
+    def write_transcript(self, transcript, fp, **kwargs):
+        """Writes a transcript to a file-like object as a JSON array,
+        encoding _CHUNK_SIZE lines at a time. The output is identical to
+        format_transcript().
+
+        :param transcript:
+        :param fp: a file-like object with a write() method
+        """
+        if kwargs.get('indent') is not None or not _is_line_iterable(transcript):
+            fp.write(self.format_transcript(transcript, **kwargs))
+            return
+
+        kwargs.setdefault('default', _to_list)
+        item_separator = (kwargs.get('separators') or (', ', ': '))[0]
+        fp.write('[')
+        for i, lines in enumerate(_chunks(transcript, _CHUNK_SIZE)):
+            if i > 0:
+                fp.write(item_separator)
+            fp.write(json.dumps(lines, **kwargs)[1:-1])
+        fp.write(']')
+
+    def write_transcripts(self, transcripts, fp, **kwargs):
+        """Writes transcripts to a file-like object as a JSON array of
+        transcripts, one transcript at a time. The output is identical to
+        format_transcripts().
+
+        :param transcripts: any iterable of transcripts, including generators
+        :param fp: a file-like object with a write() method
+        """
+        if kwargs.get('indent') is not None:
+            fp.write(self.format_transcripts(list(transcripts), **kwargs))
+            return
+
+        item_separator = (kwargs.get('separators') or (', ', ': '))[0]
+        fp.write('[')
+        for i, transcript in enumerate(transcripts):
+            if i > 0:
+                fp.write(item_separator)
+            self.write_transcript(transcript, fp, **kwargs)
+        fp.write(']')
+
 
 class TextFormatter(Formatter):
     def format_transcript(self, transcript, **kwargs):
@@ -79,14 +149,39 @@ class TextFormatter(Formatter):
         """
         return '\n\n\n'.join([self.format_transcript(transcript, **kwargs) for transcript in transcripts])
 
+    def write_transcript(self, transcript, fp, **kwargs):
+        """Writes a transcript to a file-like object as plain text, _CHUNK_SIZE
+        lines at a time.
+
+        :param transcript:
+        :param fp: a file-like object with a write() method
+        """
+        for i, lines in enumerate(_chunks(transcript, _CHUNK_SIZE)):
+            if i > 0:
+                fp.write('\n')
+            fp.write('\n'.join(line['text'] for line in lines))
+
+    def write_transcripts(self, transcripts, fp, **kwargs):
+        """Writes transcripts to a file-like object, one transcript at a time.
+
+        :param transcripts: any iterable of transcripts, including generators
+        :param fp: a file-like object with a write() method
+        """
+        for i, transcript in enumerate(transcripts):
+            if i > 0:
+                fp.write('\n\n\n')
+            self.write_transcript(transcript, fp, **kwargs)
+
+
 class _TextBasedFormatter(TextFormatter):
+    _TRANSCRIPT_HEADER = ''
+
     def _format_timestamp(self, hours, mins, secs, ms):
         raise NotImplementedError('A subclass of _TextBasedFormatter must implement ' \
             'their own .format_timestamp() method.')
 
     def _format_transcript_header(self, lines):
-        raise NotImplementedError('A subclass of _TextBasedFormatter must implement ' \
-            'their own _format_transcript_header method.')
+        return self._TRANSCRIPT_HEADER + '\n\n'.join(lines) + '\n'
 
     def _format_transcript_helper(self, i, time_text, line):
         raise NotImplementedError('A subclass of _TextBasedFormatter must implement ' \
@@ -106,10 +201,21 @@ class _TextBasedFormatter(TextFormatter):
         '00:00:06.930'
         """
         time = float(time)
-        hours_float, remainder = divmod(time, 3600)
-        mins_float, secs_float = divmod(remainder, 60)
-        hours, mins, secs = int(hours_float), int(mins_float), int(secs_float)
-        ms = int(round((time - int(time))*1000, 2))
+        if time < 0:
+            hours_float, remainder = divmod(time, 3600)
+            mins_float, secs_float = divmod(remainder, 60)
+            hours, mins, secs = int(hours_float), int(mins_float), int(secs_float)
+            ms = int(round((time - int(time))*1000, 2))
+            return self._format_timestamp(hours, mins, secs, ms)
+
+        seconds = int(time)
+        ms_float = (time - seconds)*1000
+        ms = int(ms_float)
+        # rounding to 2 decimals can only carry into the next millisecond if the fraction is at least .995
+        if ms_float - ms >= 0.99:
+            ms = int(round(ms_float, 2))
+        mins, secs = divmod(seconds, 60)
+        hours, mins = divmod(mins, 60)
         return self._format_timestamp(hours, mins, secs, ms)
 
     def format_transcript(self, transcript, **kwargs):
@@ -120,43 +226,87 @@ class _TextBasedFormatter(TextFormatter):
         https://www.w3.org/TR/webvtt1/#introduction-caption
         https://www.3playmedia.com/blog/create-srt-file/
         """
-        lines = []
-        for i, line in enumerate(transcript):
+        return self._format_transcript_header(list(self._iter_cues(transcript)))
+
+    def write_transcript(self, transcript, fp, **kwargs):
+        """Writes a transcript to a file-like object, _CHUNK_SIZE cues at a
+        time. The output is identical to format_transcript().
+
+        :param transcript:
+        :param fp: a file-like object with a write() method
+        """
+        fp.write(self._TRANSCRIPT_HEADER)
+        for i, cues in enumerate(_chunks(self._iter_cues(transcript), _CHUNK_SIZE)):
+            if i > 0:
+                fp.write('\n\n')
+            fp.write('\n\n'.join(cues))
+        fp.write('\n')
+
+    def _iter_cues(self, transcript):
+        """Formats the cues of a transcript one by one. A cue ends when the
+        next one starts, if they overlap, in which case the timestamp of the
+        next start is reused instead of being formatted twice.
+        """
+        lines = iter(transcript)
+        line = next(lines, None)
+        if line is None:
+            return
+        start_timestamp = self._seconds_to_timestamp(line['start'])
+
+        for i in itertools.count():
+            next_line = next(lines, None)
             end = line['start'] + line['duration']
-            time_text = "{} --> {}".format(
-                self._seconds_to_timestamp(line['start']),
-                self._seconds_to_timestamp(
-                    transcript[i + 1]['start'] 
-                    if i < len(transcript) - 1 and transcript[i + 1]['start'] < end else end
+            if next_line is None:
+                yield self._format_transcript_helper(
+                    i, '{} --> {}'.format(start_timestamp, self._seconds_to_timestamp(end)), line
                 )
-            )
-            lines.append(self._format_transcript_helper(i, time_text, line))
+                return
 
-        return self._format_transcript_header(lines)
+            next_start_timestamp = self._seconds_to_timestamp(next_line['start'])
+            end_timestamp = next_start_timestamp if next_line['start'] < end else self._seconds_to_timestamp(end)
+            yield self._format_transcript_helper(i, '{} --> {}'.format(start_timestamp, end_timestamp), line)
+            line, start_timestamp = next_line, next_start_timestamp
 
 
 class SRTFormatter(_TextBasedFormatter):
     def _format_timestamp(self, hours, mins, secs, ms):
-        return "{:02d}:{:02d}:{:02d},{:03d}".format(hours, mins, secs, ms)
-    
-    def _format_transcript_header(self, lines):
-        return "\n\n".join(lines) + "\n"
+        return "%02d:%02d:%02d,%03d" % (hours, mins, secs, ms)
 
     def _format_transcript_helper(self, i, time_text, line):
         return "{}\n{}\n{}".format(i + 1, time_text, line['text'])
 
 
 class WebVTTFormatter(_TextBasedFormatter):
-    def _format_timestamp(self, hours, mins, secs, ms):
-        return "{:02d}:{:02d}:{:02d}.{:03d}".format(hours, mins, secs, ms)
+    _TRANSCRIPT_HEADER = 'WEBVTT\n\n'
 
-    def _format_transcript_header(self, lines):
-        return "WEBVTT\n\n" + "\n\n".join(lines) + "\n"
+    def _format_timestamp(self, hours, mins, secs, ms):
+        return "%02d:%02d:%02d.%03d" % (hours, mins, secs, ms)
 
     def _format_transcript_helper(self, i, time_text, line):
         return "{}\n{}".format(time_text, line['text'])
 
 
+def _chunks(iterable, size):
+    """Splits an iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+def _is_line_iterable(transcript):
+    """Checks if a transcript is an iterable of lines, rather than an already formatted string."""
+    return isinstance(transcript, Iterable) and not isinstance(transcript, (str, bytes, dict))
+
+
+def _to_list(transcript):
+    """Converts compact `TranscriptSegments` into the default list of dictionaries, other values are returned as is."""
+    if isinstance(transcript, TranscriptSegments):
+        return transcript.to_list()
+    return transcript
+
+
 class FormatterLoader(object):
     TYPES = {
         'json': JSONFormatter,
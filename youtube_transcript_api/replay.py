@@ -0,0 +1,357 @@
+"""
+Record/replay transports for offline, deterministic runs. A `CassetteStore` keeps compressed HTTP responses on disk.
+The recording transports pass requests on to the network and save every response, the replay transports serve the
+saved responses without any network traffic, optionally with simulated latency and injected errors::
+
+    store = CassetteStore('cassettes')
+
+    # record a run against live YouTube
+    YouTubeTranscriptApi.http_adapter = RecordingAdapter(store)
+    YouTubeTranscriptApi.get_transcript('video_id')
+
+    # replay it later, without network, with 50ms latency per request and 1% of the requests failing
+    YouTubeTranscriptApi.http_adapter = ReplayAdapter(store, latency=0.05, error_rate=0.01)
+    YouTubeTranscriptApi.get_transcript('video_id')
+
+The requests transports are adapters which can be mounted on any `requests.Session`. `RecordingHttp` and `ReplayHttp`
+do the same for clients which use an `httplib2.Http` object, like the `googleapiclient` YouTube Data API client.
+"""
+import base64
+
+import hashlib
+
+import json
+
+import os
+
+import random
+
+import threading
+
+import time
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ._cache import _EXTENSIONS, _compress, _decompress, _default_compression, _write_atomically
+
+
+# query parameters which are not part of the cassette key and are never written to a cassette
+_SECRET_QUERY_PARAMETERS = ('key',)
+
+# headers describing the transfer of the original body, which no longer apply to the decoded body in the cassette
+_TRANSFER_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+
+class CassetteNotFound(requests.ConnectionError):
+    """
+    Raised when a request is replayed which has not been recorded.
+    """
+
+
+class CassetteStore(object):
+    """
+    Stores HTTP responses compressed on disk, one file per request. Requests are identified by their method, their url
+    with sorted query parameters and their body. API keys in the query are neither part of the key nor stored.
+    """
+
+    def __init__(self, directory, compression=None):
+        """
+        :param directory: the directory the cassettes are stored in, it is created if it does not exist
+        :type directory: str
+        :param compression: 'zstd' or 'zlib'. Defaults to zstd if the `zstandard` package is installed.
+        :type compression: str
+        """
+        self.directory = directory
+        self.compression = _default_compression(compression)
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, method, url, body, status, reason, headers, content):
+        """
+        Saves the response to a request.
+
+        :param method: the http method of the request
+        :type method: str
+        :param url: the url of the request
+        :type url: str
+        :param body: the body of the request
+        :type body: str or bytes
+        :param status: the status code of the response
+        :type status: int
+        :param reason: the reason phrase of the response
+        :type reason: str
+        :param headers: the headers of the response
+        :type headers: dict[str, str]
+        :param content: the decoded body of the response
+        :type content: bytes
+        """
+        cassette = {
+            'method': method.upper(),
+            'url': _normalize_url(url),
+            'status': status,
+            'reason': reason,
+            'headers': {
+                name: value for name, value in headers.items() if name.lower() not in _TRANSFER_HEADERS
+            },
+            'content': base64.b64encode(content or b'').decode('ascii'),
+        }
+        _write_atomically(
+            self._path(method, url, body),
+            _compress(json.dumps(cassette).encode('utf-8'), self.compression),
+        )
+
+    def load(self, method, url, body=None):
+        """
+        Loads the recorded response to a request.
+
+        :return: a dictionary with the 'status', 'reason', 'headers' and 'content' of the response, or None if the
+        request has not been recorded
+        :rtype dict:
+        """
+        try:
+            with open(self._path(method, url, body), 'rb') as file:
+                cassette = json.loads(_decompress(file.read(), self.compression).decode('utf-8'))
+        except FileNotFoundError:
+            return None
+        cassette['content'] = base64.b64decode(cassette['content'])
+        return cassette
+
+    def _path(self, method, url, body):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key = hashlib.sha1()
+        key.update(method.upper().encode('utf-8') + b' ' + _normalize_url(url).encode('utf-8') + b'\n')
+        key.update(body or b'')
+        return os.path.join(self.directory, key.hexdigest() + '.json' + _EXTENSIONS[self.compression])
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    A `requests` transport adapter which sends requests to the network and saves every response in a `CassetteStore`.
+    """
+
+    def __init__(self, store, **kwargs):
+        """
+        :param store: the store the responses are saved in
+        :type store: CassetteStore
+        :param kwargs: passed on to `requests.adapters.HTTPAdapter`, like `pool_maxsize`
+        """
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super(RecordingAdapter, self).send(request, **kwargs)
+        self.store.save(
+            request.method, request.url, request.body, response.status_code, response.reason, response.headers,
+            response.content,
+        )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A `requests` transport adapter which serves the responses saved in a `CassetteStore`, without any network traffic.
+    Requests which have not been recorded raise `CassetteNotFound`.
+    """
+
+    def __init__(self, store, latency=0.0, error_rate=0.0, error_status=429, seed=None):
+        """
+        :param store: the store the responses are loaded from
+        :type store: CassetteStore
+        :param latency: the number of seconds every request is delayed by
+        :type latency: float
+        :param error_rate: the share of requests, between 0 and 1, which fail instead of being replayed
+        :type error_rate: float
+        :param error_status: the status code of the failing requests. If this is None, they raise a
+        `requests.ConnectionError` instead.
+        :type error_status: int
+        :param seed: the seed deciding which requests fail, for reproducible runs
+        :type seed: int
+        """
+        super(ReplayAdapter, self).__init__()
+        self.store = store
+        self._simulation = _Simulation(latency, error_rate, seed)
+        self.error_status = error_status
+
+    @property
+    def stats(self):
+        """
+        The number of replayed requests, injected errors and requests which had not been recorded.
+
+        :rtype dict:
+        """
+        return self._simulation.stats()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self._simulation.next_request_fails():
+            if self.error_status is None:
+                raise requests.ConnectionError('Simulated connection error', request=request)
+            return self._build_response(request, self.error_status, 'Simulated Error', {}, b'')
+
+        cassette = self.store.load(request.method, request.url, request.body)
+        if cassette is None:
+            self._simulation.count('misses')
+            raise CassetteNotFound('No recorded response for {method} {url}'.format(
+                method=request.method, url=_normalize_url(request.url),
+            ), request=request)
+
+        self._simulation.count('replayed')
+        return self._build_response(
+            request, cassette['status'], cassette['reason'], cassette['headers'], cassette['content'],
+        )
+
+    def close(self):
+        pass
+
+    def _build_response(self, request, status, reason, headers, content):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+class RecordingHttp(object):
+    """
+    An `httplib2.Http` replacement which sends requests to the network and saves every response in a `CassetteStore`.
+    It can be passed to `googleapiclient.discovery.build(..., http=RecordingHttp(store))`.
+    """
+
+    def __init__(self, store, http=None):
+        """
+        :param store: the store the responses are saved in
+        :type store: CassetteStore
+        :param http: the http object the requests are sent with, defaults to a new `httplib2.Http`
+        :type http: httplib2.Http
+        """
+        if http is None:
+            import httplib2
+
+            http = httplib2.Http()
+        self.store = store
+        self.http = http
+        self._lock = threading.Lock()
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        # httplib2.Http objects are not thread safe
+        with self._lock:
+            response, content = self.http.request(
+                uri, method, body=body, headers=headers, redirections=redirections, connection_type=connection_type,
+            )
+        self.store.save(
+            method, uri, body, response.status, response.reason,
+            {name: value for name, value in response.items() if name not in ('status', 'content-location')},
+            content,
+        )
+        return response, content
+
+    def close(self):
+        self.http.close()
+
+
+class ReplayHttp(object):
+    """
+    An `httplib2.Http` replacement which serves the responses saved in a `CassetteStore`, without any network traffic.
+    It can be passed to `googleapiclient.discovery.build(..., http=ReplayHttp(store))`. Requests which have not been
+    recorded are answered with a 404 response, which `googleapiclient` raises as an `HttpError`, like any other
+    failing API call.
+    """
+
+    def __init__(self, store, latency=0.0, error_rate=0.0, error_status=429, seed=None):
+        """
+        :param store: the store the responses are loaded from
+        :type store: CassetteStore
+        :param latency: the number of seconds every request is delayed by
+        :type latency: float
+        :param error_rate: the share of requests, between 0 and 1, which fail instead of being replayed
+        :type error_rate: float
+        :param error_status: the status code of the failing requests
+        :type error_status: int
+        :param seed: the seed deciding which requests fail, for reproducible runs
+        :type seed: int
+        """
+        self.store = store
+        self._simulation = _Simulation(latency, error_rate, seed)
+        self.error_status = error_status
+
+    @property
+    def stats(self):
+        """
+        The number of replayed requests, injected errors and requests which had not been recorded.
+
+        :rtype dict:
+        """
+        return self._simulation.stats()
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+
+        if self._simulation.next_request_fails():
+            return httplib2.Response({'status': str(self.error_status)}), b''
+
+        cassette = self.store.load(method, uri, body)
+        if cassette is None:
+            self._simulation.count('misses')
+            message = 'No recorded response for {method} {url}'.format(method=method, url=_normalize_url(uri))
+            return (
+                httplib2.Response({'status': '404', 'content-type': 'application/json'}),
+                json.dumps({'error': {'code': 404, 'message': message}}).encode('utf-8'),
+            )
+
+        self._simulation.count('replayed')
+        response = httplib2.Response(dict(cassette['headers'], status=str(cassette['status'])))
+        response.reason = cassette['reason']
+        return response, cassette['content']
+
+    def close(self):
+        pass
+
+
+class _Simulation(object):
+    def __init__(self, latency, error_rate, seed):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {'replayed': 0, 'errors_injected': 0, 'misses': 0}
+
+    def next_request_fails(self):
+        """
+        Delays the current request by the simulated latency and decides whether it fails.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        if not self.error_rate:
+            return False
+        with self._lock:
+            fails = self._random.random() < self.error_rate
+        if fails:
+            self.count('errors_injected')
+        return fails
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+def _normalize_url(url):
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in _SECRET_QUERY_PARAMETERS
+    )
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
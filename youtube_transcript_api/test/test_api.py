@@ -3,6 +3,12 @@ from mock import patch
 
 import os
 
+import shutil
+
+import tempfile
+
+import time
+
 import requests
 
 import httpretty
@@ -21,7 +27,12 @@ from youtube_transcript_api import (
     FailedToCreateConsentCookie,
     YouTubeRequestFailed,
     InvalidVideoId,
+    RateLimiter,
+    TranscriptSegments,
+    TranscriptCache,
+    WatchPageArchive,
 )
+from youtube_transcript_api._transcripts import _TranscriptParser
 
 
 def load_asset(filename):
@@ -62,6 +73,158 @@ class TestYouTubeTranscriptApi(TestCase):
             ]
         )
 
+    def test_get_transcript__compact(self):
+        transcript = YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8', compact=True)
+
+        self.assertIsInstance(transcript, TranscriptSegments)
+        self.assertEqual(len(transcript), 3)
+        self.assertEqual(transcript[1], {'text': 'this is not the original transcript', 'start': 1.54, 'duration': 4.16})
+        self.assertEqual(transcript, YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8'))
+
+    def test_get_transcript__cache(self):
+        cache = TranscriptCache(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, cache.directory)
+
+        transcript = YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8', cache=cache)
+        timedtext_requests = [r for r in httpretty.latest_requests() if r.path.startswith('/api/timedtext')]
+        cached_transcript = YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8', cache=cache)
+
+        self.assertEqual(cached_transcript, transcript)
+        self.assertEqual(
+            len([r for r in httpretty.latest_requests() if r.path.startswith('/api/timedtext')]),
+            len(timedtext_requests),
+        )
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['bytes_saved'], len(load_asset('transcript.xml.static')))
+        self.assertLess(stats['size_bytes'], stats['bytes_saved'])
+
+    def test_get_transcript__cache_translations_are_keyed_separately(self):
+        cache = TranscriptCache(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, cache.directory)
+
+        transcript = YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8', cache=cache).find_transcript(['en'])
+        transcript.fetch()
+        transcript.translate('af').fetch()
+
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertIsNotNone(cache.get('GJLlxj_dtq8', 'en', transcript.is_generated, 'af'))
+
+    def test_transcript_cache__evicts_least_recently_used(self):
+        cache = TranscriptCache(tempfile.mkdtemp(), max_bytes=200, compression='zlib')
+        self.addCleanup(shutil.rmtree, cache.directory)
+        plain_data = ''.join(chr(ord('a') + i % 26) * (i % 7 + 1) for i in range(60))
+
+        cache.set('v1', 'en', False, None, plain_data)
+        cache.set('v2', 'en', False, None, plain_data)
+        cache.get('v1', 'en', False)
+        cache.set('v3', 'en', False, None, plain_data)
+
+        self.assertEqual(cache.get('v1', 'en', False), plain_data)
+        self.assertIsNone(cache.get('v2', 'en', False))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(TranscriptCache(cache.directory, max_bytes=200, compression='zlib').size, cache.size)
+
+    def test_get_transcripts__cache(self):
+        cache = TranscriptCache(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, cache.directory)
+
+        YouTubeTranscriptApi.get_transcripts(['GJLlxj_dtq8'], cache=cache)
+        transcripts, _ = YouTubeTranscriptApi.get_transcripts(['GJLlxj_dtq8'], cache=cache)
+
+        self.assertEqual(transcripts['GJLlxj_dtq8'], YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8'))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_list_transcripts__archive(self):
+        archive = WatchPageArchive(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, archive.directory)
+
+        YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8', archive=archive)
+        YouTubeTranscriptApi.list_transcript_audio_tracks('GJLlxj_dtq8', archive=archive)
+
+        snapshots = archive.snapshots('GJLlxj_dtq8')
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[0]['sha256'], snapshots[1]['sha256'])
+        self.assertEqual(archive.pages_deduplicated, 1)
+        self.assertEqual(list(archive.latest_snapshots()), ['GJLlxj_dtq8'])
+        self.assertIn('"captions":', archive.load(snapshots[0]))
+
+    def test_list_transcripts__archive_skips_blocked_pages(self):
+        archive = WatchPageArchive(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, archive.directory)
+        YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8', archive=archive)
+        for asset in ('youtube_too_many_requests.html.static', 'youtube_video_unavailable.html.static'):
+            httpretty.register_uri(httpretty.GET, 'https://www.youtube.com/watch', body=load_asset(asset))
+
+            with self.assertRaises((TooManyRequests, VideoUnavailable)):
+                YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8', archive=archive)
+
+        self.assertEqual(len(archive.snapshots('GJLlxj_dtq8')), 1)
+        self.assertIn('"captions":', archive.load(archive.latest_snapshots()['GJLlxj_dtq8']))
+
+    def test_watch_page_archive__latest_snapshots(self):
+        archive = WatchPageArchive(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, archive.directory)
+
+        archive.store('video_1', 'new page', fetched_at=2)
+        archive.store('video_1', 'old page', fetched_at=1)
+        archive.store('video_2', 'old page', fetched_at=1)
+
+        latest_snapshots = archive.latest_snapshots()
+        self.assertEqual(archive.load(latest_snapshots['video_1']), 'new page')
+        self.assertEqual(archive.load(latest_snapshots['video_2']), 'old page')
+        self.assertEqual(archive.pages_deduplicated, 1)
+        self.assertEqual([snapshot['fetched_at'] for snapshot in archive.snapshots('video_1')], [1, 2])
+
+    def test_extract_transcript_audio_tracks(self):
+        archive = WatchPageArchive(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, archive.directory)
+        transcript_list, (audio_tracks, _) = YouTubeTranscriptApi.list_transcript_audio_tracks(
+            'GJLlxj_dtq8', archive=archive
+        )
+        request_count = len(httpretty.latest_requests())
+
+        extracted_transcript_list, (extracted_audio_tracks, html) = (
+            YouTubeTranscriptApi.extract_transcript_audio_tracks(
+                'GJLlxj_dtq8', archive.load(archive.latest_snapshots()['GJLlxj_dtq8'])
+            )
+        )
+
+        self.assertEqual(len(httpretty.latest_requests()), request_count)
+        self.assertEqual(str(extracted_transcript_list), str(transcript_list))
+        self.assertEqual(extracted_audio_tracks, audio_tracks)
+
+    def test_transcript_segments(self):
+        transcript = [
+            {'text': 'first', 'start': 0.0, 'duration': 1.5},
+            {'text': '', 'start': 1.5, 'duration': 2.0},
+            {'text': 'third', 'start': 3.5, 'duration': 1.0},
+            {'text': 'fourth', 'start': 4.5, 'duration': 0.5},
+        ]
+        segments = TranscriptSegments.from_list(transcript)
+
+        self.assertEqual(segments.to_list(), transcript)
+        self.assertEqual(segments[-1], transcript[-1])
+        self.assertEqual(list(segments.texts()), ['first', '', 'third', 'fourth'])
+        self.assertEqual(segments[1:3], transcript[1:3])
+        self.assertEqual(segments[1:][1:], transcript[2:])
+        self.assertEqual(segments[1:3].text(0), '')
+        self.assertEqual(list(segments[2:].starts), [3.5, 4.5])
+        self.assertEqual(segments.between(1.5, 4.5), transcript[1:3])
+        self.assertEqual(segments[2:].between(0, 4), transcript[2:3])
+        self.assertEqual(len(segments.between(10, 20)), 0)
+        with self.assertRaises(IndexError):
+            segments[1:3][2]
+        with self.assertRaises(ValueError):
+            segments[::2]
+
+    def test_get_transcripts__compact(self):
+        transcripts, unretrievable_videos = YouTubeTranscriptApi.get_transcripts(['GJLlxj_dtq8'], compact=True)
+
+        self.assertIsInstance(transcripts['GJLlxj_dtq8'], TranscriptSegments)
+        self.assertEqual(unretrievable_videos, [])
+
     def test_get_transcript_formatted(self):
         transcript = YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8', preserve_formatting=True)
 
@@ -142,6 +305,51 @@ class TestYouTubeTranscriptApi(TestCase):
         with self.assertRaises(NotTranslatable):
             transcript.translate('af')
 
+    def test_fetch_many(self):
+        transcript_list = YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8')
+
+        transcripts = transcript_list.fetch_many(['de', 'en', 'xyz'], translate_to=['af', 'fr', 'en'], workers=3)
+
+        self.assertEqual(sorted(transcripts), ['af', 'de', 'en', 'fr'])
+        for transcript in transcripts.values():
+            self.assertEqual(len(transcript), 3)
+        translation_queries = [
+            request.querystring for request in httpretty.latest_requests() if 'tlang' in request.querystring
+        ]
+        self.assertEqual(sorted(query['tlang'][0] for query in translation_queries), ['af', 'fr'])
+        # translated from the first translatable native transcript
+        self.assertEqual({query['lang'][0] for query in translation_queries}, {'de'})
+
+    def test_fetch_many__translation_language_not_available(self):
+        transcript_list = YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8')
+        requests_before = len(httpretty.latest_requests())
+
+        with self.assertRaises(TranslationLanguageNotAvailable):
+            transcript_list.fetch_many(['en'], translate_to=['af', 'xyz'])
+
+        self.assertEqual(len(httpretty.latest_requests()), requests_before)
+
+    def test_fetch_many__not_translatable(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.youtube.com/watch',
+            body=load_asset('youtube_no_translation_languages.html.static')
+        )
+        transcript_list = YouTubeTranscriptApi.list_transcripts('GJLlxj_dtq8')
+
+        with self.assertRaises(NotTranslatable):
+            transcript_list.fetch_many(['en'], translate_to=['af'])
+
+    def test_iter_transcripts_many(self):
+        results = list(YouTubeTranscriptApi.iter_transcripts_many(
+            ['video_id_1', 'video_id_2'], ['en'], translate_to=['de', 'af'], workers=2,
+        ))
+
+        self.assertEqual({video_id for video_id, _, _ in results}, {'video_id_1', 'video_id_2'})
+        for video_id, transcripts, exception in results:
+            self.assertIsNone(exception)
+            self.assertEqual(sorted(transcripts), ['af', 'de', 'en'])
+
     def test_get_transcript__correct_language_is_used(self):
         YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8', ['de', 'en'])
         query_string = httpretty.last_request().querystring
@@ -338,6 +546,97 @@ class TestYouTubeTranscriptApi(TestCase):
         YouTubeTranscriptApi.get_transcripts(['GJLlxj_dtq8'], proxies=proxies)
         mock_get_transcript.assert_any_call('GJLlxj_dtq8', ('en',), proxies, None, False)
 
+    def test_get_transcripts__parallel(self):
+        transcripts, unretrievable_videos = YouTubeTranscriptApi.get_transcripts(
+            ['video_id_1', 'video_id_2', 'video_id_3'], workers=3
+        )
+
+        self.assertEqual(list(transcripts.keys()), ['video_id_1', 'video_id_2', 'video_id_3'])
+        self.assertEqual(
+            transcripts['video_id_2'],
+            [
+                {'text': 'Hey, this is just a test', 'start': 0.0, 'duration': 1.54},
+                {'text': 'this is not the original transcript', 'start': 1.54, 'duration': 4.16},
+                {'text': 'just something shorter, I made up for testing', 'start': 5.7, 'duration': 3.239}
+            ]
+        )
+        self.assertEqual(unretrievable_videos, [])
+
+    def test_get_transcripts__parallel_continue_on_error_records_exceptions(self):
+        def fetch_transcript(http_client, video_id, languages, preserve_formatting, compact=False, cache=None):
+            if video_id == 'video_id_2':
+                raise VideoUnavailable(video_id)
+            return [{'text': video_id, 'start': 0.0, 'duration': 1.0}]
+
+        errors = {}
+        with patch.object(YouTubeTranscriptApi, '_fetch_transcript', side_effect=fetch_transcript):
+            transcripts, unretrievable_videos = YouTubeTranscriptApi.get_transcripts(
+                ['video_id_1', 'video_id_2', 'video_id_3'], continue_after_error=True, workers=2, errors=errors
+            )
+
+        self.assertEqual(list(transcripts.keys()), ['video_id_1', 'video_id_3'])
+        self.assertEqual(unretrievable_videos, ['video_id_2'])
+        self.assertIsInstance(errors['video_id_2'], VideoUnavailable)
+
+    def test_get_transcripts__parallel_stop_on_error(self):
+        with patch.object(YouTubeTranscriptApi, '_fetch_transcript', side_effect=VideoUnavailable('video_id_1')):
+            with self.assertRaises(VideoUnavailable):
+                YouTubeTranscriptApi.get_transcripts(['video_id_1', 'video_id_2'], workers=2)
+
+    @patch('youtube_transcript_api.YouTubeTranscriptApi.get_transcript', side_effect=VideoUnavailable('video_id_1'))
+    def test_get_transcripts__continue_on_error_records_exceptions(self, mock_get_transcript):
+        errors = {}
+        YouTubeTranscriptApi.get_transcripts(['video_id_1'], continue_after_error=True, errors=errors)
+
+        self.assertIsInstance(errors['video_id_1'], VideoUnavailable)
+
+    def test_iter_transcripts(self):
+        def video_ids():
+            for i in range(5):
+                yield 'video_id_{i}'.format(i=i)
+
+        results = list(YouTubeTranscriptApi.iter_transcripts(video_ids(), workers=2))
+
+        self.assertEqual({video_id for video_id, _, _ in results}, {'video_id_{i}'.format(i=i) for i in range(5)})
+        for video_id, transcript, exception in results:
+            self.assertIsNone(exception)
+            self.assertEqual(len(transcript), 3)
+
+    def test_iter_transcripts__no_video_ids(self):
+        self.assertEqual(list(YouTubeTranscriptApi.iter_transcripts([])), [])
+
+    def test_rate_limiter(self):
+        rate_limiter = RateLimiter(50)
+
+        start = time.monotonic()
+        for _ in range(4):
+            rate_limiter.wait()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.06)
+
+    def test_transcript_parser(self):
+        plain_data = (
+            '<?xml version="1.0" encoding="utf-8" ?><transcript>'
+            '<text start="0" dur="1.5">plain text</text>'
+            '<text start="1.5" dur="2">it&amp;#39;s &lt;b&gt;bold&lt;/b&gt; &lt;span&gt;text&lt;/span&gt;</text>'
+            '<text start="3.5"></text>'
+            '<text start="4">no duration</text>'
+            '</transcript>'
+        )
+
+        self.assertEqual(
+            _TranscriptParser().parse(plain_data),
+            [
+                {'text': 'plain text', 'start': 0.0, 'duration': 1.5},
+                {'text': 'it\'s bold text', 'start': 1.5, 'duration': 2.0},
+                {'text': 'no duration', 'start': 4.0, 'duration': 0.0},
+            ]
+        )
+        self.assertEqual(
+            _TranscriptParser(preserve_formatting=True).parse(plain_data)[1]['text'],
+            'it\'s <b>bold</b> text',
+        )
+
     def test_load_cookies(self):
         dirname, filename = os.path.split(os.path.abspath(__file__))
         cookies = dirname + '/example_cookies.txt'
@@ -354,3 +653,40 @@ class TestYouTubeTranscriptApi(TestCase):
         expired_cookies = dirname + '/expired_example_cookies.txt'
         with self.assertRaises(CookiesInvalid):
             YouTubeTranscriptApi._load_cookies(expired_cookies, 'GJLlxj_dtq8')
+
+    def test_load_cookies__parsed_once(self):
+        dirname, filename = os.path.split(os.path.abspath(__file__))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cookies = os.path.join(directory, 'cookies.txt')
+        shutil.copy(dirname + '/example_cookies.txt', cookies)
+
+        with patch.object(
+            YouTubeTranscriptApi, '_parse_cookies', wraps=YouTubeTranscriptApi._parse_cookies,
+        ) as parse_cookies:
+            first_cookies = YouTubeTranscriptApi._load_cookies(cookies, 'GJLlxj_dtq8')
+            second_cookies = YouTubeTranscriptApi._load_cookies(cookies, 'GJLlxj_dtq8')
+
+        self.assertEqual(parse_cookies.call_count, 1)
+        self.assertEqual(requests.utils.dict_from_cookiejar(second_cookies), {'TEST_FIELD': 'TEST_VALUE'})
+
+        # every session gets its own jar, so cookies set during one session don't show up in the others
+        first_cookies.set('CONSENT', 'YES+', domain='.youtube.com')
+        third_cookies = YouTubeTranscriptApi._load_cookies(cookies, 'GJLlxj_dtq8')
+        self.assertEqual(requests.utils.dict_from_cookiejar(third_cookies), {'TEST_FIELD': 'TEST_VALUE'})
+
+    def test_load_cookies__reloaded_if_file_changed(self):
+        dirname, filename = os.path.split(os.path.abspath(__file__))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cookies = os.path.join(directory, 'cookies.txt')
+        shutil.copy(dirname + '/example_cookies.txt', cookies)
+        YouTubeTranscriptApi._load_cookies(cookies, 'GJLlxj_dtq8')
+
+        with open(cookies, 'a') as file:
+            file.write('.example.com\tTRUE\t/\tTRUE\t3594431874\tNEW_FIELD\tNEW_VALUE\n')
+
+        self.assertEqual(
+            requests.utils.dict_from_cookiejar(YouTubeTranscriptApi._load_cookies(cookies, 'GJLlxj_dtq8')),
+            {'TEST_FIELD': 'TEST_VALUE', 'NEW_FIELD': 'NEW_VALUE'},
+        )
@@ -0,0 +1,125 @@
+from unittest import TestCase, skipIf
+
+import json
+
+import os
+
+import shutil
+
+import tempfile
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from youtube_transcript_api import TranscriptSegments
+from youtube_transcript_api.exporters import (
+    CorpusWriter,
+    JSONLCorpusWriter,
+    ParquetCorpusWriter,
+    CorpusWriterLoader,
+)
+
+
+class TestExporters(TestCase):
+    def setUp(self):
+        self.transcript = [
+            {'text': 'Test line 1', 'start': 0.0, 'duration': 1.50},
+            {'text': 'line between', 'start': 1.5, 'duration': 2.0},
+            {'text': 'testing the end line', 'start': 2.5, 'duration': 3.25}
+        ]
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read_jsonl_corpus(self, directory):
+        rows = []
+        for file_name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, file_name), encoding='utf-8') as file:
+                rows.extend(json.loads(line) for line in file)
+        return rows
+
+    def test_base_corpus_writer(self):
+        with self.assertRaises(NotImplementedError):
+            with CorpusWriter() as corpus:
+                corpus.write_transcript('video_id', self.transcript)
+
+    def test_jsonl_corpus_writer(self):
+        directory = os.path.join(self.directory, 'corpus')
+
+        with JSONLCorpusWriter(directory, row_group_size=4) as corpus:
+            corpus.write_transcript('v1', self.transcript, 'en', False)
+            corpus.write_transcripts([('v2', TranscriptSegments.from_list(self.transcript), 'de', True)])
+
+        self.assertEqual(sorted(os.listdir(directory)), ['part-00000.jsonl', 'part-00001.jsonl'])
+        self.assertEqual(corpus.rows_written, 6)
+        self.assertEqual(corpus.transcripts_written, 2)
+        rows = self.read_jsonl_corpus(directory)
+        self.assertEqual(rows[0], {
+            'video_id': 'v1', 'language_code': 'en', 'is_generated': False, 'segment_idx': 0,
+            'start': 0.0, 'duration': 1.5, 'text': 'Test line 1',
+        })
+        self.assertEqual(rows[5], {
+            'video_id': 'v2', 'language_code': 'de', 'is_generated': True, 'segment_idx': 2,
+            'start': 2.5, 'duration': 3.25, 'text': 'testing the end line',
+        })
+
+    def test_jsonl_corpus_writer__appends_to_existing_parts(self):
+        directory = os.path.join(self.directory, 'corpus')
+        with JSONLCorpusWriter(directory, row_group_size=3) as corpus:
+            corpus.write_transcripts([('v1', self.transcript), ('v2', self.transcript)])
+
+        with JSONLCorpusWriter(directory, row_group_size=3) as corpus:
+            corpus.write_transcript('v3', self.transcript)
+
+        self.assertEqual(corpus.parts_written, 1)
+        self.assertEqual(
+            sorted(os.listdir(directory)), ['part-00000.jsonl', 'part-00001.jsonl', 'part-00002.jsonl'],
+        )
+        self.assertEqual([row['video_id'] for row in self.read_jsonl_corpus(directory)], [
+            'v1', 'v1', 'v1', 'v2', 'v2', 'v2', 'v3', 'v3', 'v3',
+        ])
+
+    @skipIf(pq is None, 'pyarrow is not installed')
+    def test_parquet_corpus_writer__existing_file(self):
+        path = os.path.join(self.directory, 'corpus.parquet')
+        with ParquetCorpusWriter(path) as corpus:
+            corpus.write_transcript('v1', self.transcript)
+
+        with self.assertRaises(FileExistsError):
+            ParquetCorpusWriter(path)
+
+        self.assertEqual(pq.read_table(path).num_rows, 3)
+
+    @skipIf(pq is None, 'pyarrow is not installed')
+    def test_parquet_corpus_writer(self):
+        path = os.path.join(self.directory, 'corpus.parquet')
+
+        with CorpusWriterLoader().load(path, row_group_size=2) as corpus:
+            corpus.write_transcripts([('v1', self.transcript), ('v2', self.transcript, 'en', True)])
+
+        self.assertIsInstance(corpus, ParquetCorpusWriter)
+        parquet_file = pq.ParquetFile(path)
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        self.assertEqual(parquet_file.schema_arrow.names, list(CorpusWriter.COLUMNS))
+        table = parquet_file.read().to_pydict()
+        self.assertEqual(table['video_id'], ['v1'] * 3 + ['v2'] * 3)
+        self.assertEqual(table['segment_idx'], [0, 1, 2, 0, 1, 2])
+        self.assertEqual(table['language_code'], [None] * 3 + ['en'] * 3)
+        self.assertEqual(table['text'][4], 'line between')
+
+    @skipIf(pq is None, 'pyarrow is not installed')
+    def test_parquet_corpus_writer__empty(self):
+        path = os.path.join(self.directory, 'corpus.parquet')
+
+        with ParquetCorpusWriter(path):
+            pass
+
+        self.assertEqual(pq.read_table(path).num_rows, 0)
+
+    def test_corpus_writer_loader(self):
+        corpus = CorpusWriterLoader().load(os.path.join(self.directory, 'corpus'))
+        self.assertIsInstance(corpus, JSONLCorpusWriter)
+
+        with self.assertRaises(CorpusWriterLoader.UnknownCorpusType):
+            CorpusWriterLoader().load(self.directory, 'csv')
@@ -4,6 +4,8 @@ import json
 
 import pprint
 
+from io import StringIO
+
 from youtube_transcript_api.formatters import (
     Formatter,
     JSONFormatter,
@@ -12,6 +14,7 @@ from youtube_transcript_api.formatters import (
     WebVTTFormatter,
     PrettyPrintFormatter, FormatterLoader
 )
+from youtube_transcript_api import TranscriptSegments
 
 
 class TestFormatters(TestCase):
@@ -118,6 +121,54 @@ class TestFormatters(TestCase):
 
         self.assertEqual(content, formatted_single_transcript + '\n\n\n' + formatted_single_transcript)
 
+    def test_formatters_accept_transcript_segments(self):
+        segments = TranscriptSegments.from_list(self.transcript)
+
+        for formatter in (JSONFormatter(), PrettyPrintFormatter(), TextFormatter(), SRTFormatter(), WebVTTFormatter()):
+            self.assertEqual(
+                formatter.format_transcript(segments),
+                formatter.format_transcript(self.transcript),
+            )
+            self.assertEqual(
+                formatter.format_transcripts([segments, segments]),
+                formatter.format_transcripts(self.transcripts),
+            )
+
+    def test_write_transcript_matches_format_transcript(self):
+        formatters = (JSONFormatter(), PrettyPrintFormatter(), TextFormatter(), SRTFormatter(), WebVTTFormatter())
+        segments = TranscriptSegments.from_list(self.transcript)
+
+        for formatter in formatters:
+            for transcript in (self.transcript, segments, []):
+                output = StringIO()
+                formatter.write_transcript(transcript, output)
+                self.assertEqual(output.getvalue(), formatter.format_transcript(transcript))
+
+            output = StringIO()
+            formatter.write_transcripts(iter([self.transcript, segments]), output)
+            self.assertEqual(output.getvalue(), formatter.format_transcripts(self.transcripts))
+
+    def test_write_transcript__in_chunks(self):
+        transcript = [{'text': 'line {}'.format(i), 'start': i * 0.5, 'duration': 1.0} for i in range(2500)]
+
+        for formatter in (JSONFormatter(), TextFormatter(), SRTFormatter(), WebVTTFormatter()):
+            output = StringIO()
+            formatter.write_transcript(iter(transcript), output)
+            self.assertEqual(output.getvalue(), formatter.format_transcript(transcript))
+
+    def test_json_formatter_write_transcripts__kwargs(self):
+        for kwargs in ({'indent': 2}, {'separators': (',', ':'), 'sort_keys': True}):
+            output = StringIO()
+            JSONFormatter().write_transcripts(self.transcripts, output, **kwargs)
+            self.assertEqual(output.getvalue(), json.dumps(self.transcripts, **kwargs))
+
+    def test_seconds_to_timestamp(self):
+        formatter = WebVTTFormatter()
+
+        self.assertEqual(formatter._seconds_to_timestamp(6.93), '00:00:06.930')
+        self.assertEqual(formatter._seconds_to_timestamp(3723.5), '01:02:03.500')
+        self.assertEqual(formatter._seconds_to_timestamp(0), '00:00:00.000')
+
     def test_formatter_loader(self):
         loader = FormatterLoader()
         formatter = loader.load('json')
@@ -0,0 +1,198 @@
+from unittest import TestCase
+
+import json
+
+import os
+
+import pickle
+
+import shutil
+
+import tempfile
+
+import httpretty
+
+from youtube_transcript_api import (
+    YouTubeTranscriptApi,
+    MetricsRegistry,
+    TooManyRequests,
+    YouTubeRequestFailed,
+    metrics,
+)
+
+
+def load_asset(filename):
+    filepath = '{dirname}/assets/{filename}'.format(
+        dirname=os.path.dirname(__file__), filename=filename)
+
+    with open(filepath, mode="rb") as file:
+        return file.read()
+
+
+class TestMetricsRegistry(TestCase):
+    def test_increment(self):
+        registry = MetricsRegistry()
+
+        registry.increment('cache_hits', cache='videos')
+        registry.increment('cache_hits', 2, cache='videos')
+        registry.increment('cache_hits', cache='channels')
+        registry.increment('bytes_downloaded', 100)
+
+        self.assertEqual(registry.snapshot()['counters'], {
+            'bytes_downloaded': 100,
+            'cache_hits{cache="channels"}': 1,
+            'cache_hits{cache="videos"}': 3,
+        })
+
+    def test_observe(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+        registry.observe('stage_seconds', 0.05, stage='parse')
+        registry.observe('stage_seconds', 0.1, stage='parse')
+        registry.observe('stage_seconds', 0.5, stage='parse')
+        registry.observe('stage_seconds', 5.0, stage='parse')
+
+        histogram = registry.snapshot()['histograms']['stage_seconds{stage="parse"}']
+        self.assertEqual(histogram['count'], 4)
+        self.assertAlmostEqual(histogram['sum'], 5.65)
+        self.assertEqual(histogram['buckets'], {'0.1': 2, '1.0': 3, '+Inf': 4})
+
+    def test_time(self):
+        registry = MetricsRegistry()
+
+        with registry.time('parse'):
+            pass
+        with self.assertRaises(ValueError):
+            with registry.time('parse'):
+                raise ValueError()
+
+        self.assertEqual(registry.snapshot()['histograms']['stage_seconds{stage="parse"}']['count'], 2)
+
+    def test_reset(self):
+        registry = MetricsRegistry()
+        registry.increment('cache_hits')
+        registry.observe('stage_seconds', 0.1, stage='parse')
+
+        registry.reset()
+
+        self.assertEqual(registry.snapshot(), {'counters': {}, 'histograms': {}})
+
+    def test_merge(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.increment('cache_hits', cache='videos')
+        registry.observe('stage_seconds', 0.5, stage='parse')
+        worker_registry = MetricsRegistry(buckets=(0.1, 1.0))
+        worker_registry.increment('cache_hits', 2, cache='videos')
+        worker_registry.increment('retries')
+        worker_registry.observe('stage_seconds', 0.05, stage='parse')
+        worker_registry.observe('stage_seconds', 0.05, stage='fetch')
+
+        # registries are sent back from worker processes pickled
+        registry.merge(pickle.loads(pickle.dumps(worker_registry)))
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot['counters'], {'cache_hits{cache="videos"}': 3, 'retries': 1})
+        self.assertEqual(snapshot['histograms']['stage_seconds{stage="parse"}']['buckets'], {
+            '0.1': 1, '1.0': 2, '+Inf': 2,
+        })
+        self.assertAlmostEqual(snapshot['histograms']['stage_seconds{stage="parse"}']['sum'], 0.55)
+        self.assertEqual(snapshot['histograms']['stage_seconds{stage="fetch"}']['count'], 1)
+        self.assertEqual(worker_registry.snapshot()['counters']['retries'], 1)
+
+    def test_merge__different_buckets(self):
+        with self.assertRaises(ValueError):
+            MetricsRegistry(buckets=(0.1, 1.0)).merge(MetricsRegistry(buckets=(1.0,)))
+
+    def test_to_prometheus(self):
+        registry = MetricsRegistry(namespace='enricher', buckets=(0.1,))
+        registry.increment('cache_hits', 3, cache='videos')
+        registry.observe('stage_seconds', 0.05, stage='parse')
+
+        self.assertEqual(
+            registry.to_prometheus(),
+            '# TYPE enricher_cache_hits_total counter\n'
+            'enricher_cache_hits_total{cache="videos"} 3\n'
+            '# TYPE enricher_stage_seconds histogram\n'
+            'enricher_stage_seconds_bucket{stage="parse",le="0.1"} 1\n'
+            'enricher_stage_seconds_bucket{stage="parse",le="+Inf"} 1\n'
+            'enricher_stage_seconds_sum{stage="parse"} 0.05\n'
+            'enricher_stage_seconds_count{stage="parse"} 1\n'
+        )
+
+    def test_to_prometheus__escapes_label_values(self):
+        registry = MetricsRegistry(namespace='enricher')
+        registry.increment('errors', error='say "hi"\n')
+
+        self.assertIn('enricher_errors_total{error="say \\"hi\\"\\n"} 1\n', registry.to_prometheus())
+
+    def test_write_json_and_prometheus(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        registry = MetricsRegistry()
+        registry.increment('cache_hits')
+
+        registry.write_json(os.path.join(directory, 'metrics.json'))
+        registry.write_prometheus(os.path.join(directory, 'metrics.prom'))
+
+        with open(os.path.join(directory, 'metrics.json')) as file:
+            self.assertEqual(json.load(file), registry.snapshot())
+        with open(os.path.join(directory, 'metrics.prom')) as file:
+            self.assertEqual(file.read(), registry.to_prometheus())
+        self.assertEqual(sorted(os.listdir(directory)), ['metrics.json', 'metrics.prom'])
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        httpretty.enable()
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.youtube.com/api/timedtext',
+            body=load_asset('transcript.xml.static')
+        )
+        metrics.reset()
+
+    def tearDown(self):
+        httpretty.reset()
+        httpretty.disable()
+        metrics.reset()
+
+    def test_get_transcript(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.youtube.com/watch',
+            body=load_asset('youtube.html.static')
+        )
+
+        YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            len(load_asset('youtube.html.static')) + len(load_asset('transcript.xml.static')),
+            snapshot['counters']['bytes_downloaded'],
+        )
+        for stage in ('watch_page_fetch', 'json_extraction', 'timedtext_fetch', 'timedtext_parse'):
+            self.assertEqual(snapshot['histograms']['stage_seconds{{stage="{}"}}'.format(stage)]['count'], 1)
+
+    def test_get_transcript__too_many_requests(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.youtube.com/watch',
+            body=load_asset('youtube_too_many_requests.html.static')
+        )
+
+        with self.assertRaises(TooManyRequests):
+            YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+        self.assertEqual(metrics.snapshot()['counters']['recaptcha_blocks'], 1)
+
+    def test_get_transcript__http_429(self):
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://www.youtube.com/watch',
+            status=429,
+        )
+
+        with self.assertRaises(YouTubeRequestFailed):
+            YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+        self.assertEqual(metrics.snapshot()['counters']['http_429_responses'], 1)
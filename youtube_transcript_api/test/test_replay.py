@@ -0,0 +1,118 @@
+from unittest import TestCase, skipIf
+
+import os
+
+import shutil
+
+import tempfile
+
+import httpretty
+
+import requests
+
+try:
+    import httplib2
+except ImportError:  # pragma: no cover
+    httplib2 = None
+
+from youtube_transcript_api import YouTubeTranscriptApi, YouTubeRequestFailed
+from youtube_transcript_api.replay import (
+    CassetteNotFound,
+    CassetteStore,
+    RecordingAdapter,
+    RecordingHttp,
+    ReplayAdapter,
+    ReplayHttp,
+)
+
+
+def load_asset(filename):
+    filepath = '{dirname}/assets/{filename}'.format(
+        dirname=os.path.dirname(__file__), filename=filename)
+
+    with open(filepath, mode="rb") as file:
+        return file.read()
+
+
+class TestReplay(TestCase):
+    def setUp(self):
+        self.store = CassetteStore(tempfile.mkdtemp(), compression='zlib')
+        self.addCleanup(shutil.rmtree, self.store.directory)
+        self.addCleanup(setattr, YouTubeTranscriptApi, 'http_adapter', None)
+
+    def record_transcript(self):
+        httpretty.enable()
+        try:
+            httpretty.register_uri(
+                httpretty.GET,
+                'https://www.youtube.com/watch',
+                body=load_asset('youtube.html.static')
+            )
+            httpretty.register_uri(
+                httpretty.GET,
+                'https://www.youtube.com/api/timedtext',
+                body=load_asset('transcript.xml.static')
+            )
+            YouTubeTranscriptApi.http_adapter = RecordingAdapter(self.store)
+            return YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+        finally:
+            httpretty.disable()
+            httpretty.reset()
+
+    def test_replay_adapter(self):
+        transcript = self.record_transcript()
+
+        adapter = ReplayAdapter(self.store)
+        YouTubeTranscriptApi.http_adapter = adapter
+        self.assertEqual(YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8'), transcript)
+        self.assertEqual(adapter.stats, {'replayed': 2, 'errors_injected': 0, 'misses': 0})
+
+    def test_replay_adapter__not_recorded(self):
+        YouTubeTranscriptApi.http_adapter = ReplayAdapter(self.store)
+
+        with self.assertRaises(CassetteNotFound):
+            YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+    def test_replay_adapter__error_injection(self):
+        self.record_transcript()
+
+        YouTubeTranscriptApi.http_adapter = ReplayAdapter(self.store, error_rate=1.0, error_status=429)
+        with self.assertRaises(YouTubeRequestFailed):
+            YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+        YouTubeTranscriptApi.http_adapter = ReplayAdapter(self.store, error_rate=1.0, error_status=None)
+        with self.assertRaises(requests.ConnectionError):
+            YouTubeTranscriptApi.get_transcript('GJLlxj_dtq8')
+
+    def test_cassette_store__ignores_api_key(self):
+        self.store.save('GET', 'https://example.com/api?b=2&key=secret&a=1', None, 200, 'OK', {}, b'content')
+
+        cassette = self.store.load('GET', 'https://example.com/api?a=1&key=other&b=2')
+        self.assertEqual(cassette['content'], b'content')
+        self.assertNotIn('secret', cassette['url'])
+        self.assertIsNone(self.store.load('POST', 'https://example.com/api?a=1&b=2'))
+
+    @skipIf(httplib2 is None, 'httplib2 is not installed')
+    def test_recording_and_replay_http(self):
+        class FakeHttp(object):
+            def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+                return httplib2.Response({'status': '200', 'content-type': 'application/json'}), b'{"items": []}'
+
+        response, content = RecordingHttp(self.store, FakeHttp()).request(
+            'https://www.googleapis.com/youtube/v3/search?q=channel&key=secret'
+        )
+
+        http = ReplayHttp(self.store, latency=0.001)
+        replayed_response, replayed_content = http.request('https://www.googleapis.com/youtube/v3/search?q=channel')
+        self.assertEqual(replayed_content, content)
+        self.assertEqual(replayed_response.status, 200)
+        self.assertEqual(replayed_response['content-type'], 'application/json')
+
+        failing_response, _ = ReplayHttp(self.store, error_rate=1.0, error_status=503).request(
+            'https://www.googleapis.com/youtube/v3/search?q=channel'
+        )
+        self.assertEqual(failing_response.status, 503)
+
+        missing_response, _ = http.request('https://www.googleapis.com/youtube/v3/search?q=other')
+        self.assertEqual(missing_response.status, 404)
+        self.assertEqual(http.stats, {'replayed': 1, 'errors_injected': 0, 'misses': 1})
@@ -0,0 +1,103 @@
+from unittest import TestCase
+from mock import Mock
+
+import requests
+
+from youtube_transcript_api import (
+    RetryPolicy,
+    TooManyRequests,
+    TranscriptsDisabled,
+    YouTubeRequestFailed,
+    metrics,
+)
+
+
+def request_failed(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return YouTubeRequestFailed('video_id', requests.HTTPError(response=response))
+
+
+class HttpError(Exception):
+    """Mimics the HttpError of the YouTube Data API client, whose `resp` is a dictionary of headers with a status."""
+    def __init__(self, status, headers=None):
+        super(HttpError, self).__init__(status)
+        self.resp = Response(headers or {})
+        self.resp.status = status
+
+
+class Response(dict):
+    pass
+
+
+class TestRetryPolicy(TestCase):
+    def setUp(self):
+        self.sleeps = []
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def create_policy(self, **kwargs):
+        return RetryPolicy(jitter=lambda: 1.0, sleep=self.sleeps.append, **kwargs)
+
+    def test_call__retries_transient_errors(self):
+        function = Mock(side_effect=[request_failed(503), requests.ConnectionError(), 'result'])
+
+        self.assertEqual(self.create_policy(base_delay=2).call(function, 'a', b=1), 'result')
+
+        self.assertEqual(function.call_count, 3)
+        function.assert_called_with('a', b=1)
+        self.assertEqual(self.sleeps, [2, 4])
+        self.assertEqual(metrics.snapshot()['counters'], {
+            'retries{error="ConnectionError"}': 1,
+            'retries{error="YouTubeRequestFailed"}': 1,
+        })
+
+    def test_call__gives_up_after_max_attempts(self):
+        function = Mock(side_effect=HttpError(500))
+
+        with self.assertRaises(HttpError):
+            self.create_policy(max_attempts=3).call(function)
+
+        self.assertEqual(function.call_count, 3)
+        self.assertEqual(metrics.snapshot()['counters']['retries_exhausted{error="HttpError"}'], 1)
+
+    def test_call__does_not_retry_permanent_errors(self):
+        for error in (TranscriptsDisabled('video_id'), TooManyRequests('video_id'), request_failed(404),
+                      request_failed(429), HttpError(403), ValueError()):
+            function = Mock(side_effect=error)
+
+            with self.assertRaises(type(error)):
+                self.create_policy().call(function)
+
+            self.assertEqual(function.call_count, 1)
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(metrics.snapshot()['counters'], {})
+
+    def test_delay__full_jitter_is_capped(self):
+        retry_policy = RetryPolicy(base_delay=1, max_delay=10, max_attempts=10, jitter=lambda: 0.5)
+
+        self.assertEqual(
+            [retry_policy.delay(attempt, request_failed(502)) for attempt in range(1, 7)],
+            [0.5, 1.0, 2.0, 4.0, 5.0, 5.0],
+        )
+
+    def test_delay__honors_retry_after(self):
+        retry_policy = self.create_policy(max_delay=60)
+
+        self.assertEqual(retry_policy.delay(1, request_failed(503, {'Retry-After': '7'})), 7.0)
+        self.assertEqual(retry_policy.delay(1, HttpError(429, {'retry-after': '30'})), 30.0)
+        self.assertEqual(retry_policy.delay(1, HttpError(429, {'retry-after': 'Thu, 01 Jan 1970 00:00:00 GMT'})), 0.0)
+
+    def test_delay__retry_after_beyond_max_delay_is_not_retried(self):
+        self.assertIsNone(self.create_policy(max_delay=60).delay(1, HttpError(429, {'retry-after': '3600'})))
+
+    def test_init__single_attempt_disables_retries(self):
+        function = Mock(side_effect=request_failed(500))
+
+        with self.assertRaises(YouTubeRequestFailed):
+            self.create_policy(max_attempts=1).call(function)
+
+        self.assertEqual(function.call_count, 1)
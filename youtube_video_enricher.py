@@ -1,10 +1,36 @@
 import os
 import json
-import pandas as pd
+import logging
 import time
-from youtube_transcript_api import YouTubeTranscriptApi
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import repeat
+from youtube_transcript_api import (
+    YouTubeTranscriptApi, MetricsRegistry, ProxyPool, RateLimiter, RetryPolicy, TooManyRequests, WatchPageArchive,
+    metrics,
+)
+from youtube_transcript_api._retry import is_transient
+from progress import ProgressReporter
 import re
 
+logger = logging.getLogger(__name__)
+
+_retry_policy = RetryPolicy()
+
+
+def configure_retry_policy(retry_policy):
+    """
+    Sets the policy the requests of every video are retried with after a transient error.
+
+    :param retry_policy: (youtube_transcript_api.RetryPolicy) The retry policy
+    """
+    global _retry_policy
+    _retry_policy = retry_policy
+
+
+# the keys of the video data, in the order of the tuples the worker processes send back to the parent process
+VIDEO_DATA_KEYS = ('video_id', 'available_languages', 'available_audiotracks', 'views', 'title', 'error')
+
 def check_video_link_is_id(video_link):
     """
     Checks if a YouTube link is a video ID.
@@ -53,44 +79,144 @@ def get_video_id_from_youtube_link(youtube_link):
         return None
 
 
-def get_important_video_data(video_id_or_url):
+def get_important_video_data(video_id_or_url, archive=None, proxies=None):
     """
     Retrieves important data for a YouTube video.
 
     :param video_id_or_url: (str) The YouTube video ID or URL
+    :param archive: (WatchPageArchive, optional) Archive the fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the watch page is fetched through
+    :return: (dict) Dictionary containing important video data
+    """
+    try:
+        return fetch_important_video_data(video_id_or_url, archive=archive, proxies=proxies)
+    except Exception as e:
+        video_id = get_video_id_from_video_id_or_url(video_id_or_url)
+        logger.warning("Error retrieving data for video %s: %s", video_id, e)
+        return build_failed_video_data(video_id, e)
+
+
+def fetch_important_video_data(video_id_or_url, archive=None, proxies=None):
+    """
+    Retrieves important data for a YouTube video, like get_important_video_data, but raises the error if the data
+    could not be retrieved.
+
+    :param video_id_or_url: (str) The YouTube video ID or URL
+    :param archive: (WatchPageArchive, optional) Archive the fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the watch page is fetched through
     :return: (dict) Dictionary containing important video data
     """
+    video_id = get_video_id_from_video_id_or_url(video_id_or_url)
+    transcript_list, (audio_track_list, video_meta_data) = _retry_policy.call(
+        YouTubeTranscriptApi.list_transcript_audio_tracks, video_id, proxies=proxies, archive=archive)
+    return build_important_video_data(video_id, transcript_list, audio_track_list, video_meta_data)
+
+
+def get_video_id_from_video_id_or_url(video_id_or_url):
+    """
+    :param video_id_or_url: (str) The YouTube video ID or URL
+    :return: (str) The YouTube video ID
+    """
     if 'youtube.com' in video_id_or_url or 'youtu.be' in video_id_or_url:
-        video_id = get_video_id_from_youtube_link(video_id_or_url)
-    else:
-        video_id = video_id_or_url
+        return get_video_id_from_youtube_link(video_id_or_url)
+    return video_id_or_url
+
+
+def is_retried_by_queue(error):
+    """
+    Whether a video which failed with an error is released back to a work queue, so it is fetched again, maybe by
+    another worker with another IP address, instead of being stored as failed.
+
+    :param error: (Exception) The error the video failed with
+    :return: (bool) True for recaptchas and for transient errors which outlasted the retries
+    """
+    return isinstance(error, TooManyRequests) or is_transient(error)
+
+
+def fetch_and_cache_video_data(cache_folder, video_id, video_link, archive=None, proxies=None):
+    """
+    Retrieves the data of a video and caches it. A video which failed with an error that may go away, a recaptcha or a
+    transient error which outlasted the retries, is not cached, so the next run fetches it again.
+
+    :param cache_folder: (str) Folder in which the retrieved video data is cached
+    :param video_id: (str) The YouTube video ID
+    :param video_link: (str) The YouTube video ID or URL
+    :param archive: (WatchPageArchive, optional) Archive the fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the watch page is fetched through
+    :return: (dict) Dictionary containing important video data
+    """
+    try:
+        video_data = fetch_important_video_data(video_link, archive=archive, proxies=proxies)
+    except Exception as e:
+        logger.warning("Error retrieving data for video %s: %s", video_id, e)
+        video_data = build_failed_video_data(video_id, e)
+        if is_retried_by_queue(e):
+            return video_data
+    save_cached_data(cache_folder, 'video', video_id, video_data)
+    return video_data
 
+
+def reextract_important_video_data(archive_folder, video_id, snapshot):
+    """
+    Extracts the important data of a YouTube video again from its archived watch page, without any network traffic.
+    This is a top level function, so it can be run in a process pool.
+
+    :param archive_folder: (str) Folder of the WatchPageArchive
+    :param video_id: (str) The YouTube video ID
+    :param snapshot: (dict) The archived snapshot of the watch page
+    :return: (dict) Dictionary containing important video data
+    """
     try:
-        transcript_list, (audio_track_list, video_meta_data) = YouTubeTranscriptApi.list_transcript_audio_tracks(
-            video_id)
-
-        available_languages = [info.language for info in transcript_list]
-        available_audiotracks = [language for language in audio_track_list]
-
-        views = get_video_views(video_meta_data).get('views')
-        title = get_title_from_video_meta_data(video_meta_data).get('title')
-
-        return {
-            'video_id': video_id,
-            'available_languages': available_languages,
-            'available_audiotracks': available_audiotracks,
-            'views': views,
-            'title': title
-        }
+        html = WatchPageArchive(archive_folder).load(snapshot)
+        transcript_list, (audio_track_list, video_meta_data) = YouTubeTranscriptApi.extract_transcript_audio_tracks(
+            video_id, html)
+        return build_important_video_data(video_id, transcript_list, audio_track_list, video_meta_data)
     except Exception as e:
-        print(f"Error retrieving data for video {video_id}: {e}")
-        return {
-            'video_id': video_id,
-            'available_languages': None,
-            'available_audiotracks': None,
-            'views': None,
-            'title': None
-        }
+        logger.warning("Error extracting data for video %s: %s", video_id, e)
+        return build_failed_video_data(video_id, e)
+
+
+def build_important_video_data(video_id, transcript_list, audio_track_list, video_meta_data):
+    """
+    Builds the important data of a YouTube video from its transcripts, audio tracks and watch page.
+
+    :param video_id: (str) The YouTube video ID
+    :param transcript_list: (TranscriptList) The transcripts which are available for the video
+    :param audio_track_list: (dict) The audio tracks of the video
+    :param video_meta_data: (str) The watch page of the video
+    :return: (dict) Dictionary containing important video data
+    """
+    available_languages = [info.language for info in transcript_list]
+    available_audiotracks = [language for language in audio_track_list]
+
+    views = get_video_views(video_meta_data).get('views')
+    title = get_title_from_video_meta_data(video_meta_data).get('title')
+
+    return {
+        'video_id': video_id,
+        'available_languages': available_languages,
+        'available_audiotracks': available_audiotracks,
+        'views': views,
+        'title': title
+    }
+
+
+def build_failed_video_data(video_id, error):
+    """
+    Builds the data of a YouTube video whose data could not be retrieved.
+
+    :param video_id: (str) The YouTube video ID
+    :param error: (Exception) The error which occurred
+    :return: (dict) Dictionary containing empty video data and the name of the error
+    """
+    return {
+        'video_id': video_id,
+        'available_languages': None,
+        'available_audiotracks': None,
+        'views': None,
+        'title': None,
+        'error': type(error).__name__
+    }
 
 
 def get_video_views(video_meta_data):
@@ -107,7 +233,7 @@ def get_video_views(video_meta_data):
         views = re.sub(r'\D', '', views)
         return {'views': int(views)}
     except Exception as e:
-        print(f"Error extracting video views: {e}")
+        logger.debug("Error extracting video views: %s", e)
         return {'views': None}
 
 
@@ -124,11 +250,245 @@ def get_title_from_video_meta_data(video_meta_data):
         title = title_start_meta_data[:title_end_index]
         return {'title': title}
     except Exception as e:
-        print(f"Error extracting video title: {e}")
+        logger.debug("Error extracting video title: %s", e)
         return {'title': None}
 
 
-def add_new_columns_to_df(df, video_link_columns, channel_name_column, starting_row_index=0):
+def get_cached_data(cache_folder, cache_type, identifier):
+    """
+    Reads cached data.
+
+    :param cache_folder: (str) Folder the data is cached in
+    :param cache_type: (str) The type of the data, like "video"
+    :param identifier: (str) The identifier of the data, like the video ID
+    :return: (dict) The cached data, or None if it is not cached
+    """
+    filename = os.path.join(cache_folder, f"{cache_type}_{identifier.replace('/', '_')}.json")
+
+    with metrics.time('video_cache_lookup'):
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                content = f.read()
+                return json.loads(content)
+
+    return None
+
+
+def save_cached_data(cache_folder, cache_type, identifier, data):
+    """
+    Writes data to the cache.
+
+    :param cache_folder: (str) Folder the data is cached in
+    :param cache_type: (str) The type of the data, like "video"
+    :param identifier: (str) The identifier of the data, like the video ID
+    :param data: (dict) The data
+    """
+    filename = os.path.join(cache_folder, f"{cache_type}_{identifier.replace('/', '_')}.json")
+    with metrics.time('video_cache_store'):
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+
+
+def pack_video_data(video_data):
+    """
+    Packs the data of a video into a tuple, which is much smaller to pickle than the dictionary.
+
+    :param video_data: (dict) Dictionary containing important video data
+    :return: (tuple) The values of the VIDEO_DATA_KEYS
+    """
+    return tuple(video_data.get(key) for key in VIDEO_DATA_KEYS)
+
+
+def unpack_video_data(packed_video_data):
+    """
+    Unpacks the data of a video which has been packed by pack_video_data.
+
+    :param packed_video_data: (tuple) The values of the VIDEO_DATA_KEYS
+    :return: (dict) Dictionary containing important video data, with an 'error' only if the video failed
+    """
+    video_data = dict(zip(VIDEO_DATA_KEYS, packed_video_data))
+    if video_data['error'] is None:
+        del video_data['error']
+    return video_data
+
+
+def shard_video_ids(video_ids, shards):
+    """
+    Splits video IDs into shards by their hash, so a video always ends up in the same shard, also across runs.
+
+    :param video_ids: (list) The YouTube video IDs
+    :param shards: (int) The number of shards
+    :return: (list) A list of `shards` lists of video IDs, in the order of `video_ids`
+    """
+    sharded_video_ids = [[] for _ in range(shards)]
+    for video_id in video_ids:
+        sharded_video_ids[zlib.crc32(video_id.encode('utf-8')) % shards].append(video_id)
+    return sharded_video_ids
+
+
+def init_shard_process():
+    """
+    Initializes a process of the pool fetch_video_data_shard runs in. A forked process starts with a copy of the
+    metrics of its parent, which must not be sent back to it.
+    """
+    metrics.reset()
+
+
+def fetch_video_data_shard(video_links, cache_folder, workers=1, requests_per_second=0.2, archive_folder=None,
+                           proxies=None):
+    """
+    Fetches and caches the data of a shard of videos in `workers` threads, with its own session and rate limit. This
+    is a top level function, so it can be run in a process pool started with init_shard_process. The metrics and the
+    proxy statistics of the process are returned, so they can be merged into the ones of the parent process.
+
+    :param video_links: (dict) The video links of the shard by their video ID
+    :param cache_folder: (str) Folder in which the retrieved video data is cached
+    :param workers: (int) Number of videos which are fetched concurrently
+    :param requests_per_second: (float) Maximum number of videos of this shard fetched per second
+    :param archive_folder: (str, optional) Folder of a WatchPageArchive every fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the videos are fetched through
+    :return: (tuple) The packed data of every video, see pack_video_data, the MetricsRegistry of the shard, and for a
+        ProxyPool the stats of the pool after and before fetching the shard, else None
+    """
+    archive = WatchPageArchive(archive_folder) if archive_folder else None
+    rate_limiter = RateLimiter(requests_per_second)
+    proxy_stats_before = proxies.stats() if isinstance(proxies, ProxyPool) else None
+
+    def fetch_and_cache(video_id):
+        rate_limiter.wait()
+        return pack_video_data(fetch_and_cache_video_data(
+            cache_folder, video_id, video_links[video_id], archive=archive, proxies=proxies,
+        ))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        packed_video_data = list(executor.map(fetch_and_cache, video_links))
+
+    # the next shard fetched by this process starts counting from zero again
+    shard_metrics = MetricsRegistry(metrics.namespace, metrics.buckets)
+    shard_metrics.merge(metrics)
+    metrics.reset()
+    proxy_stats = (proxies.stats(), proxy_stats_before) if proxy_stats_before is not None else None
+    return packed_video_data, shard_metrics, proxy_stats
+
+
+def work_on_queue(work_queue, worker=None, workers=1, requests_per_second=0.2, archive_folder=None, proxies=None,
+                  idle_timeout=0.0, poll_interval=5.0):
+    """
+    Leases videos from a work queue, fetches their data and acknowledges them with it, until the queue has been idle
+    for `idle_timeout` seconds. This is the loop of every worker node of a distributed enrichment. Videos which fail
+    with a recaptcha or a transient error are released, so they are fetched again, other failures are acknowledged
+    with their error.
+
+    :param work_queue: (work_queue.SQLiteWorkQueue or work_queue.RedisWorkQueue) The queue filled by the coordinator
+    :param worker: (str, optional) The name of the worker, defaults to the host name and process ID
+    :param workers: (int) Number of videos which are fetched concurrently
+    :param requests_per_second: (float) Maximum number of videos fetched per second by this worker
+    :param archive_folder: (str, optional) Folder of a WatchPageArchive every fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the videos are fetched through
+    :param idle_timeout: (float) The number of seconds to wait for new videos once there are none left to lease. With
+        0 the loop stops as soon as there is nothing to lease.
+    :param poll_interval: (float) The number of seconds between two polls of an empty queue
+    :return: (int) The number of videos which have been fetched
+    """
+    import socket
+
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    archive = WatchPageArchive(archive_folder) if archive_folder else None
+    rate_limiter = RateLimiter(requests_per_second)
+
+    # a batch is only done when its last video has been fetched, with a rate limit all of them have to be fetched
+    # before the leases expire
+    batch_size = max(workers, 1) * 2
+    if requests_per_second > 0:
+        batch_size = max(min(batch_size, int(work_queue.lease_seconds * requests_per_second)), 1)
+
+    def fetch_and_ack(task):
+        video_id, video_link = task
+        rate_limiter.wait()
+        try:
+            video_data = fetch_important_video_data(video_link, archive=archive, proxies=proxies)
+        except Exception as e:
+            if is_retried_by_queue(e):
+                logger.warning("Error fetching video %s, releasing it: %s", video_id, e)
+                work_queue.nack(video_id, type(e).__name__)
+                return 0
+            logger.warning("Error retrieving data for video %s: %s", video_id, e)
+            video_data = build_failed_video_data(video_id, e)
+        work_queue.ack(video_id, video_data)
+        return 1
+
+    fetched = 0
+    idle_since = None
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        while True:
+            tasks = work_queue.lease(worker, count=batch_size)
+            if tasks:
+                idle_since = None
+                fetched += sum(executor.map(fetch_and_ack, tasks))
+                continue
+            now = time.monotonic()
+            idle_since = idle_since if idle_since is not None else now
+            if now - idle_since >= idle_timeout:
+                return fetched
+            time.sleep(min(poll_interval, idle_timeout))
+
+
+def collect_from_queue(work_queue, video_links, cache_folder, progress, workers=1, requests_per_second=0.2,
+                       archive_folder=None, proxies=None, poll_interval=5.0):
+    """
+    Puts videos into a work queue, works on the queue like any other worker until nothing is left to lease, and waits
+    for the videos leased by the other workers. The collected video data is saved to the local cache.
+
+    :param work_queue: (work_queue.SQLiteWorkQueue or work_queue.RedisWorkQueue) The queue shared with the workers
+    :param video_links: (dict) The video links of the videos which are not cached yet by their video ID
+    :param cache_folder: (str) Folder in which the collected video data is cached
+    :param progress: (ProgressReporter) The progress which is updated for every collected video
+    :param workers: (int) Number of videos which are fetched concurrently by the coordinator
+    :param requests_per_second: (float) Maximum number of videos fetched per second by the coordinator
+    :param archive_folder: (str, optional) Folder of a WatchPageArchive every fetched watch page is stored in
+    :param proxies: (dict or ProxyPool, optional) The proxies the videos are fetched through
+    :param poll_interval: (float) The number of seconds between two polls for the videos of the other workers
+    :return: (dict) The data of every video by its video ID
+    """
+    work_queue.put(video_links)
+    work_on_queue(
+        work_queue, workers=workers, requests_per_second=requests_per_second, archive_folder=archive_folder,
+        proxies=proxies,
+    )
+
+    video_data_by_id = {}
+    remaining_video_ids = list(video_links)
+    while remaining_video_ids:
+        collected = dict(work_queue.results(remaining_video_ids))
+        for video_id, error in work_queue.failures(remaining_video_ids).items():
+            collected[video_id] = dict(build_failed_video_data(video_id, None), error=error)
+        for video_id, video_data in collected.items():
+            save_cached_data(cache_folder, 'video', video_id, video_data)
+            video_data_by_id[video_id] = video_data
+            progress.update(errors='error' in video_data)
+        remaining_video_ids = [video_id for video_id in remaining_video_ids if video_id not in collected]
+
+        if remaining_video_ids:
+            counts = work_queue.counts()
+            if not counts['pending'] and not counts['leased']:
+                # lost by a worker between leasing and acknowledging them
+                for video_id in remaining_video_ids:
+                    video_data_by_id[video_id] = build_failed_video_data(video_id, LookupError('lost by the queue'))
+                break
+            if counts['pending']:
+                # leases of crashed workers expired
+                work_on_queue(
+                    work_queue, workers=workers, requests_per_second=requests_per_second,
+                    archive_folder=archive_folder, proxies=proxies,
+                )
+            else:
+                time.sleep(poll_interval)
+    return video_data_by_id
+
+
+def add_new_columns_to_df(df, video_link_columns, channel_name_column, starting_row_index=0,
+                          cache_folder="cached_data", workers=1, requests_per_second=0.2, stats=None,
+                          archive_folder=None, re_extract=False, proxies=None, processes=1, work_queue=None):
     """
     Adds new columns to the DataFrame with YouTube video and channel data, using caching for efficiency.
 
@@ -136,28 +496,44 @@ def add_new_columns_to_df(df, video_link_columns, channel_name_column, starting_
     :param video_link_columns: (list) List of column names containing video links
     :param channel_name_column: (str) Name of the column containing channel names
     :param starting_row_index: (int) The index to start processing from
+    :param cache_folder: (str) Folder in which the retrieved video data is cached
+    :param workers: (int) Number of videos which are fetched concurrently
+    :param requests_per_second: (float) Maximum number of videos fetched per second over all workers
+    :param stats: (dict, optional) Dictionary which is updated with the number of cache hits, cache misses and failures
+    :param archive_folder: (str, optional) Folder of a WatchPageArchive every fetched watch page is stored in
+    :param re_extract: (bool) Extract the data of every video with an archived watch page again from the archive, in
+        `workers` processes and without any network traffic, and update the cache with it. Videos without an archived
+        watch page are only read from the cache.
+    :param proxies: (dict or ProxyPool, optional) The proxies the videos are fetched through. With a ProxyPool every
+        video is fetched through the healthiest available proxy of the pool.
+    :param processes: (int) Number of processes the videos which are not cached yet are fetched in. The videos are
+        sharded by their ID, every process fetches its shard in `workers` threads with its own session and an equal
+        share of `requests_per_second`.
+    :param work_queue: (work_queue.SQLiteWorkQueue or work_queue.RedisWorkQueue, optional) Distribute the videos
+        which are not cached yet over all workers of this queue, see `work_on_queue`. This process works on the queue
+        too, with `workers` and `requests_per_second`, and collects the results of all workers.
     :return: (pandas.DataFrame) The updated DataFrame with new columns
     """
-    df_copy = df.copy()
-    cache_folder = "cached_data"
-    os.makedirs(cache_folder, exist_ok=True)
+    import pandas as pd
+    # imported here, loading multiprocessing takes a third of the startup time of main
+    from concurrent.futures import ProcessPoolExecutor
 
-    def get_cached_data(cache_type, identifier):
-        """Helper function to get or create cached data"""
-        filename = os.path.join(cache_folder, f"{cache_type}_{identifier.replace('/', '_')}.json")
+    if re_extract and not archive_folder:
+        raise ValueError("re_extract requires an archive_folder")
 
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                content = f.read()
-                return json.loads(content)
+    df_copy = df.copy()
+    os.makedirs(cache_folder, exist_ok=True)
+    stats = stats if stats is not None else {}
+    for counter in ('video_cache_hits', 'video_cache_misses', 'video_failures', 'video_reextracted'):
+        stats.setdefault(counter, 0)
+    archive = WatchPageArchive(archive_folder) if archive_folder else None
 
-        return None
+    rate_limiter = RateLimiter(requests_per_second)
 
-    def save_cached_data(cache_type, identifier, data):
-        """Helper function to save data to cache"""
-        filename = os.path.join(cache_folder, f"{cache_type}_{identifier.replace('/', '_')}.json")
-        with open(filename, 'w') as f:
-            json.dump(data, f)
+    def fetch_and_cache(video_id, video_link):
+        """Helper function to fetch the data of a video which is not cached yet"""
+        rate_limiter.wait()
+        return fetch_and_cache_video_data(cache_folder, video_id, video_link, archive=archive, proxies=proxies)
 
     # Initialize new columns
     for column in video_link_columns:
@@ -171,24 +547,120 @@ def add_new_columns_to_df(df, video_link_columns, channel_name_column, starting_
         for new_column in new_columns:
             df_copy[new_column] = pd.NA
 
+    # Resolve the video id of every cell first, so every video is only looked up once
+    cells = []
+    video_links = {}
     for index, row in df_copy.iloc[starting_row_index:].iterrows():
-        # Process video data
         for column in video_link_columns:
             video_link = row[column]
             if pd.notna(video_link):
                 video_id = get_video_id_from_youtube_link(video_link)
-                print("video_id = ", video_id)
-                video_data = get_cached_data('video', video_id)
-
-                if video_data is None:
-                    video_data = get_important_video_data(video_link)
-                    save_cached_data('video', video_id, video_data)
-                    time.sleep(5)  # Delay for API rate limiting
-
-                for key, value in video_data.items():
-                    column_name = f"{key}_{column}"
-                    if column_name in df_copy.columns:
-                        df_copy.at[index, column_name] = value
+                if video_id is None:
+                    logger.warning("No video id found in %r of row %s", video_link, index)
+                    stats['video_failures'] += 1
+                    continue
+                logger.debug("Row %s: video id %s", index, video_id)
+                cells.append((index, column, video_id))
+                video_links.setdefault(video_id, video_link)
+
+    video_data_by_id = {}
+    if re_extract:
+        snapshots = archive.latest_snapshots()
+        archived_video_ids = [video_id for video_id in video_links if video_id in snapshots]
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+            reextracted_video_data = executor.map(
+                reextract_important_video_data,
+                repeat(archive_folder),
+                archived_video_ids,
+                [snapshots[video_id] for video_id in archived_video_ids],
+                chunksize=max(1, len(archived_video_ids) // (max(workers, 1) * 4)),
+            )
+            for video_id, video_data in zip(archived_video_ids, reextracted_video_data):
+                save_cached_data(cache_folder, 'video', video_id, video_data)
+                video_data_by_id[video_id] = video_data
+        stats['video_reextracted'] += len(archived_video_ids)
+
+    missing_video_ids = []
+    for video_id in video_links:
+        if video_id in video_data_by_id:
+            continue
+        video_data = get_cached_data(cache_folder, 'video', video_id)
+        if video_data is None:
+            missing_video_ids.append(video_id)
+        else:
+            stats['video_cache_hits'] += 1
+            metrics.increment('cache_hits', cache='videos')
+            video_data_by_id[video_id] = video_data
+
+    stats['video_cache_misses'] += len(missing_video_ids)
+    metrics.increment('cache_misses', len(missing_video_ids), cache='videos')
+    if re_extract:
+        # re-extraction never touches the network, videos which are neither archived nor cached stay empty
+        for video_id in missing_video_ids:
+            video_data_by_id[video_id] = build_failed_video_data(video_id, LookupError('no archived watch page'))
+        missing_video_ids = []
+    progress = ProgressReporter(
+        "videos", len(missing_video_ids),
+        cache_hits=stats['video_cache_hits'], cache_misses=stats['video_cache_misses'],
+    )
+    if work_queue is not None and missing_video_ids:
+        video_data_by_id.update(collect_from_queue(
+            work_queue,
+            {video_id: video_links[video_id] for video_id in missing_video_ids},
+            cache_folder,
+            progress,
+            workers=workers,
+            requests_per_second=requests_per_second,
+            archive_folder=archive_folder,
+            proxies=proxies,
+        ))
+        missing_video_ids = []
+    elif processes > 1 and len(missing_video_ids) > 1:
+        shards = [shard for shard in shard_video_ids(missing_video_ids, processes) if shard]
+        with ProcessPoolExecutor(max_workers=len(shards), initializer=init_shard_process) as executor:
+            futures = {
+                executor.submit(
+                    fetch_video_data_shard,
+                    {video_id: video_links[video_id] for video_id in shard},
+                    cache_folder,
+                    workers,
+                    requests_per_second / len(shards),
+                    archive_folder,
+                    proxies,
+                ): shard
+                for shard in shards
+            }
+            # progress is reported per shard, the parent does not see the single videos of a child process
+            for future in as_completed(futures):
+                packed_shard_video_data, shard_metrics, proxy_stats = future.result()
+                metrics.merge(shard_metrics)
+                if proxy_stats is not None:
+                    proxies.merge(*proxy_stats)
+                shard_video_data = [unpack_video_data(packed) for packed in packed_shard_video_data]
+                for video_id, video_data in zip(futures[future], shard_video_data):
+                    video_data_by_id[video_id] = video_data
+                progress.update(
+                    len(shard_video_data), errors=sum(1 for video_data in shard_video_data if 'error' in video_data),
+                )
+        missing_video_ids = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        fetched_video_data = executor.map(
+            lambda video_id: fetch_and_cache(video_id, video_links[video_id]),
+            missing_video_ids,
+        )
+        for video_id, video_data in zip(missing_video_ids, fetched_video_data):
+            video_data_by_id[video_id] = video_data
+            progress.update(errors='error' in video_data)
+    progress.finish()
+
+    stats['video_failures'] += sum(1 for video_data in video_data_by_id.values() if 'error' in video_data)
+
+    with metrics.time('dataframe_assembly'):
+        for index, column, video_id in cells:
+            for key, value in video_data_by_id[video_id].items():
+                column_name = f"{key}_{column}"
+                if column_name in df_copy.columns:
+                    df_copy.at[index, column_name] = value
 
     return df_copy
 